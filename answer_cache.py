@@ -0,0 +1,234 @@
+import asyncio
+import math
+import os
+import re
+import threading
+import zlib
+from collections import deque
+from typing import Dict, Any, List, Optional, Tuple
+
+from response_cache import DiskCache, MemoryLRUCache, TieredCache
+
+
+# Answer TTLs (seconds) per query type; news answers go stale within minutes
+DEFAULT_ANSWER_TTLS = {
+    "movie": 12 * 60 * 60,
+    "music": 12 * 60 * 60,
+    "news": 10 * 60,
+    "general": 60 * 60,
+}
+
+# Word-level rewrites applied before keying so common paraphrases collapse together
+SYNONYMS = {
+    "best": "top",
+    "greatest": "top",
+    "films": "movies",
+    "film": "movie",
+    "flicks": "movies",
+    "songs": "song",
+    "tracks": "song",
+    "track": "song",
+    "tunes": "song",
+    "singers": "artist",
+    "singer": "artist",
+    "latest": "recent",
+    "newest": "recent",
+}
+
+STOPWORDS = {"a", "an", "the", "me", "show", "find", "give", "get", "list", "please", "some", "of", "for", "what", "are", "is"}
+
+_WORD_PATTERN = re.compile(r"[a-z0-9&']+")
+
+
+def normalize_query(text: str) -> str:
+    """Lowercase, drop punctuation and filler words, and map synonyms"""
+    words = []
+    for word in _WORD_PATTERN.findall(text.lower()):
+        word = SYNONYMS.get(word, word)
+        if word not in STOPWORDS:
+            words.append(word)
+    return " ".join(words)
+
+
+class HashedNgramEmbedder:
+    """Dependency-free text embedding: hashed character n-grams, L2-normalized"""
+
+    def __init__(self, dim: int = 1024, n: int = 3):
+        self.dim = dim
+        self.n = n
+
+    def __call__(self, text: str) -> Dict[int, float]:
+        padded = f" {text} "
+        vector: Dict[int, float] = {}
+        for i in range(len(padded) - self.n + 1):
+            bucket = zlib.crc32(padded[i:i + self.n].encode("utf-8")) % self.dim
+            vector[bucket] = vector.get(bucket, 0.0) + 1.0
+        norm = math.sqrt(sum(v * v for v in vector.values())) or 1.0
+        return {k: v / norm for k, v in vector.items()}
+
+
+def cosine_similarity(a: Dict[int, float], b: Dict[int, float]) -> float:
+    if len(a) > len(b):
+        a, b = b, a
+    return sum(value * b.get(key, 0.0) for key, value in a.items())
+
+
+def answer_text(result) -> str:
+    """Pull the final answer string out of a crew result (CrewOutput, dict or str)"""
+    if isinstance(result, dict):
+        result = result.get("result")
+    if result is None:
+        return ""
+    if isinstance(result, str):
+        return result
+    if hasattr(result, "raw"):
+        return result.raw
+    return str(result)
+
+
+class AnswerCache:
+    """Final-answer cache keyed on query type plus parsed criteria, with optional similarity matching"""
+
+    def __init__(self,
+                 store: Optional[TieredCache] = None,
+                 ttls: Optional[Dict[str, float]] = None,
+                 semantic: bool = False,
+                 similarity_threshold: float = 0.9,
+                 embedder=None,
+                 max_semantic_entries: int = 512):
+        """
+        Args:
+            store: Backing cache (memory-only if not given)
+            ttls: Per query type TTLs in seconds, merged over DEFAULT_ANSWER_TTLS
+            semantic: Also match near-duplicate free-text queries by embedding similarity
+            similarity_threshold: Minimum cosine similarity for a semantic hit
+            embedder: Callable mapping text to a sparse {index: weight} vector
+            max_semantic_entries: Entries kept per query type for similarity search
+        """
+        answer_ttls = dict(DEFAULT_ANSWER_TTLS)
+        if ttls:
+            answer_ttls.update(ttls)
+        self.store = store or TieredCache(memory=MemoryLRUCache(512))
+        # The backing cache resolves TTLs by provider name; answers use "answer_<type>"
+        self.store.ttls.update({f"answer_{query_type}": ttl for query_type, ttl in answer_ttls.items()})
+        self.ttls = answer_ttls
+
+        self.semantic = semantic
+        self.similarity_threshold = similarity_threshold
+        self.embedder = embedder or HashedNgramEmbedder()
+        self._lock = threading.Lock()
+        self._vectors: Dict[str, deque] = {}
+        self._max_semantic_entries = max_semantic_entries
+        self.semantic_hits = 0
+
+    @classmethod
+    def from_env(cls) -> "AnswerCache":
+        """Build an answer cache from ANSWER_CACHE_* environment variables"""
+        disk = None
+        if os.getenv("ANSWER_CACHE_DISK", "1").lower() not in ("0", "false", "no"):
+            disk = DiskCache(os.getenv("ANSWER_CACHE_PATH", os.path.join(".cache", "answer_cache.sqlite3")))
+        store = TieredCache(
+            memory=MemoryLRUCache(int(os.getenv("ANSWER_CACHE_MAX_ENTRIES", 512))),
+            disk=disk,
+            bypass=os.getenv("ANSWER_CACHE_BYPASS", "0").lower() in ("1", "true", "yes")
+        )
+        ttls = {}
+        for query_type in DEFAULT_ANSWER_TTLS:
+            value = os.getenv(f"ANSWER_TTL_{query_type.upper()}")
+            if value:
+                ttls[query_type] = float(value)
+        return cls(
+            store=store,
+            ttls=ttls,
+            semantic=os.getenv("ANSWER_CACHE_SEMANTIC", "0").lower() in ("1", "true", "yes"),
+            similarity_threshold=float(os.getenv("ANSWER_CACHE_SIMILARITY", 0.9))
+        )
+
+    @staticmethod
+    def make_params(query_type: str, criteria, count: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Build the structured key for a query
+
+        Args:
+            query_type: movie, music, news or general
+            criteria: Parsed criteria dict (movie/music) or search text (news/general)
+            count: Requested number of results
+
+        Returns:
+            Dictionary identifying the answer
+        """
+        if isinstance(criteria, dict):
+            criteria = {key: normalize_query(value) if isinstance(value, str) else value
+                        for key, value in criteria.items()}
+        else:
+            criteria = normalize_query(str(criteria))
+        return {"type": query_type, "criteria": criteria, "count": count}
+
+    def get(self, query_type: str, params: Dict[str, Any], text: Optional[str] = None,
+            bypass: bool = False) -> Optional[Dict[str, Any]]:
+        """Return a cached answer dict for an exact key, or a similar free-text query if enabled"""
+        if bypass or self.store.bypass:
+            return None
+
+        found, value = self.store.get(f"answer_{query_type}", params)
+        if found:
+            return value
+
+        if self.semantic and text and not isinstance(params.get("criteria"), dict):
+            match = self._nearest(query_type, params, text)
+            if match is not None:
+                found, value = self.store.get(f"answer_{query_type}", match)
+                if found:
+                    with self._lock:
+                        self.semantic_hits += 1
+                    return value
+        return None
+
+    def set(self, query_type: str, params: Dict[str, Any], result: Dict[str, Any], text: Optional[str] = None):
+        """Store a crew result; results carrying an error are skipped"""
+        if self.store.bypass or not isinstance(result, dict) or "error" in result:
+            return
+        # Token usage describes the run that produced the answer, not later cache hits
+        entry = {key: value for key, value in result.items() if key not in ("result", "token_usage")}
+        entry["result"] = answer_text(result)
+        self.store.set(f"answer_{query_type}", params, entry)
+
+        if self.semantic and text and not isinstance(params.get("criteria"), dict):
+            vector = self.embedder(normalize_query(text))
+            with self._lock:
+                entries = self._vectors.setdefault(query_type, deque(maxlen=self._max_semantic_entries))
+                entries.append((vector, params))
+
+    async def aget(self, query_type: str, params: Dict[str, Any], text: Optional[str] = None,
+                   bypass: bool = False) -> Optional[Dict[str, Any]]:
+        """Async variant of get; with a disk tier the lookup runs in a worker thread"""
+        if self.store.disk is None:
+            return self.get(query_type, params, text, bypass)
+        return await asyncio.to_thread(self.get, query_type, params, text, bypass)
+
+    async def aset(self, query_type: str, params: Dict[str, Any], result: Dict[str, Any], text: Optional[str] = None):
+        """Async variant of set; with a disk tier the write runs in a worker thread"""
+        if self.store.disk is None:
+            self.set(query_type, params, result, text)
+        else:
+            await asyncio.to_thread(self.set, query_type, params, result, text)
+
+    def _nearest(self, query_type: str, params: Dict[str, Any], text: str) -> Optional[Dict[str, Any]]:
+        vector = self.embedder(normalize_query(text))
+        best_score, best_params = 0.0, None
+        with self._lock:
+            candidates: List[Tuple[Dict[int, float], Dict[str, Any]]] = list(self._vectors.get(query_type, ()))
+        for candidate_vector, candidate_params in candidates:
+            # Different result counts are different answers, however similar the wording
+            if candidate_params.get("count") != params.get("count"):
+                continue
+            score = cosine_similarity(vector, candidate_vector)
+            if score > best_score:
+                best_score, best_params = score, candidate_params
+        return best_params if best_score >= self.similarity_threshold else None
+
+    def stats(self) -> Dict[str, Any]:
+        stats = self.store.stats()
+        stats["semantic"] = self.semantic
+        stats["semantic_hits"] = self.semantic_hits
+        return stats
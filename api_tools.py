@@ -1,10 +1,18 @@
-from crewai.tools import tool
-from typing import Dict, Any, List, Optional
-import requests
+from typing import Callable, Dict, Any, List, Optional
+import asyncio
+import contextvars
 import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from http_client import PooledHTTPClient, get_http_client, get_async_http_client
+from response_cache import TieredCache, get_response_cache
+from records import KnowledgeGraph, MovieRecord, NewsRecord, SongRecord, WebResult
+import json_decode
+from tracing import trace_error
 
-@tool
-def search_movies(api_key: str, read_access_token: str, search_criteria: Dict[str, Any], count: int = 10) -> List[Dict]:
+def _search_movies(api_key: str, read_access_token: str, search_criteria: Dict[str, Any], count: int = 10) -> List[Dict]:
     """
     Search for movies based on search criteria using The Movie Database (TMDB) API
     
@@ -20,8 +28,7 @@ def search_movies(api_key: str, read_access_token: str, search_criteria: Dict[st
     tmdb_tools = TMDBMovieTools(api_key, read_access_token)
     return tmdb_tools.search_movies(search_criteria, count)
 
-@tool
-def search_music(search_criteria: Dict[str, Any], count: int = 10) -> List[Dict]:
+def _search_music(search_criteria: Dict[str, Any], count: int = 10) -> List[Dict]:
     """
     Search for music based on search criteria using iTunes Search API
     
@@ -35,8 +42,7 @@ def search_music(search_criteria: Dict[str, Any], count: int = 10) -> List[Dict]
     itunes_tools = ITunesMusicTools()
     return itunes_tools.search_music(search_criteria, count)
 
-@tool
-def fetch_news(api_key: str, search_query: str, count: int = 5) -> List[Dict]:
+def _fetch_news(api_key: str, search_query: str, count: int = 5) -> List[Dict]:
     """
     Fetch news articles based on search query using SERP API
     
@@ -51,8 +57,7 @@ def fetch_news(api_key: str, search_query: str, count: int = 5) -> List[Dict]:
     news_tools = NewsTools(api_key)
     return news_tools.fetch_news(search_query, count)
 
-@tool
-def web_search(api_key: str, query: str, count: int = 10) -> Dict:
+def _web_search(api_key: str, query: str, count: int = 10) -> Dict:
     """
     Perform a general web search using SERP API
     
@@ -67,12 +72,132 @@ def web_search(api_key: str, query: str, count: int = 10) -> Dict:
     search_tools = GeneralSearchTools(api_key)
     return search_tools.web_search(query, count)
 
+# crewai tools wrapping the functions above; built on first access (module __getattr__) so
+# importing this module doesn't load crewai
+_TOOL_FUNCTIONS = {
+    "search_movies": _search_movies,
+    "search_music": _search_music,
+    "fetch_news": _fetch_news,
+    "web_search": _web_search,
+}
+
+def __getattr__(name):
+    func = _TOOL_FUNCTIONS.get(name)
+    if func is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    from crewai.tools import tool
+    globals()[name] = tool(name)(func)
+    return globals()[name]
+
+
+class TMDBGenreCache:
+    """In-memory TMDB genre table with TTL refresh and O(1) name lookups"""
+
+    # Common spellings that TMDB names differently
+    ALIASES = {
+        "sci-fi": "science fiction",
+        "scifi": "science fiction",
+    }
+
+    def __init__(self, ttl: float = 24 * 3600):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        # Held for a whole refresh, so requests that find the table stale fetch it once between them
+        self._refresh_lock = threading.Lock()
+        self._genres: List[Dict] = []
+        self._exact: Dict[str, int] = {}
+        self._partial: Dict[str, int] = {}
+        self._loaded_at: Optional[float] = None
+
+    @staticmethod
+    def _normalize(name: str) -> str:
+        return " ".join(str(name).lower().split())
+
+    def load(self, genres: List[Dict]) -> int:
+        """Replace the table with a list of {"id", "name"} dicts and rebuild the indexes"""
+        exact = {}
+        partial = {}
+        for genre in genres:
+            name = self._normalize(genre['name'])
+            exact.setdefault(name, genre['id'])
+            # Index every substring so partial matches are a dict hit; earlier genres win
+            for i in range(len(name)):
+                for j in range(i + 1, len(name) + 1):
+                    partial.setdefault(name[i:j], genre['id'])
+
+        with self._lock:
+            self._genres = list(genres)
+            self._exact = exact
+            self._partial = partial
+            self._loaded_at = time.monotonic()
+        return len(genres)
+
+    def load_snapshot(self, path: str) -> int:
+        """Load the table from a JSON file in the TMDB /genre/movie/list format"""
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        return self.load(data.get('genres', []) if isinstance(data, dict) else data)
+
+    def save_snapshot(self, path: str):
+        """Write the current table to a JSON file in the TMDB /genre/movie/list format"""
+        with self._lock:
+            genres = list(self._genres)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"genres": genres}, f, indent=2)
+
+    def is_stale(self) -> bool:
+        loaded_at = self._loaded_at
+        return loaded_at is None or (self.ttl is not None and time.monotonic() - loaded_at > self.ttl)
+
+    def refresh_if_stale(self, fetch: Callable[[], List[Dict]]) -> bool:
+        """
+        Reload the table from fetch() if it is stale
+
+        Concurrent callers wait for the refresh already in flight instead of fetching again.
+
+        Returns:
+            Whether this call reloaded the table
+        """
+        if not self.is_stale():
+            return False
+        with self._refresh_lock:
+            if not self.is_stale():
+                return False
+            self.load(fetch())
+            return True
+
+    def lookup(self, genre_name: str) -> Optional[int]:
+        """Return the genre ID for an exact (then partial) case-insensitive name match"""
+        name = self._normalize(genre_name)
+        name = self.ALIASES.get(name, name)
+        if not name:
+            return None
+        genre_id = self._exact.get(name)
+        if genre_id is None:
+            genre_id = self._partial.get(name)
+        return genre_id
+
+
+# Shared by every TMDBMovieTools instance; the genre list is the same for all API keys
+genre_cache = TMDBGenreCache(ttl=float(os.getenv("TMDB_GENRE_TTL", 24 * 3600)))
+
+
+# Fields read from each provider payload; everything else is skipped while decoding
+TMDB_CREDIT_FIELDS = ("id", "job", "release_date", "vote_average")
+TMDB_DETAIL_FIELDS = ("title", "vote_average", "overview", "poster_path", "release_date", "runtime", "genres")
+ITUNES_FIELDS = ("wrapperType", "kind", "trackName", "artistName", "collectionName", "primaryGenreName",
+                 "releaseDate", "previewUrl", "artworkUrl100", "trackViewUrl", "trackPrice", "collectionPrice")
+SERP_NEWS_FIELDS = ("title", "source", "date", "link", "thumbnail", "snippet")
+SERP_ORGANIC_FIELDS = ("title", "link", "snippet")
+
 
 # Helper classes (not directly exposed as tools)
 class TMDBMovieTools:
     """Tools for searching movies using The Movie Database (TMDB) API"""
     
-    def __init__(self, api_key, read_access_token):
+    def __init__(self, api_key, read_access_token, http_client: Optional[PooledHTTPClient] = None,
+                 cache: Optional[TieredCache] = None,
+                 detail_workers: int = 8, detail_deadline: float = 10.0):
         self.api_key = api_key
         self.read_access_token = read_access_token
         self.base_url = "https://api.themoviedb.org/3"
@@ -80,18 +205,42 @@ class TMDBMovieTools:
             "Authorization": f"Bearer {self.read_access_token}",
             "Content-Type": "application/json;charset=utf-8"
         }
+        self.http = http_client or get_http_client()
+        self.cache = cache or get_response_cache()
+        # Concurrency and per-batch deadline (seconds) for movie detail lookups
+        self.detail_workers = detail_workers
+        self.detail_deadline = detail_deadline
     
-    def search_movies(self, search_criteria: Dict[str, Any], count: int = 10) -> List[Dict]:
+    def search_movies(self, search_criteria: Dict[str, Any], count: int = 10, bypass_cache: bool = False) -> List[Dict]:
         """
         Search for movies based on search criteria
         
         Args:
             search_criteria: Dictionary containing search parameters (genre, actor, director, year, min_rating)
             count: Number of results to return
+            bypass_cache: Skip the response cache for this call
             
         Returns:
-            List of movie dictionaries with details
+            List of MovieRecord items (a single {"error": ...} dict on failure)
+        """
+        return self.cache.get_or_fetch(
+            "tmdb",
+            {"search_criteria": search_criteria, "count": count},
+            lambda: self._search_movies(search_criteria, count),
+            bypass=bypass_cache
+        )
+
+    async def asearch_movies(self, search_criteria: Dict[str, Any], count: int = 10, bypass_cache: bool = False) -> List[Dict]:
         """
+        Async variant of search_movies
+
+        The TMDB flow is several dependent requests plus a threaded detail fan-out,
+        so it runs off the event loop in a worker thread.
+        """
+        return await asyncio.to_thread(self.search_movies, search_criteria, count, bypass_cache)
+
+    def _search_movies(self, search_criteria: Dict[str, Any], count: int) -> List[Dict]:
+        """Search movies without consulting the cache"""
         try:
             # Handle different types of searches based on criteria
             if 'actor' in search_criteria and search_criteria['actor']:
@@ -101,7 +250,7 @@ class TMDBMovieTools:
             else:
                 return self._discover_movies(search_criteria, count)
         except Exception as e:
-            print(f"TMDB API error: {str(e)}")
+            trace_error("provider", e, provider="tmdb")
             return [{"error": f"Failed to fetch movies: {str(e)}"}]
 
     def _search_by_actor(self, search_criteria: Dict[str, Any], count: int) -> List[Dict]:
@@ -114,14 +263,14 @@ class TMDBMovieTools:
             "query": actor_name
         }
         
-        response = requests.get(search_url, params=params, headers=self.headers)
-        data = response.json()
+        response = self.http.get(search_url, params=params, headers=self.headers)
+        people = json_decode.take(response.content, "results", 1, fields=("id",))
         
-        if not data.get('results') or len(data['results']) == 0:
+        if not people:
             return [{"error": f"Could not find actor: {actor_name}"}]
         
         # Get actor ID from the first result
-        actor_id = data['results'][0]['id']
+        actor_id = people[0]['id']
         
         # Get movies for this actor
         credits_url = f"{self.base_url}/person/{actor_id}/movie_credits"
@@ -129,23 +278,18 @@ class TMDBMovieTools:
             "api_key": self.api_key
         }
         
-        response = requests.get(credits_url, params=params, headers=self.headers)
-        data = response.json()
+        response = self.http.get(credits_url, params=params, headers=self.headers)
+        cast = list(json_decode.iter_items(response.content, "cast", fields=TMDB_CREDIT_FIELDS))
         
-        if not data.get('cast') or len(data['cast']) == 0:
+        if not cast:
             return [{"error": f"No movies found for actor: {actor_name}"}]
         
         # Filter results
-        movies = self._filter_movies(data['cast'], search_criteria)
+        movies = self._filter_movies(cast, search_criteria)
         
         # Get detailed information for each movie
         detailed_movies = self._get_detailed_movies(movies, count)
         
-        # Add search metadata
-        for movie in detailed_movies:
-            movie['search_type'] = 'actor'
-            movie['search_value'] = actor_name
-        
         return detailed_movies[:count]
     
     def _search_by_director(self, search_criteria: Dict[str, Any], count: int) -> List[Dict]:
@@ -158,14 +302,14 @@ class TMDBMovieTools:
             "query": director_name
         }
         
-        response = requests.get(search_url, params=params, headers=self.headers)
-        data = response.json()
+        response = self.http.get(search_url, params=params, headers=self.headers)
+        people = json_decode.take(response.content, "results", 1, fields=("id",))
         
-        if not data.get('results') or len(data['results']) == 0:
+        if not people:
             return [{"error": f"Could not find director: {director_name}"}]
         
         # Get director ID from the first result
-        director_id = data['results'][0]['id']
+        director_id = people[0]['id']
         
         # Get movies for this director
         credits_url = f"{self.base_url}/person/{director_id}/movie_credits"
@@ -173,14 +317,14 @@ class TMDBMovieTools:
             "api_key": self.api_key
         }
         
-        response = requests.get(credits_url, params=params, headers=self.headers)
-        data = response.json()
+        response = self.http.get(credits_url, params=params, headers=self.headers)
+        crew = list(json_decode.iter_items(response.content, "crew", fields=TMDB_CREDIT_FIELDS))
         
-        if not data.get('crew') or len(data['crew']) == 0:
+        if not crew:
             return [{"error": f"No movies found for director: {director_name}"}]
         
         # Filter to only directing credits
-        director_movies = [movie for movie in data['crew'] if movie.get('job', '').lower() == 'director']
+        director_movies = [movie for movie in crew if movie.get('job', '').lower() == 'director']
         
         if not director_movies:
             return [{"error": f"No movies found where {director_name} was the director"}]
@@ -191,11 +335,6 @@ class TMDBMovieTools:
         # Get detailed information for each movie
         detailed_movies = self._get_detailed_movies(movies, count)
         
-        # Add search metadata
-        for movie in detailed_movies:
-            movie['search_type'] = 'director'
-            movie['search_value'] = director_name
-        
         return detailed_movies[:count]
 
     def _discover_movies(self, search_criteria: Dict[str, Any], count: int) -> List[Dict]:
@@ -225,50 +364,51 @@ class TMDBMovieTools:
             params["sort_by"] = "vote_average.desc"
         
         # Make the request
-        response = requests.get(discover_url, params=params, headers=self.headers)
-        data = response.json()
+        response = self.http.get(discover_url, params=params, headers=self.headers)
+        # Only the ids of the top `count` results are used
+        results = json_decode.take(response.content, "results", count, fields=("id",))
         
-        if not data.get('results') or len(data['results']) == 0:
+        if not results:
             return [{"error": "No movies found with the specified criteria"}]
         
         # Get detailed information for each movie
-        detailed_movies = self._get_detailed_movies(data['results'], count)
-        
-        # Add search metadata
-        search_type = 'genre' if 'genre' in search_criteria and search_criteria['genre'] else \
-                     'year' if 'year' in search_criteria and search_criteria['year'] else 'popular'
-        search_value = search_criteria.get(search_type, 'popular')
-        
-        for movie in detailed_movies:
-            movie['search_type'] = search_type
-            movie['search_value'] = search_value
+        detailed_movies = self._get_detailed_movies(results, count)
         
         return detailed_movies[:count]
 
     def _get_genre_id(self, genre_name: str) -> Optional[int]:
-        """Get genre ID from genre name"""
+        """Get genre ID from genre name using the shared in-memory genre table"""
+        if genre_cache.is_stale():
+            try:
+                genre_cache.refresh_if_stale(self._fetch_genres)
+            except Exception as e:
+                # Keep serving the previous table (if any) when the refresh fails
+                trace_error("genre_refresh", e, provider="tmdb")
+        return genre_cache.lookup(genre_name)
+
+    def warm_genre_cache(self, snapshot_path: Optional[str] = None) -> int:
+        """
+        Load the TMDB genre table into the shared cache
+
+        Args:
+            snapshot_path: Optional local JSON file (TMDB /genre/movie/list format) to load instead of calling the API
+
+        Returns:
+            Number of genres loaded
+        """
+        if snapshot_path:
+            return genre_cache.load_snapshot(snapshot_path)
+        return genre_cache.load(self._fetch_genres())
+
+    def _fetch_genres(self) -> List[Dict]:
+        """Fetch the genre list from TMDB as {"id", "name"} dicts"""
         genre_url = f"{self.base_url}/genre/movie/list"
         params = {
             "api_key": self.api_key
         }
-        
-        response = requests.get(genre_url, params=params, headers=self.headers)
-        data = response.json()
-        
-        if not data.get('genres'):
-            return None
-        
-        # Find the genre ID that matches the name
-        for genre in data['genres']:
-            if genre['name'].lower() == genre_name.lower():
-                return genre['id']
-            
-        # Try partial matching if exact match not found
-        for genre in data['genres']:
-            if genre_name.lower() in genre['name'].lower():
-                return genre['id']
-        
-        return None
+
+        response = self.http.get(genre_url, params=params, headers=self.headers)
+        return list(json_decode.iter_items(response.content, "genres", fields=("id", "name")))
 
     def _filter_movies(self, movies: List[Dict], search_criteria: Dict[str, Any]) -> List[Dict]:
         """Filter movie list based on search criteria"""
@@ -290,119 +430,205 @@ class TMDBMovieTools:
         return filtered
 
     def _get_detailed_movies(self, movies: List[Dict], count: int) -> List[Dict]:
-        """Get detailed information for each movie"""
+        """
+        Get detailed information for each movie
+
+        Detail requests run concurrently on a bounded worker pool. Results keep the
+        original ranking order; movies that fail or miss the batch deadline are skipped.
+        """
+        candidates = movies[:count]
+        if not candidates:
+            return []
+
+        workers = max(1, min(self.detail_workers, len(candidates)))
+        executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="tmdb-details")
+        # Each worker runs in a copy of the caller's context so its rate-limit priority carries over
+        futures = [executor.submit(contextvars.copy_context().run, self._get_movie_details, movie['id'])
+                   for movie in candidates]
+
+        try:
+            # Wait for the whole batch, but never longer than the deadline
+            done, not_done = wait(futures, timeout=self.detail_deadline)
+            for future in not_done:
+                future.cancel()
+            if not_done:
+                trace_error("movie_details", "deadline exceeded", provider="tmdb", missed=len(not_done),
+                            total=len(futures), deadline_s=self.detail_deadline)
+        finally:
+            # Don't block on stragglers; they finish in the background and are discarded
+            executor.shutdown(wait=False)
+
         detailed_movies = []
-        
-        for movie in movies[:count]:
-            movie_id = movie['id']
-            movie_url = f"{self.base_url}/movie/{movie_id}"
-            params = {
-                "api_key": self.api_key,
-                "append_to_response": "credits"  # Include credits to get cast and crew
-            }
-            
+        for movie, future in zip(candidates, futures):
+            if future not in done:
+                continue
             try:
-                response = requests.get(movie_url, params=params, headers=self.headers)
-                details = response.json()
-                
-                # Construct thumbnail URL
-                poster_path = details.get('poster_path')
-                thumbnail = f"https://image.tmdb.org/t/p/w500{poster_path}" if poster_path else "https://via.placeholder.com/150"
-                
-                # Extract director from crew
-                director = "N/A"
-                if 'credits' in details and 'crew' in details['credits']:
-                    directors = [person for person in details['credits']['crew'] if person['job'] == 'Director']
-                    if directors:
-                        director = directors[0]['name']
-                
-                # Format year from release date
-                year = "N/A"
-                if 'release_date' in details and details['release_date']:
-                    year = details['release_date'].split('-')[0]
-                
-                detailed_movies.append({
-                    'title': details.get('title', "Unknown Title"),
-                    'year': year,
-                    'rating': str(details.get('vote_average', "N/A")),
-                    'description': details.get('overview', "No description available"),
-                    'thumbnail': thumbnail,
-                    'link': f"https://www.themoviedb.org/movie/{movie_id}",
-                    'director': director,
-                    'runtime': details.get('runtime', "N/A"),
-                    'genres': ", ".join([g['name'] for g in details.get('genres', [])])
-                })
+                detailed_movies.append(future.result())
             except Exception as e:
-                print(f"Error getting details for movie {movie_id}: {str(e)}")
+                trace_error("movie_details", e, provider="tmdb", movie_id=movie['id'])
                 continue
-        
+
         return detailed_movies
 
+    def _get_movie_details(self, movie_id: int) -> MovieRecord:
+        """Fetch and format the details of a single movie"""
+        movie_url = f"{self.base_url}/movie/{movie_id}"
+        params = {
+            "api_key": self.api_key,
+            "append_to_response": "credits"  # Include credits to get cast and crew
+        }
+
+        response = self.http.get(movie_url, params=params, headers=self.headers)
+        return self._parse_movie_details(response.content, movie_id)
+
+    def _parse_movie_details(self, content: bytes, movie_id: int) -> MovieRecord:
+        """Build a movie record from a /movie/{id}?append_to_response=credits response body"""
+        body = json_decode.parse(content)
+        details = json_decode.select(body, TMDB_DETAIL_FIELDS)
+
+        # Construct thumbnail URL
+        poster_path = details.get('poster_path')
+        thumbnail = f"https://image.tmdb.org/t/p/w500{poster_path}" if poster_path else "https://via.placeholder.com/150"
+
+        # Extract director from crew, without building the (much longer) cast list
+        director = "N/A"
+        directors = json_decode.take(body, "credits.crew", 1, fields=("job", "name"),
+                                     where=lambda person: person.get('job') == 'Director')
+        if directors:
+            director = directors[0]['name']
+
+        # Format year from release date
+        year = "N/A"
+        if 'release_date' in details and details['release_date']:
+            year = details['release_date'].split('-')[0]
+
+        return MovieRecord(
+            title=details.get('title', "Unknown Title"),
+            year=year,
+            rating=str(details.get('vote_average', "N/A")),
+            description=details.get('overview', "No description available"),
+            thumbnail=thumbnail,
+            link=f"https://www.themoviedb.org/movie/{movie_id}",
+            director=director,
+            runtime=details.get('runtime', "N/A"),
+            genres=", ".join([g['name'] for g in details.get('genres', [])])
+        )
+
 
 class ITunesMusicTools:
     """Tools for searching music using iTunes Search API"""
     
-    def __init__(self):
+    def __init__(self, http_client: Optional[PooledHTTPClient] = None,
+                 cache: Optional[TieredCache] = None):
         self.base_url = "https://itunes.apple.com/search"
+        self.http = http_client or get_http_client()
+        self.cache = cache or get_response_cache()
     
-    def search_music(self, search_criteria: Dict[str, Any], count: int = 10) -> List[Dict]:
+    def search_music(self, search_criteria: Dict[str, Any], count: int = 10, bypass_cache: bool = False) -> List[Dict]:
         """
         Search for music based on search criteria
         
         Args:
             search_criteria: Dictionary containing search parameters (artist, genre, term)
             count: Number of results to return
+            bypass_cache: Skip the response cache for this call
             
         Returns:
-            List of music dictionaries with details
+            List of SongRecord items (a single {"error": ...} dict on failure)
         """
+        return self.cache.get_or_fetch(
+            "itunes",
+            {"search_criteria": search_criteria, "count": count},
+            lambda: self._search_music(search_criteria, count),
+            bypass=bypass_cache
+        )
+
+    async def asearch_music(self, search_criteria: Dict[str, Any], count: int = 10, bypass_cache: bool = False) -> List[Dict]:
+        """Async variant of search_music; the iTunes request is awaited on the shared async pool"""
+        return await self.cache.aget_or_fetch(
+            "itunes",
+            {"search_criteria": search_criteria, "count": count},
+            lambda: self._asearch_music(search_criteria, count),
+            bypass=bypass_cache
+        )
+
+    def _search_music(self, search_criteria: Dict[str, Any], count: int) -> List[Dict]:
+        """Search music without consulting the cache"""
         try:
-            # Build search query
-            params = {
-                "media": "music",
-                "limit": min(count * 2, 200),  # Get more than needed to filter
-                "country": "US"  # Default to US store
-            }
-            
-            # Handle different search types
-            if 'artist' in search_criteria and search_criteria['artist']:
-                params["term"] = search_criteria['artist']
-                params["attribute"] = "artistTerm"
-                search_type = 'artist'
-                search_value = search_criteria['artist']
-            elif 'genre' in search_criteria and search_criteria['genre']:
-                params["term"] = search_criteria['genre']
-                params["attribute"] = "genreIndex"
-                search_type = 'genre'
-                search_value = search_criteria['genre']
-            elif 'term' in search_criteria and search_criteria['term']:
-                params["term"] = search_criteria['term']
-                search_type = 'term'
-                search_value = search_criteria['term']
-            else:
+            request = self._build_music_request(search_criteria, count)
+            if request is None:
                 return [{"error": "Please provide search criteria for music (artist, genre, or term)"}]
+            params, search_type, search_value = request
             
             # Make the request
-            response = requests.get(self.base_url, params=params)
-            data = response.json()
-            
-            if not data.get('results') or len(data['results']) == 0:
-                return [{"error": f"No music found for {search_type}: {search_value}"}]
+            response = self.http.get(self.base_url, params=params)
+            return self._parse_music_response(response.content, search_type, search_value, count)
             
-            # Filter and format results
-            songs = self._format_results(data['results'], search_type, search_value)
-            
-            # Get the most relevant results and sort by popularity
-            songs.sort(key=lambda x: x.get('popularity', 0), reverse=True)
+        except Exception as e:
+            trace_error("provider", e, provider="itunes")
+            return [{"error": f"Failed to fetch music: {str(e)}"}]
+    
+    async def _asearch_music(self, search_criteria: Dict[str, Any], count: int) -> List[Dict]:
+        """Async search music without consulting the cache"""
+        try:
+            request = self._build_music_request(search_criteria, count)
+            if request is None:
+                return [{"error": "Please provide search criteria for music (artist, genre, or term)"}]
+            params, search_type, search_value = request
             
-            return songs[:count]
+            response = await get_async_http_client().get(self.base_url, params=params)
+            return self._parse_music_response(response.content, search_type, search_value, count)
             
         except Exception as e:
-            print(f"iTunes API error: {str(e)}")
+            trace_error("provider", e, provider="itunes")
             return [{"error": f"Failed to fetch music: {str(e)}"}]
     
-    def _format_results(self, results: List[Dict], search_type: str, search_value: str) -> List[Dict]:
-        """Format API results into standardized music items"""
+    def _build_music_request(self, search_criteria: Dict[str, Any], count: int):
+        """Build iTunes query params; returns (params, search_type, search_value) or None without criteria"""
+        # Build search query
+        params = {
+            "media": "music",
+            "limit": min(count * 2, 200),  # Get more than needed to filter
+            "country": "US"  # Default to US store
+        }
+        
+        # Handle different search types
+        if 'artist' in search_criteria and search_criteria['artist']:
+            params["term"] = search_criteria['artist']
+            params["attribute"] = "artistTerm"
+            search_type = 'artist'
+            search_value = search_criteria['artist']
+        elif 'genre' in search_criteria and search_criteria['genre']:
+            params["term"] = search_criteria['genre']
+            params["attribute"] = "genreIndex"
+            search_type = 'genre'
+            search_value = search_criteria['genre']
+        elif 'term' in search_criteria and search_criteria['term']:
+            params["term"] = search_criteria['term']
+            search_type = 'term'
+            search_value = search_criteria['term']
+        else:
+            return None
+        
+        return params, search_type, search_value
+    
+    def _parse_music_response(self, content: bytes, search_type: str, search_value: str, count: int) -> List[Dict]:
+        """Turn an iTunes search response body into the top `count` song records"""
+        # Every result is ranked below, so all are read, but only the fields a song uses
+        results = list(json_decode.iter_items(content, "results", fields=ITUNES_FIELDS))
+        if not results:
+            return [{"error": f"No music found for {search_type}: {search_value}"}]
+        
+        # Filter and format results
+        songs = self._format_results(results)
+        
+        # Get the most relevant results and sort by popularity
+        songs.sort(key=lambda song: song.popularity, reverse=True)
+        
+        return songs[:count]
+    
+    def _format_results(self, results: List[Dict]) -> List[SongRecord]:
+        """Format API results into song records"""
         songs = []
         
         for result in results:
@@ -420,25 +646,18 @@ class ITunesMusicTools:
             if artwork_url:
                 artwork_url = artwork_url.replace('100x100', '150x150')
             
-            # Modified preview URL handling
-            preview_url = result.get('previewUrl', '')
-            if preview_url:
-                # Create HTML5 audio player embed code
-                preview_url = f'<audio controls style="height:30px"><source src="{preview_url}" type="audio/mpeg"></audio>'
-            
-            songs.append({
-                'title': result.get('trackName', 'Unknown Track'),
-                'artist': result.get('artistName', 'Unknown Artist'),
-                'album': result.get('collectionName', 'Unknown Album'),
-                'genre': result.get('primaryGenreName', 'Unknown Genre'),
-                'release_date': result.get('releaseDate', 'Unknown').split('T')[0],
-                'preview_url': preview_url,
-                'artwork': artwork_url,
-                'track_url': result.get('trackViewUrl', ''),
-                'popularity': popularity,
-                'search_type': search_type,
-                'search_value': search_value
-            })
+            # The plain preview URL; the audio player is rendered at presentation time
+            songs.append(SongRecord(
+                title=result.get('trackName', 'Unknown Track'),
+                artist=result.get('artistName', 'Unknown Artist'),
+                album=result.get('collectionName', 'Unknown Album'),
+                genre=result.get('primaryGenreName', 'Unknown Genre'),
+                release_date=result.get('releaseDate', 'Unknown').split('T')[0],
+                preview_url=result.get('previewUrl', ''),
+                artwork=artwork_url,
+                track_url=result.get('trackViewUrl', ''),
+                popularity=popularity
+            ))
         
         return songs
 
@@ -446,113 +665,147 @@ class ITunesMusicTools:
 class NewsTools:
     """Tools for fetching and summarizing news using SERP API"""
     
-    def __init__(self, api_key):
+    def __init__(self, api_key, http_client: Optional[PooledHTTPClient] = None,
+                 cache: Optional[TieredCache] = None):
         self.api_key = api_key
         self.base_url = "https://serpapi.com/search"
+        self.http = http_client or get_http_client()
+        self.cache = cache or get_response_cache()
     
-    def fetch_news(self, search_query: str, count: int = 5) -> List[Dict]:
+    def fetch_news(self, search_query: str, count: int = 5, bypass_cache: bool = False) -> List[Dict]:
         """
         Fetch news articles based on search query
         
         Args:
             search_query: News topic or search term
             count: Number of news articles to return
+            bypass_cache: Skip the response cache for this call
             
         Returns:
-            List of news article dictionaries
+            List of NewsRecord items (a single {"error": ...} dict on failure)
         """
+        return self.cache.get_or_fetch(
+            "news",
+            {"search_query": search_query, "count": count},
+            lambda: self._fetch_news(search_query, count),
+            bypass=bypass_cache
+        )
+
+    def _fetch_news(self, search_query: str, count: int) -> List[Dict]:
+        """Fetch news without consulting the cache"""
         try:
             # Make request to SERP API
-            params = {
-                "api_key": self.api_key,
-                "engine": "google",
-                "q": search_query + " news",
-                "tbm": "nws",
-                "num": count * 2  # Get more than needed to filter
-            }
-            
-            response = requests.get(self.base_url, params=params)
-            data = response.json()
-            
-            if not data.get('news_results') or len(data['news_results']) == 0:
-                return [{"error": f"No news found for: {search_query}"}]
-            
-            # Format and filter results
-            news_articles = []
-            
-            for article in data['news_results'][:count]:
-                news_articles.append({
-                    'title': article.get('title', 'Untitled Article'),
-                    'source': article.get('source', 'Unknown Source'),
-                    'date': article.get('date', 'Unknown Date'),
-                    'link': article.get('link', '#'),
-                    'thumbnail': article.get('thumbnail', 'https://via.placeholder.com/150'),
-                    'snippet': article.get('snippet', 'No description available')
-                })
-            
-            return news_articles
+            response = self.http.get(self.base_url, params=self._build_news_params(search_query, count))
+            return self._parse_news_response(response.content, search_query, count)
             
         except Exception as e:
-            print(f"News API error: {str(e)}")
+            trace_error("provider", e, provider="serp", tool="news")
             return [{"error": f"Failed to fetch news: {str(e)}"}]
 
+    def _build_news_params(self, search_query: str, count: int) -> Dict[str, Any]:
+        return {
+            "api_key": self.api_key,
+            "engine": "google",
+            "q": search_query + " news",
+            "tbm": "nws",
+            "num": count * 2  # Get more than needed to filter
+        }
+
+    def _parse_news_response(self, content: bytes, search_query: str, count: int) -> List[Dict]:
+        """Turn a SERP news response body into `count` article records"""
+        articles = json_decode.take(content, "news_results", count, fields=SERP_NEWS_FIELDS)
+        if not articles:
+            return [{"error": f"No news found for: {search_query}"}]
+        
+        # Format and filter results
+        news_articles = []
+        
+        for article in articles:
+            news_articles.append(NewsRecord(
+                title=article.get('title', 'Untitled Article'),
+                source=article.get('source', 'Unknown Source'),
+                date=article.get('date', 'Unknown Date'),
+                link=article.get('link', '#'),
+                thumbnail=article.get('thumbnail', 'https://via.placeholder.com/150'),
+                snippet=article.get('snippet', 'No description available')
+            ))
+        
+        return news_articles
+
 
 class GeneralSearchTools:
     """Tools for general web search queries using SERP API"""
     
-    def __init__(self, api_key):
+    def __init__(self, api_key, http_client: Optional[PooledHTTPClient] = None,
+                 cache: Optional[TieredCache] = None):
         self.api_key = api_key
         self.base_url = "https://serpapi.com/search"
+        self.http = http_client or get_http_client()
+        self.cache = cache or get_response_cache()
     
-    def web_search(self, query: str, count: int = 10) -> Dict:
+    def web_search(self, query: str, count: int = 10, bypass_cache: bool = False) -> Dict:
         """
         Perform a general web search
         
         Args:
             query: Search query
             count: Number of results to return
+            bypass_cache: Skip the response cache for this call
             
         Returns:
-            Dictionary with search results and knowledge graph if available
+            Dictionary with WebResult organic results and a KnowledgeGraph if available
         """
+        return self.cache.get_or_fetch(
+            "web",
+            {"query": query, "count": count},
+            lambda: self._web_search(query, count),
+            bypass=bypass_cache
+        )
+
+    def _web_search(self, query: str, count: int) -> Dict:
+        """Perform a web search without consulting the cache"""
         try:
             # Make request to SERP API
-            params = {
-                "api_key": self.api_key,
-                "engine": "google",
-                "q": query,
-                "num": count
-            }
-            
-            response = requests.get(self.base_url, params=params)
-            data = response.json()
-            
-            result = {
-                "search_query": query,
-                "knowledge_graph": None,
-                "organic_results": []
-            }
-            
-            # Extract knowledge graph if available
-            if 'knowledge_graph' in data:
-                result["knowledge_graph"] = {
-                    "title": data['knowledge_graph'].get('title', ''),
-                    "type": data['knowledge_graph'].get('type', ''),
-                    "description": data['knowledge_graph'].get('description', ''),
-                    "thumbnail": data['knowledge_graph'].get('thumbnail', '')
-                }
-            
-            # Extract organic results
-            if 'organic_results' in data:
-                for item in data['organic_results'][:count]:
-                    result["organic_results"].append({
-                        "title": item.get('title', ''),
-                        "link": item.get('link', ''),
-                        "snippet": item.get('snippet', '')
-                    })
-            
-            return result
+            response = self.http.get(self.base_url, params=self._build_search_params(query, count))
+            return self._parse_search_response(response.content, query, count)
             
         except Exception as e:
-            print(f"Search API error: {str(e)}")
-            return {"error": f"Failed to perform search: {str(e)}"}
\ No newline at end of file
+            trace_error("provider", e, provider="serp", tool="web")
+            return {"error": f"Failed to perform search: {str(e)}"}
+
+    def _build_search_params(self, query: str, count: int) -> Dict[str, Any]:
+        return {
+            "api_key": self.api_key,
+            "engine": "google",
+            "q": query,
+            "num": count
+        }
+
+    def _parse_search_response(self, content: bytes, query: str, count: int) -> Dict:
+        """Extract the knowledge graph and the first `count` organic results from a SERP response body"""
+        result = {
+            "search_query": query,
+            "knowledge_graph": None,
+            "organic_results": []
+        }
+        
+        # Extract knowledge graph if available
+        body = json_decode.parse(content)
+        knowledge_graph = json_decode.select(body, ("knowledge_graph",)).get('knowledge_graph')
+        if isinstance(knowledge_graph, dict):
+            result["knowledge_graph"] = KnowledgeGraph(
+                title=knowledge_graph.get('title', ''),
+                type=knowledge_graph.get('type', ''),
+                description=knowledge_graph.get('description', ''),
+                thumbnail=knowledge_graph.get('thumbnail', '')
+            )
+        
+        # Extract organic results
+        for item in json_decode.take(body, "organic_results", count, fields=SERP_ORGANIC_FIELDS):
+            result["organic_results"].append(WebResult(
+                title=item.get('title', ''),
+                link=item.get('link', ''),
+                snippet=item.get('snippet', '')
+            ))
+        
+        return result
@@ -0,0 +1,65 @@
+"""
+Per-request crew setup overhead: building Agent/Task/Crew on every request
+versus checking a pre-built crew out of a SearchPipeline.
+
+Only setup is timed; crews are never kicked off, so no LLM or API calls are made.
+
+Run from the repository root:
+    python -m benchmarks.bench_crew_setup --iterations 200
+"""
+import argparse
+import statistics
+import time
+
+from crewai import Crew
+from unified_crewai import UnifiedSearchCrew
+
+
+def time_calls(fn, iterations):
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def report(label, samples):
+    samples = sorted(samples)
+    p95 = samples[int(len(samples) * 0.95) - 1]
+    print(f"{label:<34} mean {statistics.mean(samples):8.3f} ms   p50 {statistics.median(samples):8.3f} ms   p95 {p95:8.3f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=200)
+    args = parser.parse_args()
+
+    crew_manager = UnifiedSearchCrew("bench", "bench", "bench", prebuild_crews=1)
+    search_criteria, count = crew_manager.parse_movie_query("top 5 comedy movies from 2019")
+
+    def per_request_setup():
+        # What run_movie_search used to do before kickoff
+        agent = crew_manager.agents.create_movie_agent()
+        task = crew_manager.tasks.movie_search_task(agent, search_criteria, count)
+        Crew(agents=[agent], tasks=[task], verbose=True)
+
+    pipeline = crew_manager.pipelines["movie"]
+
+    def pipeline_checkout():
+        # What run_movie_search does now before kickoff: build inputs, take and return a pooled crew
+        crew_manager.tasks.movie_search_inputs(search_criteria, count)
+        crew = pipeline._idle.get_nowait()
+        pipeline._idle.put_nowait(crew)
+
+    # Warm imports and lazy pydantic schema builds before timing
+    per_request_setup()
+    pipeline_checkout()
+
+    print(f"Crew setup overhead over {args.iterations} iterations")
+    report("per-request Agent/Task/Crew", time_calls(per_request_setup, args.iterations))
+    report("pre-built pipeline checkout", time_calls(pipeline_checkout, args.iterations))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+"""
+Offline end-to-end throughput and latency per query type, through
+UnifiedSearchCrew.run and through the Flask endpoints.
+
+Provider calls are replayed from fixtures and the LLM is the canned FakeLLMBackend
+(see provider_replay.py), so no keys or network are needed. Without --fixtures the
+synthetic payloads from benchmarks/payloads.py are used. Caches are bypassed and
+rate limits lifted unless --cache / --rate-limits ask for them.
+
+Run from the repository root:
+    python -m benchmarks.bench_e2e --concurrency 8 --requests 40
+    python -m benchmarks.bench_e2e --target flask --latency-ms 80 --llm-latency-ms 600 --error-rate 0.02
+"""
+import argparse
+import contextlib
+import json
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+
+CORPUS = {
+    "movie": ["top 5 comedy movies", "movies with Tom Hanks", "films directed by Christopher Nolan",
+              "top 10 horror movies from 2019", "Inception film"],
+    "music": ["songs by Taylor Swift", "top 10 jazz songs", "album by The Beatles", "punjabi music"],
+    "news": ["latest news on the Mars rover", "news about AI regulation", "top 3 headlines today"],
+    "general": ["what is the capital of France", "how does photosynthesis work", "who won the cricket world cup"],
+}
+
+
+def percentile(samples, fraction):
+    """Nearest-rank percentile of an already sorted list"""
+    if not samples:
+        return 0.0
+    return samples[min(len(samples) - 1, max(0, int(round(fraction * len(samples))) - 1))]
+
+
+def crew_search(crew, query_type, use_cache):
+    def search(query):
+        result = crew.run(query, bypass_cache=not use_cache)
+        return "error" in result and "result" not in result
+    return search
+
+
+def flask_search(app, query_type):
+    clients = threading.local()
+
+    def search(query):
+        # Flask test clients are not thread-safe; keep one per worker thread
+        if not hasattr(clients, "client"):
+            clients.client = app.test_client()
+        response = clients.client.post(f"/api/{query_type}", json={"user_input": query})
+        return response.status_code != 200 or "error" in response.get_json()
+    return search
+
+
+def run_load(search, queries, requests, concurrency):
+    """Issue requests searches (cycling through queries) at fixed concurrency"""
+    def timed(index):
+        started = time.perf_counter()
+        try:
+            failed = search(queries[index % len(queries)])
+        except Exception:
+            failed = True
+        return (time.perf_counter() - started) * 1000, failed
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        samples = list(executor.map(timed, range(requests)))
+    elapsed = time.perf_counter() - started
+
+    latencies = sorted(latency for latency, _ in samples)
+    return {
+        "requests": requests,
+        "errors": sum(1 for _, failed in samples if failed),
+        "throughput_rps": round(requests / elapsed, 2),
+        "p50_ms": round(percentile(latencies, 0.50), 1),
+        "p95_ms": round(percentile(latencies, 0.95), 1),
+        "p99_ms": round(percentile(latencies, 0.99), 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--target", choices=("crew", "flask", "both"), default="crew")
+    parser.add_argument("--types", default="movie,music,news,general", help="Comma-separated query types")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=40, help="Requests per query type")
+    parser.add_argument("--fixtures", help="Directory of recorded provider bodies (default: synthetic)")
+    parser.add_argument("--latency-ms", type=float, default=50.0, help="Replayed provider latency")
+    parser.add_argument("--llm-latency-ms", type=float, default=400.0, help="Fake LLM latency per call")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Injected error rate for providers and the LLM")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--cache", action="store_true", help="Keep the answer and response caches enabled")
+    parser.add_argument("--rate-limits", action="store_true", help="Keep the configured provider rate limits")
+    parser.add_argument("--verbose", action="store_true", help="Show crewai agent output")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+
+    # Settings are read when the modules build their clients, so set them before importing
+    os.environ.setdefault("REPLAY_LATENCY_MS", str(args.latency_ms))
+    os.environ.setdefault("REPLAY_LATENCY_MS_TOGETHER", str(args.llm_latency_ms))
+    os.environ.setdefault("REPLAY_ERROR_RATE", str(args.error_rate))
+    os.environ.setdefault("REPLAY_SEED", str(args.seed))
+    os.environ.setdefault("SEARCH_CACHE_DISK", "0")
+    os.environ.setdefault("ANSWER_CACHE_DISK", "0")
+    if not args.cache:
+        os.environ.setdefault("SEARCH_CACHE_BYPASS", "1")
+        os.environ.setdefault("ANSWER_CACHE_BYPASS", "1")
+    # Keep crewai and litellm from reaching the network
+    os.environ.setdefault("CREWAI_DISABLE_TELEMETRY", "true")
+    os.environ.setdefault("OTEL_SDK_DISABLED", "true")
+    os.environ.setdefault("LITELLM_LOCAL_MODEL_COST_MAP", "True")
+    if args.verbose:
+        os.environ.setdefault("CREW_VERBOSE", "1")
+
+    import provider_replay
+    from benchmarks.payloads import write_payloads
+    from rate_limit import RateLimiter, configure_rate_limiter
+
+    fixtures = args.fixtures or write_payloads(tempfile.mkdtemp(prefix="replay-fixtures-"))
+    store = provider_replay.install_replay(fixtures)
+    if not args.rate_limits:
+        configure_rate_limiter(RateLimiter())
+
+    query_types = [query_type.strip() for query_type in args.types.split(",") if query_type.strip()]
+    targets = ("crew", "flask") if args.target == "both" else (args.target,)
+    quiet = contextlib.nullcontext if args.verbose else lambda: contextlib.redirect_stdout(open(os.devnull, "w"))
+
+    results = {}
+    for target in targets:
+        if target == "crew":
+            from unified_crewai import UnifiedSearchCrew
+            crew = UnifiedSearchCrew("replay", "replay", "replay")
+            make_search = lambda query_type: crew_search(crew, query_type, args.cache)
+        else:
+            from unified_main import app
+            make_search = lambda query_type: flask_search(app, query_type)
+
+        for query_type in query_types:
+            search = make_search(query_type)
+            with quiet():
+                # One untimed request per query builds the type's crew and warms lazy imports
+                for query in CORPUS[query_type]:
+                    search(query)
+                results[f"{target}/{query_type}"] = run_load(search, CORPUS[query_type], args.requests, args.concurrency)
+
+    if args.json:
+        print(json.dumps({"results": results, "fixture_calls": store.calls}, indent=2))
+        return
+
+    print(f"concurrency {args.concurrency}, {args.requests} requests per type, provider latency {args.latency_ms:g} ms, "
+          f"LLM latency {args.llm_latency_ms:g} ms, error rate {args.error_rate:g}")
+    print(f"{'target/type':<16} {'requests':>8} {'errors':>6} {'req/s':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    for name, stats in results.items():
+        print(f"{name:<16} {stats['requests']:>8} {stats['errors']:>6} {stats['throughput_rps']:>8.2f} "
+              f"{stats['p50_ms']:>9.1f} {stats['p95_ms']:>9.1f} {stats['p99_ms']:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
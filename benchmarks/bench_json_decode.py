@@ -0,0 +1,106 @@
+"""
+Parse time and peak memory for provider responses: the previous full
+response.json() decode versus json_decode's projected parsing, per decoder.
+
+Payloads are read from --payload-dir when given (recorded response bodies named
+as provider_replay fixtures, e.g. itunes_search.json or tmdb_movie_details.json);
+otherwise the synthetic bodies in benchmarks/payloads.py are used. Every
+decoder's output is checked against the full decode before timing.
+
+Run from the repository root:
+    python -m benchmarks.bench_json_decode --rounds 50
+    python -m benchmarks.bench_json_decode --payload-dir recorded/
+"""
+import argparse
+import json
+import os
+import time
+import tracemalloc
+
+import json_decode
+from benchmarks.payloads import synthetic_payloads
+from api_tools import (GeneralSearchTools, ITunesMusicTools, NewsTools, TMDBMovieTools,
+                       TMDB_CREDIT_FIELDS)
+
+
+def load_payloads(payload_dir):
+    if not payload_dir:
+        return {name: json.dumps(payload).encode("utf-8") for name, payload in synthetic_payloads().items()}
+    payloads = {}
+    for name in sorted(os.listdir(payload_dir)):
+        with open(os.path.join(payload_dir, name), "rb") as f:
+            payloads[name] = f.read()
+    return payloads
+
+
+# Previous extraction: full decode, then read the same values
+def legacy_credits(body):
+    return [{k: c[k] for k in TMDB_CREDIT_FIELDS if k in c} for c in json.loads(body)["cast"]]
+
+
+def make_cases():
+    movies = TMDBMovieTools("bench", "bench")
+    music = ITunesMusicTools()
+    news = NewsTools("bench")
+    web = GeneralSearchTools("bench")
+    return {
+        "itunes_search.json": lambda body: music._parse_music_response(body, "artist", "taylor swift", 10),
+        "tmdb_search_person.json": lambda body: json_decode.take(body, "results", 1, fields=("id",)),
+        "tmdb_person_credits.json": lambda body: list(json_decode.iter_items(body, "cast", fields=TMDB_CREDIT_FIELDS)),
+        "tmdb_discover.json": lambda body: json_decode.take(body, "results", 10, fields=("id",)),
+        "tmdb_genres.json": lambda body: list(json_decode.iter_items(body, "genres", fields=("id", "name"))),
+        "tmdb_movie_details.json": lambda body: movies._parse_movie_details(body, 27205),
+        "serp_search.json": lambda body: web._parse_search_response(body, "query", 10),
+        "serp_news.json": lambda body: news._parse_news_response(body, "query", 5),
+    }
+
+
+def run(fn, body, rounds):
+    """Returns (mean ms per parse, peak traced KiB for one parse)"""
+    fn(body)
+    start = time.perf_counter()
+    for _ in range(rounds):
+        fn(body)
+    elapsed = (time.perf_counter() - start) / rounds * 1000
+    tracemalloc.start()
+    fn(body)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rounds", type=int, default=50)
+    parser.add_argument("--payload-dir", help="Directory of recorded response bodies")
+    args = parser.parse_args()
+
+    decoders = ["json"] + [name for name, module in (("orjson", json_decode.orjson), ("ijson", json_decode.ijson))
+                           if module is not None]
+    payloads = load_payloads(args.payload_dir)
+    cases = make_cases()
+
+    print(f"{'payload':<26} {'size':>8}  {'decoder':<16} {'ms/parse':>9} {'peak KiB':>9}")
+    for name, body in payloads.items():
+        case = cases.get(name)
+        if case is None:
+            print(f"{name:<26} skipped (no extraction for this file name)")
+            continue
+
+        # Reference: the full decode response.json() did, before any extraction
+        ms, peak = run(json.loads, body, args.rounds)
+        print(f"{name:<26} {len(body) / 1024:7.0f}K  {'response.json()':<16} {ms:9.3f} {peak:9.0f}")
+
+        json_decode.DECODER = "json"
+        expected = case(body)
+        if name == "tmdb_person_credits.json":
+            assert expected == legacy_credits(body)
+        for decoder in decoders:
+            json_decode.DECODER = decoder
+            assert case(body) == expected, f"{decoder} output differs for {name}"
+            ms, peak = run(case, body, args.rounds)
+            print(f"{'':<26} {'':>8}  {'projected ' + decoder:<16} {ms:9.3f} {peak:9.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,199 @@
+"""
+Queries/second for query classification + criteria parsing: the previous
+per-call implementation (kept below as a reference) versus query_engine.
+
+Both paths are checked for identical output on the corpus before timing.
+
+Run from the repository root:
+    python -m benchmarks.bench_query_engine --rounds 200
+"""
+import argparse
+import re
+import time
+
+import query_engine
+
+
+CORPUS = [
+    "top 5 comedy movies",
+    "best 5 comedy films",
+    "movies with Tom Hanks",
+    "Inception film",
+    "films directed by Christopher Nolan",
+    "top 10 horror movies from 2019",
+    "movies rated above 8.5",
+    "sci-fi movies starring Keanu Reeves",
+    "latest Nolan film",
+    "songs by Taylor Swift",
+    "top 10 jazz songs",
+    "punjabi music",
+    "album by The Beatles",
+    "songs about love and heartbreak",
+    "Arijit Singh",
+    "listen to some rock playlist",
+    "latest news on the Mars rover",
+    "news about AI regulation",
+    "top 3 headlines today",
+    "recent updates on the stock market",
+    "the latest articles about climate change",
+    "what is the capital of France",
+    "how does photosynthesis work",
+    "soundtrack of Interstellar movie",
+    "newsong release",
+    "who won the cricket world cup",
+    "best restaurants near me",
+    "Taylor Swift concert news",
+    "report on the new film rating system",
+    "current events in Europe",
+]
+
+
+# ----------------- Reference implementation (pre query_engine) -----------------
+
+def legacy_determine_query_type(user_input):
+    movie_keywords = ["movie", "film", "director", "actor", "actress", "genre", "rating", "imdb", "cinema"]
+    music_keywords = ["song", "music", "artist", "singer", "album", "track", "playlist", "band", "listen"]
+    news_keywords = ["news", "latest", "update", "headline", "report", "article", "journalist", "current events"]
+    movie_count = sum(1 for keyword in movie_keywords if keyword.lower() in user_input.lower())
+    music_count = sum(1 for keyword in music_keywords if keyword.lower() in user_input.lower())
+    news_count = sum(1 for keyword in news_keywords if keyword.lower() in user_input.lower())
+    if "news" in user_input.lower() or news_count > max(movie_count, music_count):
+        return "news"
+    elif any(term in user_input.lower() for term in ["song", "music", "artist", "singer"]) or music_count > movie_count:
+        return "music"
+    elif any(term in user_input.lower() for term in ["movie", "film", "director", "actor"]) or movie_count > 0:
+        return "movie"
+    else:
+        return "general"
+
+
+def legacy_parse_movie_query(user_input):
+    genre_pattern = r"(comedy|sci-fi|horror|action|drama|romance|thriller|adventure|fantasy|animation|documentary|musical|western|crime|mystery|biography|family|war|history|sport)"
+    count_pattern = r"(?:top|best)\s+(\d+)"
+    actor_pattern = r"(?:actor|star|starring|with|of)\s+([A-Z][a-z]+(?:\s+[A-Z][a-z]+){0,2})"
+    year_pattern = r"(?:from|in|year)\s+(\d{4})"
+    director_pattern = r"(?:direct(?:ed|or)|by director)\s+([A-Z][a-z]+(?:\s+[A-Z][a-z]+){0,2})"
+    rating_pattern = r"(?:rating|rated)\s+(?:above|over|higher than)\s+(\d(?:\.\d)?)"
+    genre_match = re.search(genre_pattern, user_input, re.IGNORECASE)
+    count_match = re.search(count_pattern, user_input, re.IGNORECASE)
+    actor_match = re.search(actor_pattern, user_input, re.IGNORECASE)
+    year_match = re.search(year_pattern, user_input)
+    director_match = re.search(director_pattern, user_input, re.IGNORECASE)
+    rating_match = re.search(rating_pattern, user_input, re.IGNORECASE)
+    search_criteria = {}
+    if genre_match:
+        search_criteria['genre'] = genre_match.group(1).lower()
+    count = int(count_match.group(1)) if count_match else 5
+    if actor_match:
+        search_criteria['actor'] = actor_match.group(1)
+    if year_match:
+        search_criteria['year'] = year_match.group(1)
+    if director_match:
+        search_criteria['director'] = director_match.group(1)
+    if rating_match:
+        search_criteria['min_rating'] = float(rating_match.group(1))
+    if not any(key in search_criteria for key in ['genre', 'actor', 'director']):
+        name_matches = re.findall(r"\b([A-Z][a-z]+(?:\s+[A-Z][a-z]+){0,2})\b", user_input)
+        if name_matches:
+            search_criteria['actor'] = name_matches[0]
+    return search_criteria, count
+
+
+def legacy_parse_music_query(user_input):
+    genre_pattern = r"(pop|rock|hip hop|rap|jazz|blues|country|classical|electronic|reggae|folk|metal|punk|r&b|soul|disco|indie|alternative|punjabi|hindi)"
+    count_pattern = r"(?:top|best)\s+(\d+)"
+    artist_pattern = r"(?:artist|singer|by|of)\s+([A-Z][a-z]+(?:\s+[A-Z][a-z]+){0,2})"
+    term_pattern = r"(?:about|related to|on)\s+([a-zA-Z]+(?:\s+[a-zA-Z]+){0,2})"
+    genre_match = re.search(genre_pattern, user_input, re.IGNORECASE)
+    count_match = re.search(count_pattern, user_input, re.IGNORECASE)
+    artist_match = re.search(artist_pattern, user_input, re.IGNORECASE)
+    term_match = re.search(term_pattern, user_input, re.IGNORECASE)
+    search_criteria = {}
+    if genre_match:
+        search_criteria['genre'] = genre_match.group(1).lower()
+    count = int(count_match.group(1)) if count_match else 5
+    if artist_match:
+        search_criteria['artist'] = artist_match.group(1)
+    if term_match:
+        search_criteria['term'] = term_match.group(1)
+    if not search_criteria:
+        name_matches = re.findall(r"\b([A-Z][a-z]+(?:\s+[A-Z][a-z]+){0,2})\b", user_input)
+        if name_matches:
+            search_criteria['artist'] = name_matches[0]
+    if not search_criteria:
+        search_criteria['term'] = user_input
+    return search_criteria, count
+
+
+def legacy_parse_news_query(user_input):
+    count_match = re.search(r"(?:top|latest|recent)\s+(\d+)", user_input, re.IGNORECASE)
+    count = int(count_match.group(1)) if count_match else 5
+    prefixes = [
+        r"^(?:get|find|show|tell me about|search for|what's new in|latest news on|updates on|news about)\s+",
+        r"^(?:the latest|recent|current)\s+(?:news|updates|articles|stories|reports)\s+(?:about|on|regarding|concerning)\s+"
+    ]
+    cleaned_query = user_input
+    for prefix in prefixes:
+        cleaned_query = re.sub(prefix, "", cleaned_query, flags=re.IGNORECASE)
+    return cleaned_query, count
+
+
+def legacy_analyze(user_input):
+    query_type = legacy_determine_query_type(user_input)
+    if query_type == "movie":
+        return query_type, legacy_parse_movie_query(user_input)
+    elif query_type == "music":
+        return query_type, legacy_parse_music_query(user_input)
+    elif query_type == "news":
+        return query_type, legacy_parse_news_query(user_input)
+    return query_type, None
+
+
+def engine_analyze(user_input):
+    parsed = query_engine._analyze(user_input)
+    if parsed.query_type in ("movie", "music"):
+        return parsed.query_type, (parsed.search_criteria, parsed.count)
+    elif parsed.query_type == "news":
+        return parsed.query_type, (parsed.search_query, parsed.count)
+    return parsed.query_type, None
+
+
+# ----------------- Benchmark -----------------
+
+def check_equivalence():
+    for query in CORPUS:
+        assert legacy_determine_query_type(query) == query_engine.classify_query(query), query
+        assert legacy_parse_movie_query(query) == query_engine.parse_movie(query)[:2], query
+        assert legacy_parse_music_query(query) == query_engine.parse_music(query)[:2], query
+        assert legacy_parse_news_query(query) == query_engine.parse_news(query), query
+        assert legacy_analyze(query) == engine_analyze(query), query
+
+
+def queries_per_second(fn, rounds):
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for query in CORPUS:
+            fn(query)
+    return rounds * len(CORPUS) / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rounds", type=int, default=200)
+    args = parser.parse_args()
+
+    check_equivalence()
+    print(f"Outputs identical on {len(CORPUS)} corpus queries")
+
+    # The legacy parsers were called twice per request (answer-cache key + branch), hence x2
+    legacy = queries_per_second(lambda q: (legacy_analyze(q), legacy_analyze(q)), args.rounds)
+    engine = queries_per_second(engine_analyze, args.rounds)
+    memoized = queries_per_second(query_engine.analyze_query, args.rounds)
+
+    print(f"{'legacy (classify + parse, x2 per request)':<44} {legacy:12,.0f} queries/s")
+    print(f"{'query_engine (single pass)':<44} {engine:12,.0f} queries/s   {engine / legacy:5.1f}x")
+    print(f"{'query_engine.analyze_query (memoized)':<44} {memoized:12,.0f} queries/s   {memoized / legacy:5.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""
+Memory and serialized size of provider result items: the previous per-item dicts
+(with search_type/search_value copies and an <audio> HTML preview) versus the
+slotted records in records.py.
+
+Items are synthetic, so no API calls are made. msgpack sizes are reported only
+when the msgpack package is installed.
+
+Run from the repository root:
+    python -m benchmarks.bench_records --items 100000
+"""
+import argparse
+import json
+import time
+import tracemalloc
+
+import records
+from records import MovieRecord, SongRecord
+
+
+def song_dict(i):
+    preview = f"https://audio-ssl.itunes.apple.com/preview/{i}.m4a"
+    return {
+        'title': f"Track {i}",
+        'artist': f"Artist {i % 500}",
+        'album': f"Album {i % 2000}",
+        'genre': "Pop",
+        'release_date': "2019-05-17",
+        'preview_url': f'<audio controls style="height:30px"><source src="{preview}" type="audio/mpeg"></audio>',
+        'artwork': f"https://is1-ssl.mzstatic.com/image/{i}/150x150bb.jpg",
+        'track_url': f"https://music.apple.com/us/album/{i}",
+        'popularity': 8.71,
+        'search_type': 'artist',
+        'search_value': f"Artist {i % 500}"
+    }
+
+
+def song_record(i):
+    return SongRecord(
+        title=f"Track {i}",
+        artist=f"Artist {i % 500}",
+        album=f"Album {i % 2000}",
+        genre="Pop",
+        release_date="2019-05-17",
+        preview_url=f"https://audio-ssl.itunes.apple.com/preview/{i}.m4a",
+        artwork=f"https://is1-ssl.mzstatic.com/image/{i}/150x150bb.jpg",
+        track_url=f"https://music.apple.com/us/album/{i}",
+        popularity=8.71
+    )
+
+
+def movie_dict(i):
+    return {
+        'title': f"Movie {i}", 'year': "2019", 'rating': "7.4",
+        'description': "A retired assassin is pulled back into the underworld. " * 3,
+        'thumbnail': f"https://image.tmdb.org/t/p/w500/{i}.jpg",
+        'link': f"https://www.themoviedb.org/movie/{i}", 'director': f"Director {i % 300}",
+        'runtime': 118, 'genres': "Action, Thriller", 'search_type': 'genre', 'search_value': 'action'
+    }
+
+
+def movie_record(i):
+    return MovieRecord(
+        title=f"Movie {i}", year="2019", rating="7.4",
+        description="A retired assassin is pulled back into the underworld. " * 3,
+        thumbnail=f"https://image.tmdb.org/t/p/w500/{i}.jpg",
+        link=f"https://www.themoviedb.org/movie/{i}", director=f"Director {i % 300}",
+        runtime=118, genres="Action, Thriller"
+    )
+
+
+def measure(build, n):
+    """Build n items; returns (items, traced bytes, seconds)"""
+    tracemalloc.start()
+    start = time.perf_counter()
+    items = [build(i) for i in range(n)]
+    elapsed = time.perf_counter() - start
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return items, size, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, default=100000)
+    args = parser.parse_args()
+
+    try:
+        import msgpack  # noqa: F401
+        has_msgpack = True
+    except ImportError:
+        has_msgpack = False
+
+    print(f"{args.items} items per kind")
+    for kind, as_dict, as_record in (("song", song_dict, song_record), ("movie", movie_dict, movie_record)):
+        dicts, dict_bytes, dict_s = measure(as_dict, args.items)
+        recs, record_bytes, record_s = measure(as_record, args.items)
+        print(f"{kind:<6} memory   dicts {dict_bytes / 2**20:8.1f} MiB   records {record_bytes / 2**20:8.1f} MiB"
+              f"   ({record_bytes / dict_bytes:.0%})   build {dict_s:.2f}s vs {record_s:.2f}s")
+
+        dict_json = len(json.dumps(dicts).encode("utf-8"))
+        record_json = len(records.dumps(recs).encode("utf-8"))
+        line = f"{kind:<6} storage  dict JSON {dict_json / 2**20:6.1f} MiB   record JSON {record_json / 2**20:6.1f} MiB"
+        if has_msgpack:
+            line += f"   record msgpack {len(records.packb(recs)) / 2**20:6.1f} MiB"
+        print(line)
+        assert records.loads(records.dumps(recs[:100])) == recs[:100]
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""
+Worker startup cost: cold import time of the serving modules and first-request latency.
+
+Every sample runs in a fresh interpreter, so nothing is warm from a previous run.
+The first-request phase times what a new worker pays before its first answer:
+rendering the index page, then building the crew manager (crewai is
+imported here, not at module import) and the crew for one query type. None of it makes
+LLM or search API calls. Pass --live to also time a real first /api/search
+(this needs keys.env and network access).
+
+Run from the repository root:
+    python -m benchmarks.bench_startup --repeat 5
+    python -m benchmarks.bench_startup --importtime 15     # slowest imports by cumulative time
+    python -m benchmarks.bench_startup --json >> startup.jsonl
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+
+MODULES = ("unified_agents", "unified_crewai", "unified_main")
+
+IMPORT_PROBE = """
+import json, time
+start = time.perf_counter()
+import {module}
+print(json.dumps({{"import_ms": (time.perf_counter() - start) * 1000}}))
+"""
+
+FIRST_REQUEST_PROBE = """
+import json, time
+timings = {{}}
+start = time.perf_counter()
+import unified_main
+timings["import_ms"] = (time.perf_counter() - start) * 1000
+
+client = unified_main.app.test_client()
+start = time.perf_counter()
+client.get("/")
+timings["index_ms"] = (time.perf_counter() - start) * 1000
+
+# The crew manager (crewai, agents, caches) is built lazily, so the first request pays for it
+start = time.perf_counter()
+crew_manager = unified_main.get_crew_manager()
+crew_manager.pipelines[crew_manager.determine_query_type({query!r})]._new_crew()
+timings["first_crew_ms"] = (time.perf_counter() - start) * 1000
+
+if {live!r}:
+    start = time.perf_counter()
+    client.post("/api/search", json={{"user_input": {query!r}, "bypass_cache": True}})
+    timings["first_search_ms"] = (time.perf_counter() - start) * 1000
+print(json.dumps(timings))
+"""
+
+
+def run_probe(code):
+    """Run probe code in a fresh interpreter from the repository root; returns its JSON timings"""
+    completed = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True,
+                               cwd=os.getcwd(), check=True)
+    # Probes print their timings last; anything before that is the app's own output
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def slowest_imports(module, top):
+    """Parse -X importtime output into (cumulative_ms, module) pairs, slowest first"""
+    completed = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                               capture_output=True, text=True, cwd=os.getcwd(), check=True)
+    rows = []
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        rows.append((int(cumulative) / 1000, name.strip()))
+    return sorted(rows, reverse=True)[:top]
+
+
+def summarize(samples):
+    keys = samples[0].keys()
+    return {key: {"median": round(statistics.median(s[key] for s in samples), 1),
+                  "min": round(min(s[key] for s in samples), 1)} for key in keys}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=5, help="Fresh interpreters per measurement")
+    parser.add_argument("--query", default="latest news on renewable energy",
+                        help="Query whose type's crew is built in the first-request phase")
+    parser.add_argument("--live", action="store_true", help="Also time a real first /api/search for --query")
+    parser.add_argument("--importtime", type=int, default=0, metavar="N",
+                        help="Print the N slowest imports (cumulative) for unified_main")
+    parser.add_argument("--json", action="store_true", help="Print one JSON line instead of a table")
+    args = parser.parse_args()
+
+    results = {}
+    for module in MODULES:
+        results[module] = summarize([run_probe(IMPORT_PROBE.format(module=module)) for _ in range(args.repeat)])
+
+    probe = FIRST_REQUEST_PROBE.format(query=args.query, live=args.live)
+    results["first_request"] = summarize([run_probe(probe) for _ in range(args.repeat)])
+
+    if args.json:
+        print(json.dumps({"python": sys.version.split()[0], "repeat": args.repeat, "results": results}))
+    else:
+        print(f"Startup over {args.repeat} fresh interpreters (median / min, ms)")
+        for name, timings in results.items():
+            for key, value in timings.items():
+                print(f"  {name + ' ' + key:<40} {value['median']:9.1f} {value['min']:9.1f}")
+
+    if args.importtime:
+        print("\nSlowest imports under unified_main (cumulative ms)")
+        for cumulative, name in slowest_imports("unified_main", args.importtime):
+            print(f"  {cumulative:9.1f}  {name}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+Synthetic provider response bodies shared by the benchmarks.
+
+Each entry is named after the provider_replay fixture it stands in for and has
+the shape, field count and list lengths of the real TMDB, iTunes and SERP API
+responses, so parsing and replay costs are representative without recordings.
+"""
+import json
+import os
+
+
+def synthetic_payloads():
+    """Response bodies shaped like the real providers' (field counts and list lengths)"""
+    track = lambda i: {
+        "wrapperType": "track", "kind": "song", "artistId": 159260351, "collectionId": 1440857781 + i,
+        "trackId": 1440857786 + i, "artistName": "Taylor Swift", "collectionName": f"Album {i % 12}",
+        "trackName": f"Track {i}", "collectionCensoredName": f"Album {i % 12}", "trackCensoredName": f"Track {i}",
+        "artistViewUrl": "https://music.apple.com/us/artist/taylor-swift/159260351?uo=4",
+        "collectionViewUrl": f"https://music.apple.com/us/album/{i}?uo=4",
+        "trackViewUrl": f"https://music.apple.com/us/album/{i}?i={i}&uo=4",
+        "previewUrl": f"https://audio-ssl.itunes.apple.com/itunes-assets/AudioPreview/{i}.m4a",
+        "artworkUrl30": f"https://is1-ssl.mzstatic.com/image/{i}/30x30bb.jpg",
+        "artworkUrl60": f"https://is1-ssl.mzstatic.com/image/{i}/60x60bb.jpg",
+        "artworkUrl100": f"https://is1-ssl.mzstatic.com/image/{i}/100x100bb.jpg",
+        "collectionPrice": 10.99, "trackPrice": 1.29, "releaseDate": "2014-10-27T12:00:00Z",
+        "collectionExplicitness": "notExplicit", "trackExplicitness": "notExplicit", "discCount": 1,
+        "discNumber": 1, "trackCount": 16, "trackNumber": i % 16 + 1, "trackTimeMillis": 231827,
+        "country": "USA", "currency": "USD", "primaryGenreName": "Pop", "isStreamable": True
+    }
+    credit = lambda i, job=None: dict({
+        "adult": False, "backdrop_path": f"/{i}.jpg", "genre_ids": [18, 10749], "id": 1000 + i,
+        "original_language": "en", "original_title": f"Movie {i}", "overview": "A story about people. " * 12,
+        "popularity": 12.5 + i, "poster_path": f"/p{i}.jpg", "release_date": f"{1990 + i % 30}-05-01",
+        "title": f"Movie {i}", "video": False, "vote_average": round(5 + (i % 40) / 10, 1), "vote_count": 1200 + i,
+        "credit_id": f"52fe4{i:08d}", "order": i
+    }, **({"character": f"Role {i}"} if job is None else {"job": job, "department": "Directing"}))
+    person = lambda i: {"id": 500 + i, "name": f"Person {i}", "character": f"Role {i}", "credit_id": f"c{i}",
+                        "order": i, "profile_path": f"/pr{i}.jpg", "known_for_department": "Acting",
+                        "popularity": 3.2, "gender": 2, "adult": False, "original_name": f"Person {i}"}
+    organic = lambda i: {"position": i + 1, "title": f"Result {i}", "link": f"https://example.com/{i}",
+                         "displayed_link": f"example.com › {i}", "snippet": "An explanation of the topic. " * 6,
+                         "snippet_highlighted_words": ["topic"], "sitelinks": {"inline": [{"title": "More", "link": "#"}] * 4},
+                         "about_this_result": {"source": {"description": "A website. " * 10}}, "cached_page_link": "#"}
+    article = lambda i: {"position": i + 1, "title": f"Headline {i}", "link": f"https://news.example.com/{i}",
+                         "source": "Example News", "date": f"{i + 1} hours ago", "snippet": "What happened today. " * 5,
+                         "thumbnail": f"https://encrypted-tbn0.gstatic.com/images?q={i}",
+                         "stories": [{"title": f"Related {j}", "link": "#", "source": "Other", "date": "1 day ago"} for j in range(3)]}
+    metadata = {"search_metadata": {"id": "abc", "status": "Success", "json_endpoint": "https://serpapi.com/searches/abc.json",
+                                    "created_at": "2025-01-01 00:00:00 UTC", "total_time_taken": 1.2},
+                "search_parameters": {"engine": "google", "q": "query", "num": "20"},
+                "search_information": {"total_results": 123000000, "time_taken_displayed": 0.42}}
+    return {
+        "itunes_search.json": {"resultCount": 200, "results": [track(i) for i in range(200)]},
+        "tmdb_search_person.json": {"page": 1, "total_pages": 1, "total_results": 3,
+                                    "results": [dict(person(i), known_for=[credit(j) for j in range(3)]) for i in range(3)]},
+        "tmdb_discover.json": {"page": 1, "total_pages": 500, "total_results": 10000,
+                               "results": [{k: v for k, v in credit(i).items() if k not in ("character", "credit_id", "order")}
+                                           for i in range(20)]},
+        "tmdb_genres.json": {"genres": [{"id": 28, "name": "Action"}, {"id": 12, "name": "Adventure"},
+                                        {"id": 16, "name": "Animation"}, {"id": 35, "name": "Comedy"},
+                                        {"id": 80, "name": "Crime"}, {"id": 99, "name": "Documentary"},
+                                        {"id": 18, "name": "Drama"}, {"id": 10751, "name": "Family"},
+                                        {"id": 14, "name": "Fantasy"}, {"id": 36, "name": "History"},
+                                        {"id": 27, "name": "Horror"}, {"id": 10402, "name": "Music"},
+                                        {"id": 9648, "name": "Mystery"}, {"id": 10749, "name": "Romance"},
+                                        {"id": 878, "name": "Science Fiction"}, {"id": 53, "name": "Thriller"},
+                                        {"id": 10752, "name": "War"}, {"id": 37, "name": "Western"}]},
+        "tmdb_person_credits.json": {"id": 31, "cast": [credit(i) for i in range(350)],
+                                     "crew": [credit(i, "Director" if i % 4 == 0 else "Producer") for i in range(80)]},
+        "tmdb_movie_details.json": dict({
+            "adult": False, "backdrop_path": "/b.jpg", "budget": 160000000, "genres": [{"id": 28, "name": "Action"},
+            {"id": 878, "name": "Science Fiction"}], "homepage": "https://example.com", "id": 27205,
+            "imdb_id": "tt1375666", "original_language": "en", "original_title": "Inception",
+            "overview": "A thief who steals corporate secrets. " * 6, "popularity": 83.9, "poster_path": "/p.jpg",
+            "production_companies": [{"id": i, "name": f"Studio {i}", "logo_path": None, "origin_country": "US"} for i in range(4)],
+            "release_date": "2010-07-15", "revenue": 825532764, "runtime": 148, "status": "Released",
+            "tagline": "Your mind is the scene of the crime.", "title": "Inception", "video": False,
+            "vote_average": 8.4, "vote_count": 35000,
+        }, credits={"cast": [person(i) for i in range(250)],
+                    "crew": [dict(person(i), job="Director" if i == 40 else "Crew", department="Crew") for i in range(300)]}),
+        "serp_search.json": dict(metadata, knowledge_graph={"title": "Topic", "type": "Concept", "description": "About. " * 20,
+                                                            "thumbnail": "https://example.com/t.png"},
+                                 organic_results=[organic(i) for i in range(20)],
+                                 related_searches=[{"query": f"related {i}", "link": "#"} for i in range(8)]),
+        "serp_news.json": dict(metadata, news_results=[article(i) for i in range(20)]),
+    }
+
+
+
+def write_payloads(directory: str) -> str:
+    """Write every synthetic payload to directory as <fixture>.json; returns the directory"""
+    os.makedirs(directory, exist_ok=True)
+    for name, payload in synthetic_payloads().items():
+        with open(os.path.join(directory, name), "w", encoding="utf-8") as f:
+            json.dump(payload, f)
+    return directory
@@ -0,0 +1,189 @@
+"""
+Offline bulk runner: execute a JSONL file of queries through UnifiedSearchCrew.
+
+Each input line is a JSON object with a "query" (or "user_input") field and an
+optional "id"; a bare JSON string also works. Results are appended to the output
+JSONL as they complete, one line per query with its answer and timings. The output
+doubles as the checkpoint: re-running the same command skips ids already answered,
+so a crashed run resumes where it stopped. Queries that failed (rate limits,
+timeouts) are run again on resume; their new line supersedes the earlier error line.
+
+Used for nightly cache warming and regression runs, e.g.:
+    python bulk_run.py queries.jsonl --output results.jsonl --workers 8 --rate serp=2 --rate tmdb=10/20
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timezone
+from typing import Dict, Iterator, List, Set, Tuple
+
+from dotenv import load_dotenv
+
+from answer_cache import answer_text
+from rate_limit import BATCH, RateLimiter, configure_rate_limiter, request_priority, track_waits
+from unified_crewai import UnifiedSearchCrew
+
+
+def read_queries(path: str) -> Iterator[Tuple[str, str]]:
+    """Yield (id, query) pairs from a JSONL file; ids default to the line number"""
+    with open(path, "r", encoding="utf-8") as f:
+        for line_number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError:
+                print(f"Skipping line {line_number}: invalid JSON")
+                continue
+            if isinstance(record, str):
+                record = {"query": record}
+            query = (record.get("query") or record.get("user_input")) if isinstance(record, dict) else None
+            if not query:
+                print(f"Skipping line {line_number}: no query field")
+                continue
+            yield str(record.get("id", line_number)), query
+
+
+def completed_ids(output_path: str) -> Set[str]:
+    """
+    Ids already answered in the output file
+
+    Error records don't count, so a resumed run retries them. A torn last line from a crash is ignored.
+    """
+    done = set()
+    if not os.path.exists(output_path):
+        return done
+    with open(output_path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+                if "error" not in record:
+                    done.add(record["id"])
+            except (ValueError, KeyError, TypeError):
+                continue
+    return done
+
+
+def parse_rates(values: List[str]) -> Dict[str, str]:
+    """Parse provider=rate[/burst] pairs (e.g. serp=2/5) into rate-limit overrides"""
+    rates = {}
+    for value in values:
+        provider, _, limit = value.partition("=")
+        rates[provider.strip().lower()] = limit
+    return rates
+
+
+def run_query(crew, query_id: str, query: str, bypass_cache: bool, submitted_at: float) -> Dict:
+    """Execute one query at batch priority and build its output record"""
+    started = time.perf_counter()
+
+    with request_priority(BATCH), track_waits() as waits:
+        try:
+            # One vertical per query, whatever SEARCH_MULTI_MODE says, so records stay comparable between runs
+            result = crew.run(query, bypass_cache=bypass_cache, multi=False)
+        except Exception as e:
+            result = {"error": str(e)}
+    finished = time.perf_counter()
+    rate_wait = sum(waits, 0.0)
+
+    record = {"id": query_id, "query": query, "type": result.get("type") or crew.determine_query_type(query)}
+    if "error" in result and "result" not in result:
+        record["error"] = result["error"]
+    else:
+        record["content"] = answer_text(result)
+        record["cached"] = result.get("cached", False)
+        record["source"] = result.get("source", "agent")
+        if result.get("token_usage"):
+            record["token_usage"] = result["token_usage"]
+    record["timings_ms"] = {
+        "queued": round((started - submitted_at) * 1000, 1),
+        "rate_wait": round(rate_wait * 1000, 1),
+        "search": round((finished - started - rate_wait) * 1000, 1),
+        "total": round((finished - started) * 1000, 1)
+    }
+    record["completed_at"] = datetime.now(timezone.utc).isoformat()
+    return record
+
+
+def _percentile(values: List[float], fraction: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def bulk_run(crew, input_path: str, output_path: str, workers: int = 4,
+             bypass_cache: bool = False, restart: bool = False) -> Dict:
+    """
+    Run every query in input_path not yet in output_path
+
+    Provider rate limits come from the process-wide limiter (see rate_limit.py).
+
+    Returns:
+        Summary counts and search-time percentiles for this run
+    """
+    if restart and os.path.exists(output_path):
+        os.remove(output_path)
+    done = completed_ids(output_path)
+    pending = [(query_id, query) for query_id, query in read_queries(input_path) if query_id not in done]
+    print(f"{len(done)} queries already completed, {len(pending)} to run (including earlier failures)")
+
+    summary = {"completed": 0, "errors": 0, "skipped": len(done)}
+    search_times = []
+    started = time.perf_counter()
+
+    os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+    with open(output_path, "a", encoding="utf-8") as out, ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = [
+            executor.submit(run_query, crew, query_id, query, bypass_cache, time.perf_counter())
+            for query_id, query in pending
+        ]
+        for future in as_completed(futures):
+            record = future.result()
+            # Flush each line so the checkpoint survives a crash
+            out.write(json.dumps(record, default=str) + "\n")
+            out.flush()
+            os.fsync(out.fileno())
+
+            summary["completed"] += 1
+            if "error" in record:
+                summary["errors"] += 1
+            search_times.append(record["timings_ms"]["search"])
+            if summary["completed"] % 50 == 0:
+                print(f"{summary['completed']}/{len(pending)} done")
+
+    summary["elapsed_s"] = round(time.perf_counter() - started, 1)
+    summary["search_p50_ms"] = _percentile(search_times, 0.5)
+    summary["search_p95_ms"] = _percentile(search_times, 0.95)
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a JSONL file of queries through the search crew")
+    parser.add_argument("input", nargs="?", default="requests.jsonl", help="JSONL file of queries")
+    parser.add_argument("--output", default="bulk_results.jsonl", help="Results JSONL (also the resume checkpoint)")
+    parser.add_argument("--workers", type=int, default=int(os.getenv("BULK_WORKERS", 4)))
+    parser.add_argument("--rate", action="append", default=[], metavar="PROVIDER=RATE[/BURST]",
+                        help="Per-provider requests/second (tmdb, itunes, serp, together), overriding RATE_LIMIT_*; repeatable")
+    parser.add_argument("--bypass-cache", action="store_true", help="Ignore cached answers")
+    parser.add_argument("--restart", action="store_true", help="Discard previous output instead of resuming")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.input):
+        print(f"Input file not found: {args.input}")
+        sys.exit(1)
+
+    load_dotenv("keys.env")
+    configure_rate_limiter(RateLimiter.from_env(parse_rates(args.rate)))
+    crew = UnifiedSearchCrew(os.getenv("TMDB_API_KEY"), os.getenv("TMDB_TOKEN"), os.getenv("SERP_API_KEY"))
+    summary = bulk_run(crew, args.input, args.output, workers=args.workers,
+                       bypass_cache=args.bypass_cache, restart=args.restart)
+    print(json.dumps(summary))
+
+
+if __name__ == "__main__":
+    main()
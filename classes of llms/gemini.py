@@ -1,30 +1,32 @@
-from google import genai
-from tenacity import retry, wait_exponential, stop_after_attempt,wait_fixed,wait_incrementing
-from tenacity import retry, wait_fixed, stop_after_attempt, retry_if_exception_type
-from dotenv import load_dotenv
-
-import openai
-import time
 import os
+import sys
+
+if __name__ == "__main__":
+    # Run directly: make the repository root importable (llm_registry loads this module with it already on the path)
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from llm_resilience import resilient
+from tracing import trace_error
 class GeminiLLM:
     def __init__(self, api_key: str, model: str = "gemini-2.0-flash"):
+        # SDKs are imported by the wrapper that needs them, so loading this module stays cheap
+        from google import genai
+
         self.client = genai.Client(api_key=os.getenv("GOOGLE_API_KEY"))
         self.model = model
 
-    # Apply retry logic with exponential backoff
-    # @retry(wait=wait_exponential(multiplier=1, min=60, max=3600), stop=stop_after_attempt(5000))
-    @retry(wait=wait_incrementing(start=60, increment=60, max=3600), stop=stop_after_attempt(5000))
-
+    # Jittered backoff, Retry-After, per-model circuit breaker and a request deadline (see llm_resilience.py)
+    @resilient("gemini")
     def invoke(self, prompt: str):
         response = self.client.models.generate_content(model=self.model, contents=prompt)
 
         # Check if the response contains an error message; if so, trigger a retry
         if "error" in response.text.lower():  # Check for the presence of "error" in the response text
-            print("Error in Response")
+            trace_error("llm_response", "error in response", provider="gemini", model=self.model)
             raise Exception("Error in Response")
 
-        # Return an object with .content for compatibility
-        return type("LLMResponse", (object,), {"content": response.text or ""})
+        # Return an object with .content for compatibility, plus the provider's token counts
+        return type("LLMResponse", (object,), {"content": response.text or "",
+                                               "usage": getattr(response, "usage_metadata", None)})
 
 class OpenRouterLLM:
     def __init__(self, api_key: str, model: str = "qwen/qwq-32b:free", base_url: str = "https://openrouter.ai/api/v1"):
@@ -36,10 +38,13 @@ class OpenRouterLLM:
             model (str): The model identifier to use (default is Deepseek's free model).
             base_url (str): Base URL for the OpenRouter API.
         """
-        openai.api_key = api_key
-        openai.api_base = base_url
+        from openai import OpenAI
+
+        # openai>=1 ignores the module-level api_base, so the client carries the OpenRouter URL itself
+        self.client = OpenAI(base_url=base_url, api_key=api_key)
         self.model = model
 
+    @resilient("openrouter")
     def invoke(self, prompt: str):
         """
         Sends the prompt to the model and returns the response.
@@ -50,7 +55,7 @@ class OpenRouterLLM:
         Returns:
             An object with a 'content' attribute containing the model's response.
         """
-        response = openai.chat.completions.create( # Use openai.chat.completions.create instead of openai.ChatCompletion.create
+        response = self.client.chat.completions.create(
             model=self.model,
             messages=[{"role": "user", "content": prompt}],
             extra_headers={
@@ -59,13 +64,16 @@ class OpenRouterLLM:
             }
         )
         # Wrap the response in an object with a .content attribute for compatibility.
-        return type("LLMResponse", (object,), {"content": response.choices[0].message.content})
+        return type("LLMResponse", (object,), {"content": response.choices[0].message.content,
+                                               "usage": getattr(response, "usage", None)})
 
-gemini_llm = GeminiLLM(
-        api_key=os.getenv("GOOGLE_API_KEY"),  # <-- Replace with your actual key
-        model="gemini-2.0-flash"
-    )
+# Example usage; guarded so importing this module (e.g. from llm_registry) has no side effects
+if __name__ == "__main__":
+    gemini_llm = GeminiLLM(
+            api_key=os.getenv("GOOGLE_API_KEY"),  # <-- Replace with your actual key
+            model="gemini-2.0-flash"
+        )
 
-prompt = "What is the capital of France?"
-response = gemini_llm.invoke(prompt)
-print(response.content)  # Should print the response from the model
\ No newline at end of file
+    prompt = "What is the capital of France?"
+    response = gemini_llm.invoke(prompt)
+    print(response.content)  # Should print the response from the model
\ No newline at end of file
@@ -1,7 +1,13 @@
 from huggingface_hub import InferenceClient
-from tenacity import retry, wait_incrementing, stop_after_attempt
 from dotenv import load_dotenv
 import os
+import sys
+
+if __name__ == "__main__":
+    # Run directly: make the repository root importable (llm_registry loads this module with it already on the path)
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from llm_resilience import resilient
+from tracing import trace_error
 
 class DeepseekLLM:
     def __init__(self, api_key: str, model: str = "deepseek-ai/DeepSeek-R1"):
@@ -9,8 +15,8 @@ class DeepseekLLM:
         self.client = InferenceClient(token=api_key)
         self.model = model
 
-    # Retry logic: Wait incrementally (starting at 60s, increasing by 60s, max 3600s) and stop after 5000 attempts.
-    # @retry(wait=wait_incrementing(start=60, increment=60, max=3600), stop=stop_after_attempt(5000))
+    # Jittered backoff, Retry-After, per-model circuit breaker and a request deadline (see llm_resilience.py)
+    @resilient("huggingface")
     def invoke(self, prompt: str):
         messages = [{"role": "user", "content": prompt}]
         completion = self.client.chat.completions.create(
@@ -20,15 +26,17 @@ class DeepseekLLM:
         )
         # Optionally check for errors in the response.
         if "error" in str(completion).lower():
-            print("Error in response; retrying...")
+            trace_error("llm_response", "error in response", provider="huggingface", model=self.model)
             raise Exception("Error in Response")
         # Wrap the result in an object with a .content attribute.
-        return type("LLMResponse", (object,), {"content": completion.choices[0].message})
+        return type("LLMResponse", (object,), {"content": completion.choices[0].message,
+                                               "usage": getattr(completion, "usage", None)})
 
-# Usage example:
-api_key=os.getenv("HUGGING_FACE_API_KEY")  # Replace with your actual API key.
-prompt = "What is the capital of France?"
+# Usage example (guarded so importing this module has no side effects):
+if __name__ == "__main__":
+    api_key=os.getenv("HUGGING_FACE_API_KEY")  # Replace with your actual API key.
+    prompt = "What is the capital of France?"
 
-deepseek_llm = DeepseekLLM(api_key=api_key)
-response = deepseek_llm.invoke(prompt)
-print(response.content)
+    deepseek_llm = DeepseekLLM(api_key=api_key)
+    response = deepseek_llm.invoke(prompt)
+    print(response.content)
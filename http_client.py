@@ -0,0 +1,305 @@
+import asyncio
+import os
+import threading
+import time
+from typing import Dict, Any, Optional
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from metrics import span
+from rate_limit import get_rate_limiter, provider_for_url
+
+
+# Responses worth retrying for an idempotent GET
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+
+class HTTPClientConfig:
+    """Connection-pool settings shared by all provider clients"""
+
+    def __init__(self,
+                 pool_connections: int = 10,
+                 pool_maxsize: int = 20,
+                 connect_timeout: float = 3.05,
+                 read_timeout: float = 15.0,
+                 max_retries: int = 2,
+                 backoff_factor: float = 0.3,
+                 backoff_max: float = 10.0,
+                 keep_alive: bool = True):
+        """
+        Args:
+            pool_connections: Number of per-host pools to keep around
+            pool_maxsize: Maximum number of connections kept per host
+            connect_timeout: Seconds to wait for the TCP/TLS connection
+            read_timeout: Seconds to wait for the server to send a response
+            max_retries: Retries for idempotent GETs on connection errors and 429/5xx
+            backoff_factor: Backoff factor between retries (0.3 -> 0.3s, 0.6s, 1.2s...)
+            backoff_max: Longest wait before a retry, including waits asked for by Retry-After
+            keep_alive: Keep connections open between requests
+        """
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.backoff_max = backoff_max
+        self.keep_alive = keep_alive
+
+    @classmethod
+    def from_env(cls) -> "HTTPClientConfig":
+        """Build a config from HTTP_* environment variables, falling back to defaults"""
+        return cls(
+            pool_connections=int(os.getenv("HTTP_POOL_CONNECTIONS", 10)),
+            pool_maxsize=int(os.getenv("HTTP_POOL_MAXSIZE", 20)),
+            connect_timeout=float(os.getenv("HTTP_CONNECT_TIMEOUT", 3.05)),
+            read_timeout=float(os.getenv("HTTP_READ_TIMEOUT", 15.0)),
+            max_retries=int(os.getenv("HTTP_MAX_RETRIES", 2)),
+            backoff_factor=float(os.getenv("HTTP_BACKOFF_FACTOR", 0.3)),
+            backoff_max=float(os.getenv("HTTP_BACKOFF_MAX", 10.0)),
+            keep_alive=os.getenv("HTTP_KEEP_ALIVE", "1").lower() not in ("0", "false", "no"),
+        )
+
+    @property
+    def timeout(self):
+        return (self.connect_timeout, self.read_timeout)
+
+    def retry_delay(self, attempt: int, retry_after: Optional[str] = None) -> float:
+        """
+        Seconds to wait before retrying after the given (zero-based) attempt
+
+        A Retry-After header in seconds wins over exponential backoff; either way the
+        wait is capped at backoff_max, so an upstream header can't stall a request.
+        """
+        if retry_after and retry_after.isdigit():
+            return min(float(retry_after), self.backoff_max)
+        return min(self.backoff_factor * (2 ** attempt), self.backoff_max)
+
+
+class PooledHTTPClient:
+    """Thread-safe requests.Session wrapper with per-host keep-alive pools and GET retries"""
+
+    def __init__(self, config: Optional[HTTPClientConfig] = None):
+        self.config = config or HTTPClientConfig.from_env()
+        self.session = requests.Session()
+
+        # Retries happen in get(), where each attempt waits for a rate-limit token;
+        # urllib3 retrying inside one call would resend 429/5xx without spending any
+        self.adapter = HTTPAdapter(
+            pool_connections=self.config.pool_connections,
+            pool_maxsize=self.config.pool_maxsize,
+            max_retries=Retry(total=0, raise_on_status=False)
+        )
+        self.session.mount("https://", self.adapter)
+        self.session.mount("http://", self.adapter)
+
+        if not self.config.keep_alive:
+            self.session.headers["Connection"] = "close"
+
+        self._lock = threading.Lock()
+        self._requests_by_host: Dict[str, int] = {}
+
+    def get(self, url: str, params: Optional[Dict[str, Any]] = None,
+            headers: Optional[Dict[str, str]] = None, **kwargs) -> requests.Response:
+        """
+        Issue a GET through the shared pool, retrying connection errors and 429/5xx
+
+        Every attempt, including retries, first waits for the host's rate-limit token.
+
+        Args:
+            url: Request URL
+            params: Query string parameters
+            headers: Extra request headers
+            **kwargs: Passed through to requests.Session.get (timeout overrides the default)
+
+        Returns:
+            requests.Response
+        """
+        kwargs.setdefault("timeout", self.config.timeout)
+        host = urlsplit(url).netloc
+        with self._lock:
+            self._requests_by_host[host] = self._requests_by_host.get(host, 0) + 1
+
+        attempt = 0
+        while True:
+            get_rate_limiter().acquire_for_url(url)
+            retry_after = None
+            try:
+                with span("http", provider=provider_for_url(url) or host) as fields:
+                    response = self.session.get(url, params=params, headers=headers, **kwargs)
+                    fields["status"] = response.status_code
+                    fields["attempt"] = attempt
+                    if response.status_code >= 400:
+                        fields["error"] = response.reason or f"HTTP {response.status_code}"
+            except (requests.ConnectionError, requests.Timeout):
+                if attempt >= self.config.max_retries:
+                    raise
+            else:
+                if response.status_code not in RETRY_STATUSES or attempt >= self.config.max_retries:
+                    return response
+                retry_after = response.headers.get("Retry-After")
+                # Hand the connection back to the pool before waiting
+                response.close()
+            time.sleep(self.config.retry_delay(attempt, retry_after))
+            attempt += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Report connection-pool usage per host
+
+        Returns:
+            Dictionary with totals and a per-host breakdown of active, idle and reused connections
+        """
+        hosts = {}
+        totals = {"active": 0, "idle": 0, "opened": 0, "reused": 0, "requests": 0}
+
+        pools = self.adapter.poolmanager.pools
+        for key in list(pools.keys()):
+            pool = pools.get(key)
+            if pool is None:
+                continue
+            # Idle connections sit in the pool's queue; empty slots are None placeholders
+            idle = sum(1 for conn in list(pool.pool.queue) if conn is not None) if pool.pool else 0
+            opened = pool.num_connections
+            served = pool.num_requests
+            host_stats = {
+                "active": max(opened - idle, 0),
+                "idle": idle,
+                "opened": opened,
+                "reused": max(served - opened, 0),
+                "requests": served,
+                "maxsize": pool.pool.maxsize if pool.pool else 0
+            }
+            hosts[f"{key.key_scheme}://{key.key_host}:{key.key_port}"] = host_stats
+            for name in totals:
+                totals[name] += host_stats[name]
+
+        with self._lock:
+            requests_by_host = dict(self._requests_by_host)
+
+        return {
+            "config": {
+                "pool_connections": self.config.pool_connections,
+                "pool_maxsize": self.config.pool_maxsize,
+                "connect_timeout": self.config.connect_timeout,
+                "read_timeout": self.config.read_timeout,
+                "max_retries": self.config.max_retries,
+                "keep_alive": self.config.keep_alive
+            },
+            "totals": totals,
+            "hosts": hosts,
+            "requests_by_host": requests_by_host
+        }
+
+    def close(self):
+        self.session.close()
+
+
+class AsyncHTTPClient:
+    """httpx.AsyncClient wrapper with the same pool limits, timeouts and GET retry policy"""
+
+    def __init__(self, config: Optional[HTTPClientConfig] = None, transport=None):
+        """
+        Args:
+            config: Pool and timeout settings (defaults to HTTPClientConfig.from_env())
+            transport: Optional httpx transport replacing the network (see provider_replay.py)
+        """
+        # httpx is only needed by the async serving stack
+        import httpx
+
+        self._httpx = httpx
+        self.config = config or HTTPClientConfig.from_env()
+        self.client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=self.config.pool_connections * self.config.pool_maxsize,
+                max_keepalive_connections=self.config.pool_maxsize if self.config.keep_alive else 0
+            ),
+            timeout=httpx.Timeout(self.config.read_timeout, connect=self.config.connect_timeout),
+            transport=transport
+        )
+        self._requests_by_host: Dict[str, int] = {}
+
+    async def get(self, url: str, params: Optional[Dict[str, Any]] = None,
+                  headers: Optional[Dict[str, str]] = None, **kwargs):
+        """
+        Issue a GET through the shared async pool, retrying connection errors and 429/5xx
+
+        Returns:
+            httpx.Response
+        """
+        host = urlsplit(url).netloc
+        self._requests_by_host[host] = self._requests_by_host.get(host, 0) + 1
+
+        attempt = 0
+        while True:
+            # Every attempt, including retries, spends a rate-limit token
+            await get_rate_limiter().aacquire_for_url(url)
+            retry_after = None
+            try:
+                with span("http", provider=provider_for_url(url) or host) as fields:
+                    response = await self.client.get(url, params=params, headers=headers, **kwargs)
+                    fields["status"] = response.status_code
+                    fields["attempt"] = attempt
+                    if response.status_code >= 400:
+                        fields["error"] = response.reason_phrase or f"HTTP {response.status_code}"
+            except self._httpx.TransportError:
+                if attempt >= self.config.max_retries:
+                    raise
+            else:
+                if response.status_code not in RETRY_STATUSES or attempt >= self.config.max_retries:
+                    return response
+                retry_after = response.headers.get("Retry-After")
+                await response.aclose()
+            await asyncio.sleep(self.config.retry_delay(attempt, retry_after))
+            attempt += 1
+
+    def stats(self) -> Dict[str, Any]:
+        return {"requests_by_host": dict(self._requests_by_host)}
+
+    async def aclose(self):
+        await self.client.aclose()
+
+
+_default_client: Optional[PooledHTTPClient] = None
+_default_client_lock = threading.Lock()
+
+
+def get_http_client() -> PooledHTTPClient:
+    """Return the process-wide pooled client, creating it on first use"""
+    global _default_client
+    if _default_client is None:
+        with _default_client_lock:
+            if _default_client is None:
+                _default_client = PooledHTTPClient()
+    return _default_client
+
+
+def configure_http_client(config: HTTPClientConfig) -> PooledHTTPClient:
+    """Replace the process-wide pooled client with one built from the given config"""
+    global _default_client
+    with _default_client_lock:
+        if _default_client is not None:
+            _default_client.close()
+        _default_client = PooledHTTPClient(config)
+    return _default_client
+
+
+_default_async_client: Optional[AsyncHTTPClient] = None
+
+
+def get_async_http_client() -> AsyncHTTPClient:
+    """Return the process-wide async client; it belongs to the event loop that first uses it"""
+    global _default_async_client
+    if _default_async_client is None:
+        _default_async_client = AsyncHTTPClient()
+    return _default_async_client
+
+
+def configure_async_http_client(config: Optional[HTTPClientConfig] = None, transport=None) -> AsyncHTTPClient:
+    """Replace the process-wide async client (the previous one is left for its event loop to close)"""
+    global _default_async_client
+    _default_async_client = AsyncHTTPClient(config, transport=transport)
+    return _default_async_client
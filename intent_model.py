@@ -0,0 +1,319 @@
+"""
+CPU-only intent classifier for routing queries to a search vertical.
+
+A multinomial logistic regression over hashed word and character n-grams,
+trained offline from a labelled JSONL file ({"query": ..., "label": ...} per line)
+and stored as sparse JSON weights:
+
+    python intent_model.py train data/intent_queries.jsonl --out models/intent_model.json
+    python intent_model.py evaluate data/intent_queries_eval.jsonl
+    python intent_model.py predict "latest Nolan film"
+
+data/intent_queries_eval.jsonl holds queries kept out of training. The model file
+records the holdout accuracy measured at training time and fingerprints of its
+training queries, so evaluate can warn when it is run on data the model was fit on.
+"""
+import argparse
+import json
+import math
+import os
+import random
+import re
+import time
+import zlib
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+from tracing import trace_error
+
+
+LABELS = ("movie", "music", "news", "general")
+DEFAULT_MODEL_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "models", "intent_model.json")
+
+_TOKEN_PATTERN = re.compile(r"[a-z0-9']+")
+
+
+class IntentPrediction(NamedTuple):
+    """Most likely query type, its probability, and the full distribution"""
+    label: str
+    confidence: float
+    probabilities: Dict[str, float]
+
+
+class HashedFeaturizer:
+    """Map text to an L2-normalized sparse vector of hashed word and character n-grams"""
+
+    def __init__(self, n_features: int = 2 ** 18, char_ngrams: Tuple[int, int] = (3, 5)):
+        self.n_features = n_features
+        self.char_ngrams = char_ngrams
+
+    def _hash(self, feature: str) -> int:
+        # crc32 is stable across processes, unlike the salted built-in hash()
+        return zlib.crc32(feature.encode("utf-8")) % self.n_features
+
+    def features(self, text: str) -> Dict[int, float]:
+        tokens = _TOKEN_PATTERN.findall(text.lower())
+        counts: Dict[int, float] = {}
+
+        def add(feature):
+            index = self._hash(feature)
+            counts[index] = counts.get(index, 0.0) + 1.0
+
+        for i, token in enumerate(tokens):
+            add("w:" + token)
+            if i:
+                add("b:" + tokens[i - 1] + " " + token)
+            padded = f"<{token}>"
+            low, high = self.char_ngrams
+            for n in range(low, high + 1):
+                for start in range(len(padded) - n + 1):
+                    add("c:" + padded[start:start + n])
+
+        norm = math.sqrt(sum(v * v for v in counts.values())) or 1.0
+        return {index: value / norm for index, value in counts.items()}
+
+    def to_dict(self) -> Dict:
+        return {"n_features": self.n_features, "char_ngrams": list(self.char_ngrams)}
+
+
+def _softmax(scores: List[float]) -> List[float]:
+    top = max(scores)
+    exps = [math.exp(s - top) for s in scores]
+    total = sum(exps)
+    return [e / total for e in exps]
+
+
+class IntentModel:
+    """Linear softmax classifier with sparse per-feature weight rows"""
+
+    def __init__(self, labels: Sequence[str] = LABELS, featurizer: Optional[HashedFeaturizer] = None,
+                 weights: Optional[Dict[int, List[float]]] = None, bias: Optional[List[float]] = None,
+                 metadata: Optional[Dict] = None):
+        self.labels = tuple(labels)
+        self.featurizer = featurizer or HashedFeaturizer()
+        self.weights = weights or {}
+        self.bias = bias or [0.0] * len(self.labels)
+        # Training provenance: holdout accuracy and training-query fingerprints (see main)
+        self.metadata = metadata or {}
+
+    def _scores(self, features: Dict[int, float]) -> List[float]:
+        scores = list(self.bias)
+        for index, value in features.items():
+            row = self.weights.get(index)
+            if row is not None:
+                for k, w in enumerate(row):
+                    scores[k] += w * value
+        return scores
+
+    def predict_proba(self, text: str) -> Dict[str, float]:
+        probabilities = _softmax(self._scores(self.featurizer.features(text)))
+        return dict(zip(self.labels, probabilities))
+
+    def predict(self, text: str) -> IntentPrediction:
+        """
+        Classify a query
+
+        Returns:
+            IntentPrediction(label, confidence, probabilities)
+        """
+        probabilities = self.predict_proba(text)
+        label = max(probabilities, key=probabilities.get)
+        return IntentPrediction(label, probabilities[label], probabilities)
+
+    def candidates(self, text: str, min_confidence: float = 0.6, max_types: int = 3) -> Tuple[str, ...]:
+        """
+        Query types worth searching: just the top one when the model is confident,
+        otherwise the most likely types until their combined probability reaches min_confidence
+        """
+        prediction = self.predict(text)
+        ranked = sorted(prediction.probabilities.items(), key=lambda item: item[1], reverse=True)
+        selected = []
+        mass = 0.0
+        for label, probability in ranked[:max_types]:
+            selected.append(label)
+            mass += probability
+            if mass >= min_confidence:
+                break
+        return tuple(selected)
+
+    @classmethod
+    def train(cls, examples: Iterable[Tuple[str, str]], labels: Sequence[str] = LABELS,
+              featurizer: Optional[HashedFeaturizer] = None, epochs: int = 30,
+              learning_rate: float = 0.5, l2: float = 1e-4, seed: int = 13) -> "IntentModel":
+        """
+        Fit the model with plain SGD on the softmax cross-entropy loss
+
+        Args:
+            examples: (query, label) pairs
+            labels: Label set (order defines the weight columns)
+            featurizer: Feature hashing settings
+            epochs: Passes over the data
+            learning_rate: Initial step size (decays linearly)
+            l2: L2 penalty applied to the weights each step they are used
+            seed: Shuffle seed, so training is reproducible
+        """
+        model = cls(labels, featurizer)
+        label_index = {label: k for k, label in enumerate(model.labels)}
+        data = [(model.featurizer.features(text), label_index[label]) for text, label in examples]
+        rng = random.Random(seed)
+
+        for epoch in range(epochs):
+            rng.shuffle(data)
+            rate = learning_rate * (1.0 - epoch / epochs)
+            for features, target in data:
+                probabilities = _softmax(model._scores(features))
+                gradient = [p - (1.0 if k == target else 0.0) for k, p in enumerate(probabilities)]
+                for k, g in enumerate(gradient):
+                    model.bias[k] -= rate * g
+                for index, value in features.items():
+                    row = model.weights.setdefault(index, [0.0] * len(model.labels))
+                    for k, g in enumerate(gradient):
+                        row[k] -= rate * (g * value + l2 * row[k])
+        return model
+
+    def to_dict(self) -> Dict:
+        return {
+            "labels": list(self.labels),
+            "featurizer": self.featurizer.to_dict(),
+            "metadata": self.metadata,
+            "bias": [round(b, 6) for b in self.bias],
+            "weights": {str(index): [round(w, 6) for w in row] for index, row in self.weights.items()}
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "IntentModel":
+        featurizer_config = data.get("featurizer", {})
+        featurizer = HashedFeaturizer(
+            n_features=featurizer_config.get("n_features", 2 ** 18),
+            char_ngrams=tuple(featurizer_config.get("char_ngrams", (3, 5)))
+        )
+        weights = {int(index): row for index, row in data["weights"].items()}
+        return cls(data["labels"], featurizer, weights, data["bias"], data.get("metadata"))
+
+    def save(self, path: str):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, separators=(",", ":"))
+
+    @classmethod
+    def load(cls, path: str) -> "IntentModel":
+        with open(path, "r", encoding="utf-8") as f:
+            return cls.from_dict(json.load(f))
+
+
+def load_examples(path: str) -> List[Tuple[str, str]]:
+    """Read (query, label) pairs from a JSONL file"""
+    examples = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                record = json.loads(line)
+                examples.append((record["query"], record["label"]))
+    return examples
+
+
+_default_model = None
+_default_model_loaded = False
+
+
+def get_intent_model(path: Optional[str] = None) -> Optional[IntentModel]:
+    """Return the shared model loaded from INTENT_MODEL_PATH (None if it cannot be loaded)"""
+    global _default_model, _default_model_loaded
+    if not _default_model_loaded:
+        path = path or os.getenv("INTENT_MODEL_PATH", DEFAULT_MODEL_PATH)
+        try:
+            _default_model = IntentModel.load(path)
+        except (OSError, ValueError, KeyError) as e:
+            trace_error("intent_model", e, path=path)
+            _default_model = None
+        _default_model_loaded = True
+    return _default_model
+
+
+def query_fingerprint(text: str) -> int:
+    """Stable hash of a case- and whitespace-normalized query"""
+    return zlib.crc32(" ".join(text.lower().split()).encode("utf-8"))
+
+
+def split_seen(model: IntentModel, examples: List[Tuple[str, str]]) -> Tuple[List[Tuple[str, str]], List[Tuple[str, str]]]:
+    """Split examples into (in the model's training data, unseen) using its recorded fingerprints"""
+    training = set(model.metadata.get("training_queries", ()))
+    seen = [example for example in examples if query_fingerprint(example[0]) in training]
+    unseen = [example for example in examples if query_fingerprint(example[0]) not in training]
+    return seen, unseen
+
+
+def _evaluate(model: IntentModel, examples: List[Tuple[str, str]]) -> float:
+    correct = sum(1 for text, label in examples if model.predict(text).label == label)
+    return correct / len(examples) if examples else 0.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Train or query the intent classifier")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    train_parser = subparsers.add_parser("train", help="Fit a model from labelled JSONL")
+    train_parser.add_argument("data")
+    train_parser.add_argument("--out", default=DEFAULT_MODEL_PATH)
+    train_parser.add_argument("--epochs", type=int, default=30)
+    train_parser.add_argument("--holdout", type=float, default=0.2,
+                              help="Fraction held out to report accuracy before the final fit on all data")
+
+    eval_parser = subparsers.add_parser("evaluate", help="Report accuracy on labelled JSONL")
+    eval_parser.add_argument("data")
+    eval_parser.add_argument("--model", default=DEFAULT_MODEL_PATH)
+
+    predict_parser = subparsers.add_parser("predict", help="Classify queries")
+    predict_parser.add_argument("queries", nargs="+")
+    predict_parser.add_argument("--model", default=DEFAULT_MODEL_PATH)
+
+    args = parser.parse_args()
+
+    if args.command == "train":
+        examples = load_examples(args.data)
+        metadata = {
+            "training_data": os.path.basename(args.data),
+            "training_size": len(examples),
+            "training_queries": sorted({query_fingerprint(text) for text, _ in examples})
+        }
+        if args.holdout > 0:
+            shuffled = list(examples)
+            random.Random(7).shuffle(shuffled)
+            split = int(len(shuffled) * (1 - args.holdout))
+            trial = IntentModel.train(shuffled[:split], epochs=args.epochs)
+            metadata["holdout_accuracy"] = round(_evaluate(trial, shuffled[split:]), 4)
+            metadata["holdout_size"] = len(shuffled) - split
+            print(f"Holdout accuracy: {metadata['holdout_accuracy']:.1%} on {metadata['holdout_size']} queries")
+        model = IntentModel.train(examples, epochs=args.epochs)
+        model.metadata = metadata
+        model.save(args.out)
+        print(f"Trained on {len(examples)} queries, {len(model.weights)} active features -> {args.out}")
+
+    elif args.command == "evaluate":
+        model = IntentModel.load(args.model)
+        examples = load_examples(args.data)
+        print(f"Accuracy: {_evaluate(model, examples):.1%} on {len(examples)} queries")
+        seen, unseen = split_seen(model, examples)
+        if seen:
+            print(f"Warning: {len(seen)} of {len(examples)} queries are in the model's training data, "
+                  f"so this accuracy overstates it; use a held-out file such as data/intent_queries_eval.jsonl")
+            if unseen:
+                print(f"Accuracy on the {len(unseen)} unseen queries: {_evaluate(model, unseen):.1%}")
+        if "holdout_accuracy" in model.metadata:
+            print(f"Holdout accuracy recorded at training: {model.metadata['holdout_accuracy']:.1%} "
+                  f"on {model.metadata['holdout_size']} queries")
+
+    elif args.command == "predict":
+        start = time.perf_counter()
+        model = IntentModel.load(args.model)
+        print(f"Loaded in {(time.perf_counter() - start) * 1000:.1f} ms")
+        for query in args.queries:
+            start = time.perf_counter()
+            prediction = model.predict(query)
+            elapsed = (time.perf_counter() - start) * 1e6
+            print(f"{query!r}: {prediction.label} ({prediction.confidence:.2f}) "
+                  f"candidates={model.candidates(query)} in {elapsed:.0f} us")
+
+
+if __name__ == "__main__":
+    main()
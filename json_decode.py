@@ -0,0 +1,151 @@
+"""
+Decoding of provider JSON responses with field projection and early exit.
+
+Provider payloads are much larger than what we read: an iTunes search returns ~30
+fields per track, TMDB credits list hundreds of cast and crew entries, SERP pages
+carry ads, related searches and pagination. Instead of response.json(), api_tools
+asks for exactly the values it uses:
+
+    take(content, "news_results", 5, fields=("title", "link"))   first 5 items of an array
+    iter_items(content, "cast", fields=("id", "vote_average"))   every item, projected
+    select(content, ("title", "runtime"))                        top-level fields
+
+Each takes the raw body, or the result of parse(body) when one response feeds
+several extractions, so the non-streaming decoders decode it only once.
+
+By default the document is decoded in one pass (orjson when installed, else json)
+and projected afterwards, which is the fastest option for typical response sizes.
+JSON_DECODER=ijson (needs the ijson C backend) parses the payload as a stream
+instead: only the selected values become Python objects and parsing stops as soon
+as the request is satisfied, which lowers peak memory on large responses at some
+CPU cost. Choose explicitly with JSON_DECODER=orjson|ijson|json.
+"""
+import json
+import os
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence
+
+from tracing import trace_error
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import ijson
+    # The pure-Python backend is slower than a full json.loads; only stream with a compiled one
+    if ijson.backend not in ("yajl2_c", "yajl2_cffi"):
+        ijson = None
+except ImportError:
+    ijson = None
+
+
+def _default_decoder() -> str:
+    decoder = os.getenv("JSON_DECODER", "auto").lower()
+    if decoder == "auto":
+        return "orjson" if orjson is not None else "ijson" if ijson is not None else "json"
+    if (decoder == "ijson" and ijson is None) or (decoder == "orjson" and orjson is None):
+        trace_error("json_decode", f"JSON_DECODER={decoder} is not installed; using json")
+        return "json"
+    return decoder
+
+
+DECODER = _default_decoder()
+
+
+def loads(content) -> Any:
+    """Decode a whole JSON document with the fastest available parser"""
+    if orjson is not None and DECODER != "json":
+        return orjson.loads(content)
+    return json.loads(content)
+
+
+def parse(content) -> Any:
+    """Prepare a body for several extractions: unchanged when streaming, decoded once otherwise"""
+    return content if DECODER == "ijson" else loads(content)
+
+
+def _is_raw(content) -> bool:
+    return isinstance(content, (bytes, bytearray, str))
+
+
+def project(item: Any, fields: Optional[Sequence[str]]) -> Any:
+    """Keep only the given keys of a dict (all of them when fields is None)"""
+    if fields is None or not isinstance(item, dict):
+        return item
+    return {field: item[field] for field in fields if field in item}
+
+
+def _walk(data: Any, path: str) -> Any:
+    for key in path.split(".") if path else ():
+        if not isinstance(data, dict):
+            return None
+        data = data.get(key)
+    return data
+
+
+def iter_items(content, path: str, fields: Optional[Sequence[str]] = None,
+               decoder: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+    """
+    Yield the items of the array at a dotted path, projected to fields
+
+    Args:
+        content: Raw response body (bytes or str) or parse() output
+        path: Dotted path of the array, e.g. "results" or "credits.crew"
+        fields: Keys to keep per item (None keeps every key)
+        decoder: Override JSON_DECODER for this call
+
+    Yields:
+        One projected item at a time; stop iterating to stop parsing (streaming decoder)
+    """
+    if _is_raw(content):
+        if (decoder or DECODER) == "ijson":
+            for item in ijson.items(content, f"{path}.item" if path else "item", use_float=True):
+                yield project(item, fields)
+            return
+        content = loads(content)
+
+    items = _walk(content, path)
+    for item in items if isinstance(items, list) else ():
+        yield project(item, fields)
+
+
+def take(content, path: str, count: int, fields: Optional[Sequence[str]] = None,
+         where: Optional[Callable[[Dict[str, Any]], bool]] = None,
+         decoder: Optional[str] = None) -> List[Dict[str, Any]]:
+    """
+    Collect the first count items of an array that pass where(), then stop parsing
+
+    where() sees the projected item, so fields must include whatever it checks.
+    """
+    taken = []
+    if count <= 0:
+        return taken
+    for item in iter_items(content, path, fields, decoder):
+        if where is None or where(item):
+            taken.append(item)
+            if len(taken) >= count:
+                break
+    return taken
+
+
+def select(content, fields: Sequence[str], decoder: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Decode only the given top-level fields of a JSON object
+
+    With the streaming decoder the object is read key by key and parsing stops once
+    every field has been seen, so large values after them (e.g. TMDB credits, which
+    append_to_response puts last) are never built.
+    """
+    if not _is_raw(content) or (decoder or DECODER) != "ijson":
+        data = loads(content) if _is_raw(content) else content
+        return project(data, fields) if isinstance(data, dict) else {}
+
+    wanted = set(fields)
+    selected: Dict[str, Any] = {}
+    for key, value in ijson.kvitems(content, "", use_float=True):
+        if key in wanted:
+            selected[key] = value
+            if len(selected) == len(wanted):
+                break
+    return {field: selected[field] for field in fields if field in selected}
@@ -0,0 +1,383 @@
+"""
+Registry of interchangeable LLM backends with latency-based routing.
+
+Backends are either crewai/litellm LLM objects (the Together model, anything in
+LLM_FALLBACK_MODELS) or the wrapper classes in "classes of llms/" (GeminiLLM,
+OpenRouterLLM, DeepseekLLM, PegasusLLM). Every call is timed, and each backend
+keeps a rolling window of latencies and errors. A call goes to the fastest healthy
+backend for its query type and fails over down the list (see llm_resilience.py).
+
+Routing is configured per deployment:
+    LLM_ROUTE_<QUERY_TYPE>=gemini,together   candidate backends for one query type
+    LLM_ROUTE_DEFAULT=together,openrouter    candidates for everything else
+    LLM_ROUTING=latency|ordered              fastest-first (default) or configured order
+
+Each call reports the provider's token counts when the backend exposes them
+(see complete_with_usage). Only the crewai backends take tools; a call that passes tools or available_functions
+is routed to those alone.
+"""
+import importlib.util
+import os
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from llm_resilience import call_with_failover, get_breaker
+from metrics import span
+from search_events import abandon_llm_attempts, llm_attempt, raise_if_cancelled
+from tracing import trace_error
+
+
+LLM_CLASSES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "classes of llms")
+
+# Calls recorded before a backend's latency is trusted for routing
+MIN_SAMPLES = 5
+
+
+class RollingStats:
+    """Latency and error rate over the most recent calls"""
+
+    def __init__(self, window: int = 200):
+        self._calls = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, latency: float, ok: bool):
+        with self._lock:
+            self._calls.append((latency, ok))
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            calls = list(self._calls)
+        latencies = sorted(latency for latency, ok in calls if ok)
+        errors = sum(1 for _, ok in calls if not ok)
+
+        def percentile(fraction):
+            if not latencies:
+                return None
+            return round(latencies[min(len(latencies) - 1, int(fraction * len(latencies)))] * 1000, 1)
+
+        return {
+            "calls": len(calls),
+            "p50_ms": percentile(0.5),
+            "p95_ms": percentile(0.95),
+            "error_rate": round(errors / len(calls), 3) if calls else 0.0
+        }
+
+
+class ToolsNotSupportedError(Exception):
+    """Raised when a call with tools reaches a backend that cannot pass them to its model"""
+
+
+def uses_tools(args: tuple, kwargs: Dict[str, Any]) -> bool:
+    """Whether crewai LLM.call arguments (messages excluded) carry tools or available_functions"""
+    tools = kwargs.get("tools", args[0] if len(args) > 0 else None)
+    functions = kwargs.get("available_functions", args[2] if len(args) > 2 else None)
+    return bool(tools or functions)
+
+
+def usage_counts(usage: Any) -> Optional[Dict[str, int]]:
+    """
+    Normalize a provider usage report to {"prompt_tokens", "completion_tokens"}
+
+    Accepts OpenAI-style usage (prompt_tokens/completion_tokens, as objects or dicts)
+    and Gemini usage_metadata (prompt_token_count/candidates_token_count).
+
+    Returns:
+        The counts, or None when the report has neither
+    """
+    if usage is None:
+        return None
+    get = usage.get if isinstance(usage, dict) else (lambda key: getattr(usage, key, None))
+    prompt, completion = get("prompt_tokens"), get("completion_tokens")
+    if prompt is None and completion is None:
+        prompt, completion = get("prompt_token_count"), get("candidates_token_count")
+    if prompt is None and completion is None:
+        return None
+    return {"prompt_tokens": int(prompt or 0), "completion_tokens": int(completion or 0)}
+
+
+class LLMBackend:
+    """One model endpoint behind the common complete(messages) interface"""
+
+    # Whether complete() forwards tools and available_functions to the model
+    supports_tools = False
+
+    def __init__(self, name: str, provider: str, factory: Callable[[], Any], default: bool = True):
+        """
+        Args:
+            name: Backend name used in LLM_ROUTE_* settings and as its circuit-breaker key
+            provider: Rate-limit bucket name (see rate_limit.py)
+            factory: Builds the client on first use
+            default: Whether the backend is a candidate when no route names it
+        """
+        self.name = name
+        self.provider = provider
+        self.default = default
+        self.stats = RollingStats()
+        self._factory = factory
+        self._client = None
+        self._error: Optional[str] = None
+        self._lock = threading.Lock()
+
+    @property
+    def client(self):
+        if self._client is None and self._error is None:
+            with self._lock:
+                if self._client is None and self._error is None:
+                    try:
+                        self._client = self._factory()
+                    except Exception as e:
+                        self._error = f"{type(e).__name__}: {e}"
+                        trace_error("llm_backend", e, backend=self.name)
+        return self._client
+
+    @property
+    def available(self) -> bool:
+        return self.client is not None
+
+    def complete(self, messages, *args, **kwargs) -> str:
+        raise NotImplementedError
+
+    def complete_with_usage(self, messages, *args, **kwargs) -> Tuple[str, Optional[Dict[str, int]]]:
+        """complete(), plus the provider's token counts for the call (None if not reported)"""
+        return self.complete(messages, *args, **kwargs), None
+
+
+class CrewLLMBackend(LLMBackend):
+    """A crewai LLM (litellm model); keeps tool calling and streaming"""
+
+    supports_tools = True
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._usage_lock = threading.Lock()
+        self._in_flight = 0
+        self._started = 0
+
+    def complete(self, messages, *args, **kwargs) -> str:
+        return self.complete_with_usage(messages, *args, **kwargs)[0]
+
+    def complete_with_usage(self, messages, *args, **kwargs) -> Tuple[str, Optional[Dict[str, int]]]:
+        """
+        Call the crewai LLM and take its token counts from the client's usage totals
+
+        crewai only keeps running totals per LLM instance, so the difference across
+        the call is this call's usage only when no other call overlapped it on the
+        same client; otherwise no usage is reported.
+        """
+        from crewai import LLM
+        client = self.client
+        with self._usage_lock:
+            alone = self._in_flight == 0
+            self._in_flight += 1
+            self._started += 1
+            started = self._started
+            before = _token_totals(client)
+        try:
+            result = LLM.call(client, messages, *args, **kwargs)
+        finally:
+            with self._usage_lock:
+                self._in_flight -= 1
+                alone = alone and self._started == started
+                after = _token_totals(client)
+        if not alone or before is None or after is None or after["successful_requests"] <= before["successful_requests"]:
+            return result, None
+        return result, {"prompt_tokens": after["prompt_tokens"] - before["prompt_tokens"],
+                        "completion_tokens": after["completion_tokens"] - before["completion_tokens"]}
+
+
+def _token_totals(client) -> Optional[Dict[str, int]]:
+    """A crewai LLM's running token totals (None for clients that keep none)"""
+    summary = getattr(client, "get_token_usage_summary", None)
+    if summary is None:
+        return None
+    totals = summary()
+    return {"prompt_tokens": totals.prompt_tokens, "completion_tokens": totals.completion_tokens,
+            "successful_requests": totals.successful_requests}
+
+
+class InvokeBackend(LLMBackend):
+    """A "classes of llms" wrapper exposing invoke(prompt) -> object with .content"""
+
+    def complete(self, messages, *args, **kwargs) -> str:
+        return self.complete_with_usage(messages, *args, **kwargs)[0]
+
+    def complete_with_usage(self, messages, *args, **kwargs) -> Tuple[str, Optional[Dict[str, int]]]:
+        if uses_tools(args, kwargs):
+            raise ToolsNotSupportedError(f"{self.name} takes a text prompt only and cannot call tools")
+        client = self.client
+        # Skip the wrapper's own @resilient layer; the registry already retries and fails over
+        invoke = getattr(type(client).invoke, "__wrapped__", None)
+        response = invoke(client, messages_to_prompt(messages)) if invoke else client.invoke(messages_to_prompt(messages))
+        content = response.content
+        return getattr(content, "content", content) or "", usage_counts(getattr(response, "usage", None))
+
+
+def messages_to_prompt(messages) -> str:
+    """Flatten chat messages into one prompt for text-in/text-out backends"""
+    if isinstance(messages, str):
+        return messages
+    return "\n\n".join(f"{m.get('role', 'user')}: {m.get('content', '')}" for m in messages)
+
+
+def load_llm_class(module_file: str, class_name: str):
+    """Import a wrapper class from "classes of llms/" (the folder name is not a valid package name)"""
+    path = os.path.join(LLM_CLASSES_DIR, module_file)
+    spec = importlib.util.spec_from_file_location(f"llm_backends_{os.path.splitext(module_file)[0]}", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return getattr(module, class_name)
+
+
+class LLMRegistry:
+    """Named backends plus per-query-type routing"""
+
+    def __init__(self, routing: Optional[str] = None, max_error_rate: Optional[float] = None):
+        self.backends: Dict[str, LLMBackend] = {}
+        self.routing = routing or os.getenv("LLM_ROUTING", "latency")
+        self.max_error_rate = max_error_rate if max_error_rate is not None else float(os.getenv("LLM_MAX_ERROR_RATE", 0.5))
+
+    def register(self, backend: LLMBackend) -> LLMBackend:
+        self.backends[backend.name] = backend
+        return backend
+
+    def register_wrapper_backends(self):
+        """Register the "classes of llms" wrappers whose API keys are configured"""
+        wrappers = [
+            ("gemini", "gemini.py", "GeminiLLM", "GOOGLE_API_KEY", "gemini", True),
+            ("openrouter", "gemini.py", "OpenRouterLLM", "OPENROUTER_API_KEY", "openrouter", True),
+            ("deepseek", "huggingface.py", "DeepseekLLM", "HUGGING_FACE_API_KEY", "huggingface", True),
+            # Summarization-only model: used only where a route names it explicitly
+            ("pegasus", "deepseek.py", "PegasusLLM", "HUGGING_FACE_API_KEY", "huggingface", False),
+        ]
+        for name, module_file, class_name, key_env, provider, default in wrappers:
+            if not os.getenv(key_env):
+                continue
+
+            def factory(module_file=module_file, class_name=class_name, key_env=key_env):
+                return load_llm_class(module_file, class_name)(api_key=os.getenv(key_env))
+
+            self.register(InvokeBackend(name, provider, factory, default=default))
+
+    def _healthy(self, backend: LLMBackend) -> bool:
+        snapshot = backend.stats.snapshot()
+        if snapshot["calls"] >= MIN_SAMPLES and snapshot["error_rate"] > self.max_error_rate:
+            return False
+        return get_breaker(backend.name).stats()["state"] != "open"
+
+    def route(self, query_type: Optional[str] = None, tools: bool = False) -> List[LLMBackend]:
+        """
+        Candidate backends for a query type, best first
+
+        Healthy backends come first: in configured order, or by p95 latency with
+        untried backends explored before measured ones. Unhealthy ones stay at the
+        end as a last resort.
+
+        Args:
+            query_type: Selects the LLM_ROUTE_<QUERY_TYPE> route
+            tools: The call passes tools, so only backends that support them qualify
+        """
+        configured = os.getenv(f"LLM_ROUTE_{(query_type or 'default').upper()}") or os.getenv("LLM_ROUTE_DEFAULT")
+        if configured:
+            names = [name.strip() for name in configured.split(",") if name.strip()]
+            candidates = [self.backends[name] for name in names if name in self.backends]
+        else:
+            candidates = [backend for backend in self.backends.values() if backend.default]
+        candidates = [backend for backend in candidates
+                      if backend.available and (backend.supports_tools or not tools)]
+
+        healthy = [backend for backend in candidates if self._healthy(backend)]
+        unhealthy = [backend for backend in candidates if backend not in healthy]
+        if self.routing == "latency":
+            def latency_key(backend):
+                snapshot = backend.stats.snapshot()
+                if snapshot["calls"] < MIN_SAMPLES or snapshot["p95_ms"] is None:
+                    return 0.0
+                return snapshot["p95_ms"]
+            healthy.sort(key=latency_key)
+        return healthy + unhealthy
+
+    def _timed_call(self, backend: LLMBackend, messages, args, kwargs) -> Tuple[str, Optional[Dict[str, int]]]:
+        started = time.perf_counter()
+        try:
+            with span("llm", backend=backend.name), llm_attempt():
+                result = backend.complete_with_usage(messages, *args, **kwargs)
+        except Exception:
+            backend.stats.record(time.perf_counter() - started, False)
+            raise
+        backend.stats.record(time.perf_counter() - started, True)
+        return result
+
+    def complete(self, messages, query_type: Optional[str] = None,
+                 call_args: tuple = (), call_kwargs: Optional[Dict[str, Any]] = None) -> str:
+        """
+        Send one completion to the best backend for the query type, failing over down the route
+
+        Args:
+            messages: Chat messages (or a prompt string)
+            query_type: Selects the LLM_ROUTE_<QUERY_TYPE> route
+            call_args, call_kwargs: Extra crewai LLM.call arguments (tools, callbacks, ...)
+        """
+        return self.complete_with_usage(messages, query_type, call_args, call_kwargs)[0]
+
+    def complete_with_usage(self, messages, query_type: Optional[str] = None, call_args: tuple = (),
+                            call_kwargs: Optional[Dict[str, Any]] = None) -> Tuple[str, Optional[Dict[str, int]]]:
+        """
+        complete(), also returning the answering backend's token counts
+
+        Returns:
+            (response text, {"prompt_tokens", "completion_tokens"} or None when the backend reports none)
+        """
+        # A streamed search whose client left stops here (outside the breakers: it says nothing about the backends)
+        raise_if_cancelled()
+        tools = uses_tools(call_args, call_kwargs or {})
+        backends = self.route(query_type, tools=tools)
+        if not backends:
+            kind = "tool-calling LLM backend" if tools else "LLM backend"
+            raise RuntimeError(f"No {kind} available for {query_type or 'default'} queries")
+        try:
+            return call_with_failover([
+                (backend.name, lambda backend=backend: self._timed_call(backend, messages, call_args, call_kwargs or {}),
+                 backend.provider)
+                for backend in backends
+            ])
+        except Exception:
+            # An attempt abandoned at the deadline may still be streaming tokens
+            abandon_llm_attempts()
+            raise
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        stats = {}
+        for name, backend in self.backends.items():
+            stats[name] = dict(backend.stats.snapshot(),
+                               provider=backend.provider,
+                               tools=backend.supports_tools,
+                               circuit=get_breaker(name).stats()["state"],
+                               loaded=backend._client is not None,
+                               error=backend._error)
+        return stats
+
+
+_default_registry: Optional[LLMRegistry] = None
+_default_registry_lock = threading.Lock()
+
+
+def get_llm_registry() -> LLMRegistry:
+    """Return the process-wide registry, with the configured wrapper backends registered"""
+    global _default_registry
+    if _default_registry is None:
+        with _default_registry_lock:
+            if _default_registry is None:
+                registry = LLMRegistry()
+                registry.register_wrapper_backends()
+                _default_registry = registry
+    return _default_registry
+
+
+def configure_llm_registry(registry: LLMRegistry) -> LLMRegistry:
+    """Replace the process-wide registry; agents built afterwards route through it"""
+    global _default_registry
+    with _default_registry_lock:
+        _default_registry = registry
+    return _default_registry
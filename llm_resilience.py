@@ -0,0 +1,320 @@
+"""
+Shared resilience layer for LLM clients.
+
+Every LLM call goes through call_with_resilience (one endpoint) or
+call_with_failover (an ordered list of endpoints):
+
+- jittered exponential backoff in the sub-second to seconds range, or the
+  provider's Retry-After when it sends one
+- a circuit breaker per model endpoint, so an unhealthy provider fails fast
+  instead of holding request workers on retries
+- a hard per-request deadline covering every attempt and every fallback; each
+  attempt runs in a worker thread and is abandoned when the deadline passes, so
+  a hung completion can't outlast it
+"""
+import contextvars
+import email.utils
+import functools
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from rate_limit import get_rate_limiter
+from tracing import trace_error
+
+
+# Errors that retrying the same request cannot fix
+NON_RETRYABLE_ERRORS = (
+    "AuthenticationError", "PermissionDeniedError", "BadRequestError", "NotFoundError",
+    "ContextWindowExceededError", "LLMContextLengthExceededException", "UnsupportedParamsError",
+    "RateLimitTimeout", "ToolsNotSupportedError",
+)
+NON_RETRYABLE_STATUSES = (400, 401, 403, 404, 422)
+# Errors caused by the request itself, which every other model would reject too
+REQUEST_ERRORS = ("BadRequestError", "ContextWindowExceededError", "LLMContextLengthExceededException")
+
+
+class CircuitOpenError(Exception):
+    """Raised without calling the provider while its endpoint's circuit is open"""
+
+
+class DeadlineExceeded(Exception):
+    """Raised when the per-request deadline leaves no time for another attempt"""
+
+
+class ResiliencePolicy:
+    """Retry, backoff, breaker and deadline settings"""
+
+    def __init__(self,
+                 max_attempts: int = 3,
+                 backoff_base: float = 0.25,
+                 backoff_max: float = 8.0,
+                 deadline: float = 60.0,
+                 failure_threshold: int = 5,
+                 reset_timeout: float = 30.0):
+        """
+        Args:
+            max_attempts: Attempts per endpoint before moving on
+            backoff_base: First retry waits up to this many seconds (doubling each attempt)
+            backoff_max: Upper bound for a single backoff or Retry-After wait
+            deadline: Seconds allowed for the whole call, including retries and failover
+            failure_threshold: Consecutive failures that open an endpoint's circuit
+            reset_timeout: Seconds an open circuit waits before letting one probe call through
+        """
+        self.max_attempts = max_attempts
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.deadline = deadline
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+
+    @classmethod
+    def from_env(cls) -> "ResiliencePolicy":
+        return cls(
+            max_attempts=int(os.getenv("LLM_RETRY_ATTEMPTS", 3)),
+            backoff_base=float(os.getenv("LLM_BACKOFF_BASE", 0.25)),
+            backoff_max=float(os.getenv("LLM_BACKOFF_MAX", 8.0)),
+            deadline=float(os.getenv("LLM_REQUEST_DEADLINE", 60.0)),
+            failure_threshold=int(os.getenv("LLM_BREAKER_FAILURES", 5)),
+            reset_timeout=float(os.getenv("LLM_BREAKER_RESET", 30.0))
+        )
+
+    def backoff(self, attempt: int) -> float:
+        """Full-jitter exponential backoff for the given retry (0-based)"""
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+
+class CircuitBreaker:
+    """Closed -> open after consecutive failures -> half-open probe after reset_timeout"""
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        """Whether a call may go through now (an open circuit admits one probe after reset_timeout)"""
+        with self._lock:
+            if self.state == "closed":
+                return True
+            if self.state == "open" and time.monotonic() - self.opened_at >= self.reset_timeout:
+                self.state = "half_open"
+            if self.state == "half_open" and not self._probing:
+                self._probing = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.state = "closed"
+            self.failures = 0
+            self._probing = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == "half_open" or self.failures >= self.failure_threshold:
+                self.state = "open"
+                self.opened_at = time.monotonic()
+            self._probing = False
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"state": self.state, "consecutive_failures": self.failures}
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+_default_policy: Optional[ResiliencePolicy] = None
+_attempt_executor: Optional[ThreadPoolExecutor] = None
+_attempt_executor_lock = threading.Lock()
+
+
+def get_policy() -> ResiliencePolicy:
+    global _default_policy
+    if _default_policy is None:
+        _default_policy = ResiliencePolicy.from_env()
+    return _default_policy
+
+
+def get_breaker(endpoint: str, policy: Optional[ResiliencePolicy] = None) -> CircuitBreaker:
+    """Return the process-wide breaker for a model endpoint"""
+    with _breakers_lock:
+        breaker = _breakers.get(endpoint)
+        if breaker is None:
+            policy = policy or get_policy()
+            breaker = _breakers[endpoint] = CircuitBreaker(policy.failure_threshold, policy.reset_timeout)
+        return breaker
+
+
+def breaker_stats() -> Dict[str, Dict[str, Any]]:
+    with _breakers_lock:
+        return {endpoint: breaker.stats() for endpoint, breaker in _breakers.items()}
+
+
+def _run_attempt(fn: Callable[[], Any], endpoint: str, timeout: float) -> Any:
+    """
+    Call fn() in a worker thread and wait at most timeout seconds for it
+
+    A call that overruns keeps its thread until the SDK gives up, but the caller
+    moves on at the deadline.
+    """
+    global _attempt_executor
+    if _attempt_executor is None:
+        with _attempt_executor_lock:
+            if _attempt_executor is None:
+                _attempt_executor = ThreadPoolExecutor(max_workers=int(os.getenv("LLM_ATTEMPT_WORKERS", 64)),
+                                                       thread_name_prefix="llm-attempt")
+    # A copy of the caller's context keeps its trace, timings and event stream bound in the worker
+    future = _attempt_executor.submit(contextvars.copy_context().run, fn)
+    try:
+        return future.result(timeout=timeout)
+    except FutureTimeoutError:
+        future.cancel()
+        raise DeadlineExceeded(f"{endpoint}: no response within the deadline ({timeout:.1f}s left)") from None
+
+
+def retry_after_seconds(error: BaseException) -> Optional[float]:
+    """Extract a Retry-After delay (seconds or HTTP date) from a provider error, if present"""
+    value = getattr(error, "retry_after", None)
+    if value is None:
+        response = getattr(error, "response", None)
+        headers = getattr(response, "headers", None) or {}
+        value = headers.get("Retry-After") or headers.get("retry-after")
+    if value is None:
+        return None
+    try:
+        return max(0.0, float(value))
+    except (TypeError, ValueError):
+        pass
+    try:
+        return max(0.0, email.utils.parsedate_to_datetime(str(value)).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def is_retryable(error: BaseException) -> bool:
+    """Transient errors (timeouts, 429, 5xx, connection failures) are retried; request errors are not"""
+    if isinstance(error, (CircuitOpenError, DeadlineExceeded)):
+        return False
+    if type(error).__name__ in NON_RETRYABLE_ERRORS:
+        return False
+    status = getattr(error, "status_code", None) or getattr(getattr(error, "response", None), "status_code", None)
+    return status not in NON_RETRYABLE_STATUSES
+
+
+def call_with_resilience(fn: Callable[[], Any], endpoint: str,
+                         policy: Optional[ResiliencePolicy] = None,
+                         deadline_at: Optional[float] = None,
+                         rate_limit: Optional[str] = None) -> Any:
+    """
+    Call fn() with retries behind the endpoint's circuit breaker
+
+    Args:
+        fn: Zero-argument callable making one LLM request
+        endpoint: Breaker key, e.g. "gemini:gemini-2.0-flash"
+        policy: Settings (defaults to the environment-configured policy)
+        deadline_at: Absolute time.monotonic() deadline (defaults to now + policy.deadline)
+        rate_limit: Provider whose rate-limit token each attempt waits for (see rate_limit.py)
+
+    Returns:
+        fn()'s result
+
+    Raises:
+        CircuitOpenError: The endpoint is unhealthy; nothing was sent
+        RateLimitTimeout: No rate-limit token before the deadline; nothing was sent
+        DeadlineExceeded: An attempt was still running at the deadline, or not enough time was left for another
+        The last provider error once attempts are exhausted or it is not retryable
+    """
+    policy = policy or get_policy()
+    breaker = get_breaker(endpoint, policy)
+    if deadline_at is None:
+        deadline_at = time.monotonic() + policy.deadline
+
+    for attempt in range(policy.max_attempts):
+        remaining = deadline_at - time.monotonic()
+        if remaining <= 0:
+            raise DeadlineExceeded(f"{endpoint}: deadline reached")
+        # Queue for the token outside the breaker: waiting on our own limiter says nothing about the endpoint
+        if rate_limit:
+            get_rate_limiter().acquire(rate_limit, timeout=remaining)
+            remaining = deadline_at - time.monotonic()
+        if not breaker.allow():
+            raise CircuitOpenError(f"Circuit open for {endpoint}")
+        try:
+            result = _run_attempt(fn, endpoint, remaining)
+        except Exception as e:
+            if type(e).__name__ in REQUEST_ERRORS:
+                # The endpoint answered; only the request was bad
+                breaker.record_success()
+            else:
+                breaker.record_failure()
+            if not is_retryable(e) or attempt + 1 >= policy.max_attempts:
+                raise
+            delay = retry_after_seconds(e)
+            delay = min(policy.backoff_max, delay) if delay is not None else policy.backoff(attempt)
+            remaining = deadline_at - time.monotonic()
+            if delay >= remaining:
+                raise DeadlineExceeded(f"{endpoint}: no time left to retry after {type(e).__name__}: {e}") from e
+            trace_error("llm_retry", e, endpoint=endpoint, attempt=attempt + 1, retry_in_s=round(delay, 2))
+            time.sleep(delay)
+        else:
+            breaker.record_success()
+            return result
+
+    raise DeadlineExceeded(f"{endpoint}: attempts exhausted")
+
+
+def call_with_failover(candidates: Sequence[Tuple[str, Callable[[], Any], Optional[str]]],
+                       policy: Optional[ResiliencePolicy] = None) -> Any:
+    """
+    Try endpoints in order under one shared deadline
+
+    Endpoints whose circuit is open are skipped immediately, so an unhealthy
+    provider costs no retry time before the next model is tried.
+
+    Args:
+        candidates: (endpoint, fn, rate-limit provider or None) tuples, preferred first
+
+    Returns:
+        The first successful result
+    """
+    policy = policy or get_policy()
+    deadline_at = time.monotonic() + policy.deadline
+    errors: List[str] = []
+
+    for endpoint, fn, rate_limit in candidates:
+        if time.monotonic() >= deadline_at:
+            errors.append(f"{endpoint}: deadline reached")
+            break
+        try:
+            return call_with_resilience(fn, endpoint, policy, deadline_at, rate_limit)
+        except Exception as e:
+            errors.append(f"{endpoint}: {type(e).__name__}: {e}")
+            if type(e).__name__ in REQUEST_ERRORS:
+                # A bad request fails the same way on every model
+                raise
+            trace_error("llm_failover", e, endpoint=endpoint)
+
+    raise DeadlineExceeded("All LLM endpoints failed: " + "; ".join(errors))
+
+
+def resilient(provider: str):
+    """
+    Method decorator for LLM wrapper classes: routes invoke() through call_with_resilience,
+    keyed per model endpoint as "<provider>:<self.model>"
+    """
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            endpoint = f"{provider}:{getattr(self, 'model', '')}"
+            return call_with_resilience(lambda: method(self, *args, **kwargs), endpoint)
+        return wrapper
+    return decorator
@@ -0,0 +1,165 @@
+"""
+Per-stage latency histograms and per-request stage breakdowns.
+
+Each stage of a search is wrapped in a span:
+
+    classify     query classification (classify_query / determine_query_type)
+    parse        criteria parsing, per query type
+    crew_build   agent, task and crew construction
+    kickoff      crew.kickoff(), per query type
+    llm          one LLM completion, per backend
+    tool         one agent tool _run, per tool
+    http         one provider HTTP request, per provider
+    extract      extract_content_from_crew_output
+    request      a whole API request, per endpoint
+
+Spans feed process-wide histograms rendered in the Prometheus text format at
+/metrics, the current request's breakdown when the request runs inside
+track_stages() (returned with the response when asked for), and the request's
+trace (see tracing.py).
+"""
+import contextvars
+import functools
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Optional, Sequence, Tuple
+
+from tracing import trace_event
+
+
+# Bucket upper bounds in seconds: stages range from sub-millisecond parsing to minute-long agent runs
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+_stages: contextvars.ContextVar = contextvars.ContextVar("search_stage_timings", default=None)
+
+
+class Histogram:
+    """Cumulative-bucket latency histogram per label set"""
+
+    def __init__(self, name: str, help_text: str, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = tuple(sorted(buckets))
+        # label set -> [per-bucket counts..., +Inf count, sum]
+        self._series: Dict[Tuple[Tuple[str, str], ...], list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, labels: Optional[Dict[str, str]] = None):
+        key = tuple(sorted((labels or {}).items()))
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [0] * (len(self.buckets) + 1) + [0.0]
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[index] += 1
+            series[len(self.buckets)] += 1
+            series[-1] += value
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            series = {key: list(values) for key, values in self._series.items()}
+        for key, values in sorted(series.items()):
+            labels = ",".join(f'{name}="{_escape(value)}"' for name, value in key)
+            prefix = labels + "," if labels else ""
+            for bound, count in zip(self.buckets, values):
+                lines.append(f'{self.name}_bucket{{{prefix}le="{bound:g}"}} {count}')
+            lines.append(f'{self.name}_bucket{{{prefix}le="+Inf"}} {values[len(self.buckets)]}')
+            lines.append(f"{self.name}_sum{{{labels}}} {values[-1]:.6f}")
+            lines.append(f"{self.name}_count{{{labels}}} {values[len(self.buckets)]}")
+        return "\n".join(lines)
+
+    def clear(self):
+        with self._lock:
+            self._series.clear()
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class StageTimings:
+    """One request's time per stage; shared by the threads the request fans out to"""
+
+    def __init__(self):
+        self._stages: Dict[str, Dict[str, float]] = {}
+        self._lock = threading.Lock()
+
+    def add(self, stage: str, seconds: float):
+        with self._lock:
+            entry = self._stages.setdefault(stage, {"ms": 0.0, "count": 0})
+            entry["ms"] += seconds * 1000
+            entry["count"] += 1
+
+    def to_dict(self) -> Dict[str, Dict[str, float]]:
+        """Stage -> total milliseconds and span count (concurrent spans can add up to more than the request)"""
+        with self._lock:
+            return {stage: {"ms": round(entry["ms"], 2), "count": entry["count"]}
+                    for stage, entry in self._stages.items()}
+
+
+stage_seconds = Histogram("search_stage_duration_seconds", "Time spent in each stage of a search")
+
+
+@contextmanager
+def span(stage: str, **labels):
+    """
+    Time the enclosed block as one stage
+
+    Args:
+        stage: Stage name (see the module docstring)
+        **labels: Extra histogram labels, e.g. provider="tmdb"; the first one also
+            names the stage in the request breakdown ("http:tmdb")
+
+    Yields:
+        A dict of extra trace fields the block can fill in (e.g. status); setting
+        "error" marks the span failed, and failed spans are traced even when unsampled
+    """
+    fields = {}
+    started = time.perf_counter()
+    try:
+        yield fields
+    except BaseException as e:
+        fields.setdefault("status", "error")
+        fields.setdefault("error_type", type(e).__name__)
+        fields.setdefault("error", str(e)[:500])
+        raise
+    finally:
+        elapsed = time.perf_counter() - started
+        labels = {name: str(value) for name, value in labels.items() if value is not None}
+        stage_seconds.observe(elapsed, dict(labels, stage=stage))
+        timings = _stages.get()
+        if timings is not None:
+            detail = next(iter(labels.values()), None)
+            timings.add(f"{stage}:{detail}" if detail else stage, elapsed)
+        trace_event(stage, force="error" in fields,
+                    **{"duration_ms": round(elapsed * 1000, 2), **labels, **fields})
+
+
+def timed(stage: str, **labels):
+    """Decorator form of span() for whole functions"""
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(stage, **labels):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+@contextmanager
+def track_stages():
+    """Collect the spans recorded within this context; yields the request's StageTimings"""
+    timings = StageTimings()
+    token = _stages.set(timings)
+    try:
+        yield timings
+    finally:
+        _stages.reset(token)
+
+
+def render_metrics() -> str:
+    """All metrics in the Prometheus text exposition format"""
+    return stage_seconds.render() + "\n"
@@ -0,0 +1,185 @@
+"""
+Prompt compaction and token accounting for the agent searches.
+
+Search tools return full provider payloads (up to 10 organic results plus a
+knowledge graph for a web search). Before a payload is handed back to the agent
+loop, compact_tool_output keeps only the fields the query type's task template
+uses, shortens snippets, drops duplicate results and then drops the lowest-ranked
+results until the observation fits the query type's token budget.
+
+Budgets are configured per deployment with PROMPT_TOOL_BUDGET_<QUERY_TYPE>
+(estimated tokens; "0" disables the budget for that type).
+
+Budgets use estimated token counts (about four characters per token), which is
+accurate enough to compare prompt sizes without loading a tokenizer for every
+backend. Per-request usage records the provider's counts when the backend reports
+them and falls back to the estimate otherwise; token_source says which was used.
+"""
+import contextvars
+import json
+import os
+import re
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional
+
+from records import is_error, json_default
+
+
+CHARS_PER_TOKEN = 4
+
+# Where a call's recorded token counts came from
+USAGE_PROVIDER = "provider"
+USAGE_ESTIMATE = "estimate"
+
+# Estimated tokens allowed for one tool observation, per query type
+DEFAULT_TOOL_BUDGETS = {"movie": 1000, "music": 1000, "news": 1000, "general": 1200}
+
+# Longest snippet kept per result, in characters
+SNIPPET_CHARS = 300
+
+# Fields each task template actually uses
+WEB_RESULT_FIELDS = ("title", "link", "snippet")
+KNOWLEDGE_GRAPH_FIELDS = ("title", "type", "description")
+NEWS_FIELDS = ("title", "source", "date", "link", "snippet")
+
+_usage: contextvars.ContextVar = contextvars.ContextVar("llm_token_usage", default=None)
+
+
+def estimate_tokens(text: Any) -> int:
+    """Approximate token count of a string (or anything with a str())"""
+    if not text:
+        return 0
+    if not isinstance(text, str):
+        text = str(text)
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def estimate_message_tokens(messages) -> int:
+    """Approximate token count of a prompt string or a list of chat messages"""
+    if isinstance(messages, str):
+        return estimate_tokens(messages)
+    # A few tokens of role/formatting overhead per message
+    return sum(estimate_tokens(message.get("content", "")) + 4 for message in messages)
+
+
+def tool_budget(query_type: str) -> Optional[int]:
+    """Token budget for one tool observation of this query type (None means unlimited)"""
+    budget = int(os.getenv(f"PROMPT_TOOL_BUDGET_{query_type.upper()}",
+                           DEFAULT_TOOL_BUDGETS.get(query_type, DEFAULT_TOOL_BUDGETS["general"])))
+    return budget if budget > 0 else None
+
+
+def _shorten(text: str, limit: int = SNIPPET_CHARS) -> str:
+    """Collapse whitespace and cut text at a word boundary"""
+    text = " ".join(str(text).split())
+    if len(text) <= limit:
+        return text
+    return text[:limit].rsplit(" ", 1)[0] + "..."
+
+
+def _project(item, fields) -> Dict[str, Any]:
+    """Keep the given non-empty fields, with long text shortened"""
+    projected = {}
+    for field in fields:
+        value = item.get(field)
+        if value:
+            projected[field] = _shorten(value) if isinstance(value, str) else value
+    return projected
+
+
+def _fingerprint(text: str) -> str:
+    return re.sub(r"[^a-z0-9]+", " ", text.lower()).strip()
+
+
+def dedupe_results(items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Drop results repeating an earlier result's link or snippet (first, best-ranked copy wins)"""
+    seen = set()
+    unique = []
+    for item in items:
+        keys = set()
+        if item.get("link"):
+            keys.add(("link", item["link"].rstrip("/")))
+        if item.get("snippet"):
+            keys.add(("snippet", _fingerprint(item["snippet"])))
+        if keys & seen:
+            continue
+        seen |= keys
+        unique.append(item)
+    return unique
+
+
+def _dumps(payload) -> str:
+    return json.dumps(payload, ensure_ascii=False, separators=(",", ":"), default=json_default)
+
+
+def compact_tool_output(query_type: str, result, budget: Optional[int] = None) -> str:
+    """
+    Trim a search tool's result to what the query type's task needs, within its token budget
+
+    Args:
+        query_type: movie, music, news or general
+        result: web_search dict or fetch_news list, as returned by api_tools
+        budget: Token budget (defaults to tool_budget(query_type))
+
+    Returns:
+        Compact JSON observation for the agent
+    """
+    if budget is None:
+        budget = tool_budget(query_type)
+
+    if isinstance(result, list):
+        items = [item for item in result if not is_error(item)]
+        if not items:
+            return _dumps(result[0] if result else {"error": "No results"})
+        payload = {"results": dedupe_results([_project(item, NEWS_FIELDS) for item in items])}
+    elif isinstance(result, dict):
+        if "error" in result:
+            return _dumps({"error": result["error"]})
+        payload = {}
+        if result.get("knowledge_graph"):
+            payload["knowledge_graph"] = _project(result["knowledge_graph"], KNOWLEDGE_GRAPH_FIELDS)
+        payload["results"] = dedupe_results([_project(item, WEB_RESULT_FIELDS)
+                                             for item in result.get("organic_results") or []])
+    else:
+        return _shorten(result, budget * CHARS_PER_TOKEN) if budget else str(result)
+
+    observation = _dumps(payload)
+    # Lowest-ranked results go first; the top result is always kept
+    while budget and estimate_tokens(observation) > budget and len(payload["results"]) > 1:
+        payload["results"].pop()
+        observation = _dumps(payload)
+    return observation
+
+
+@contextmanager
+def track_tokens():
+    """
+    Sum the LLM calls made within this context; yields the running usage dict
+
+    token_source is "provider" or "estimate" when every call's counts came from one
+    source, "mixed" otherwise (None before the first call).
+    """
+    usage = {"llm_calls": 0, "prompt_tokens": 0, "completion_tokens": 0,
+             "provider_calls": 0, "estimate_calls": 0, "token_source": None}
+    token = _usage.set(usage)
+    try:
+        yield usage
+    finally:
+        _usage.reset(token)
+
+
+def record_llm_usage(prompt_tokens: int, completion_tokens: int, source: str = USAGE_ESTIMATE):
+    """
+    Add one LLM call to the current request's usage; a no-op outside track_tokens()
+
+    Args:
+        prompt_tokens, completion_tokens: The call's token counts
+        source: USAGE_PROVIDER for counts the provider reported, USAGE_ESTIMATE for estimates
+    """
+    usage = _usage.get()
+    if usage is not None:
+        usage["llm_calls"] += 1
+        usage["prompt_tokens"] += prompt_tokens
+        usage["completion_tokens"] += completion_tokens
+        usage[f"{source}_calls"] += 1
+        usage["token_source"] = source if usage["token_source"] in (None, source) else "mixed"
@@ -0,0 +1,420 @@
+"""
+Offline stand-ins for the search providers and the LLM, for benchmarks and local runs.
+
+Every endpoint api_tools.py calls (TMDB, iTunes, SERP API) is answered from a
+directory of recorded response bodies, one <fixture>.json per route (see ROUTES),
+with configurable latency and injected errors:
+
+    ReplayAdapter     requests transport adapter, mounted on the shared PooledHTTPClient
+    ReplayTransport   httpx transport for the async client used by the ASGI app
+    FakeLLMBackend    registry backend standing in for the Together model; it calls the
+                      agent's tool once and then returns a canned final answer
+
+install_replay() wires all three into the process-wide clients. Configure with:
+
+    REPLAY_FIXTURES=dir                      recorded bodies (record them with record_fixtures)
+    REPLAY_LATENCY_MS=80                     added latency per call, REPLAY_LATENCY_MS_<PROVIDER> per provider
+    REPLAY_JITTER=0.2                        latency varies uniformly by +/- this fraction
+    REPLAY_ERROR_RATE=0.01                   share of failed calls, REPLAY_ERROR_RATE_<PROVIDER> per provider
+    REPLAY_ERROR_STATUS=503                  HTTP status of injected errors ("connection" raises instead)
+
+Providers are the rate-limit names: tmdb, itunes, serp and together (the LLM).
+"""
+import asyncio
+import json
+import os
+import random
+import re
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlsplit
+
+import requests
+from requests.adapters import BaseAdapter, HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+
+from http_client import configure_async_http_client, get_http_client
+from llm_registry import LLMBackend, LLMRegistry, configure_llm_registry
+from rate_limit import provider_for_url
+
+
+# (provider, path pattern, required query parameters, fixture name); first match wins
+ROUTES: List[Tuple[str, str, Dict[str, str], str]] = [
+    ("tmdb", r"/3/search/person$", {}, "tmdb_search_person"),
+    ("tmdb", r"/3/person/\d+/movie_credits$", {}, "tmdb_person_credits"),
+    ("tmdb", r"/3/discover/movie$", {}, "tmdb_discover"),
+    ("tmdb", r"/3/genre/movie/list$", {}, "tmdb_genres"),
+    ("tmdb", r"/3/movie/\d+$", {}, "tmdb_movie_details"),
+    ("itunes", r"/search$", {}, "itunes_search"),
+    ("serp", r"/search$", {"tbm": "nws"}, "serp_news"),
+    ("serp", r"/search$", {}, "serp_search"),
+]
+
+DEFAULT_FIXTURES_DIR = os.path.join("data", "fixtures")
+
+
+def match_route(url: str) -> Tuple[Optional[str], Optional[str]]:
+    """
+    Map a provider request URL to its (provider, fixture name)
+
+    Returns:
+        (None, None) for URLs no route covers
+    """
+    provider = provider_for_url(url)
+    parts = urlsplit(url)
+    params = dict(parse_qsl(parts.query))
+    for route_provider, pattern, required, fixture in ROUTES:
+        if route_provider == provider and re.search(pattern, parts.path) \
+                and all(params.get(key) == value for key, value in required.items()):
+            return provider, fixture
+    return provider, None
+
+
+class InjectedError(Exception):
+    """Raised for injected connection failures and LLM errors"""
+
+    status_code = 503
+
+
+class ReplayConfig:
+    """Latency and error injection settings, per provider"""
+
+    def __init__(self,
+                 latency_ms: float = 0.0,
+                 jitter: float = 0.2,
+                 error_rate: float = 0.0,
+                 error_status: str = "503",
+                 provider_latency_ms: Optional[Dict[str, float]] = None,
+                 provider_error_rate: Optional[Dict[str, float]] = None,
+                 seed: Optional[int] = None):
+        """
+        Args:
+            latency_ms: Latency added to every call
+            jitter: Latency varies uniformly by +/- this fraction of its value
+            error_rate: Share of calls that fail (0-1)
+            error_status: HTTP status returned for an injected error, or "connection" to raise
+            provider_latency_ms: Per-provider latency overriding latency_ms
+            provider_error_rate: Per-provider error rate overriding error_rate
+            seed: Seed for reproducible latency and error sequences
+        """
+        self.latency_ms = latency_ms
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.provider_latency_ms = provider_latency_ms or {}
+        self.provider_error_rate = provider_error_rate or {}
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> "ReplayConfig":
+        """Build a config from REPLAY_* environment variables"""
+        providers = {route[0] for route in ROUTES} | {"together"}
+
+        def per_provider(prefix):
+            return {provider: float(os.environ[f"{prefix}_{provider.upper()}"])
+                    for provider in providers if os.getenv(f"{prefix}_{provider.upper()}")}
+
+        return cls(
+            latency_ms=float(os.getenv("REPLAY_LATENCY_MS", 0)),
+            jitter=float(os.getenv("REPLAY_JITTER", 0.2)),
+            error_rate=float(os.getenv("REPLAY_ERROR_RATE", 0)),
+            error_status=os.getenv("REPLAY_ERROR_STATUS", "503").lower(),
+            provider_latency_ms=per_provider("REPLAY_LATENCY_MS"),
+            provider_error_rate=per_provider("REPLAY_ERROR_RATE"),
+            seed=int(os.environ["REPLAY_SEED"]) if os.getenv("REPLAY_SEED") else None,
+        )
+
+    def delay(self, provider: Optional[str]) -> float:
+        """Seconds the next call to provider should take"""
+        latency = self.provider_latency_ms.get(provider, self.latency_ms) / 1000
+        if latency <= 0:
+            return 0.0
+        with self._lock:
+            spread = self._random.uniform(-self.jitter, self.jitter)
+        return max(0.0, latency * (1 + spread))
+
+    def should_fail(self, provider: Optional[str]) -> bool:
+        rate = self.provider_error_rate.get(provider, self.error_rate)
+        if rate <= 0:
+            return False
+        with self._lock:
+            return self._random.random() < rate
+
+
+class FixtureStore:
+    """Recorded response bodies, loaded once from a directory of <fixture>.json files"""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self.bodies: Dict[str, bytes] = {}
+        for name in os.listdir(directory):
+            fixture, ext = os.path.splitext(name)
+            if ext == ".json":
+                with open(os.path.join(directory, name), "rb") as f:
+                    self.bodies[fixture] = f.read()
+        self._lock = threading.Lock()
+        self.calls: Dict[str, int] = {}
+
+    def respond(self, url: str, config: ReplayConfig) -> Tuple[float, int, bytes]:
+        """
+        Pick the replayed answer for a request URL
+
+        Returns:
+            (seconds to wait, HTTP status, body); raises InjectedError for connection failures
+        """
+        provider, fixture = match_route(url)
+        with self._lock:
+            key = fixture or "unmatched"
+            self.calls[key] = self.calls.get(key, 0) + 1
+
+        delay = config.delay(provider)
+        if config.should_fail(provider):
+            if config.error_status == "connection":
+                raise InjectedError(f"Injected connection failure for {provider}")
+            return delay, int(config.error_status), json.dumps({"error": "Injected provider error"}).encode("utf-8")
+        if fixture is None or fixture not in self.bodies:
+            body = json.dumps({"error": f"No fixture recorded for {urlsplit(url).path}"}).encode("utf-8")
+            return delay, 404, body
+        return delay, 200, self.bodies[fixture]
+
+
+class ReplayAdapter(BaseAdapter):
+    """
+    requests adapter answering from a FixtureStore instead of the network
+
+    It replaces the pooled HTTPAdapter. Injected error statuses are retried by
+    PooledHTTPClient.get like real ones, each attempt spending a rate-limit token.
+    """
+
+    def __init__(self, store: FixtureStore, config: Optional[ReplayConfig] = None):
+        super().__init__()
+        self.store = store
+        self.config = config or ReplayConfig.from_env()
+
+    def send(self, request, stream=False, timeout=None, verify=True, cert=None, proxies=None):
+        try:
+            delay, status, body = self.store.respond(request.url, self.config)
+        except InjectedError as e:
+            raise requests.ConnectionError(str(e), request=request)
+        if delay:
+            time.sleep(delay)
+
+        response = requests.Response()
+        response.status_code = status
+        response.reason = "OK" if status == 200 else "Replayed Error"
+        response.headers = CaseInsensitiveDict({"Content-Type": "application/json",
+                                                "Content-Length": str(len(body))})
+        response._content = body
+        response.encoding = "utf-8"
+        response.url = request.url
+        response.request = request
+        return response
+
+    def close(self):
+        pass
+
+
+class ReplayTransport:
+    """httpx async transport answering from a FixtureStore (pass to AsyncHTTPClient)"""
+
+    def __init__(self, store: FixtureStore, config: Optional[ReplayConfig] = None):
+        self.store = store
+        self.config = config or ReplayConfig.from_env()
+
+    async def handle_async_request(self, request):
+        import httpx
+
+        try:
+            delay, status, body = self.store.respond(str(request.url), self.config)
+        except InjectedError as e:
+            raise httpx.ConnectError(str(e), request=request)
+        if delay:
+            await asyncio.sleep(delay)
+        return httpx.Response(status, headers={"Content-Type": "application/json"}, content=body, request=request)
+
+    async def aclose(self):
+        pass
+
+
+class RecordingAdapter(HTTPAdapter):
+    """Pass-through adapter that saves the first successful body of each route as its fixture"""
+
+    def __init__(self, directory: str, **kwargs):
+        super().__init__(**kwargs)
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def send(self, request, **kwargs):
+        response = super().send(request, **kwargs)
+        _, fixture = match_route(request.url)
+        path = os.path.join(self.directory, f"{fixture}.json")
+        if fixture and response.status_code == 200 and not os.path.exists(path):
+            with open(path, "wb") as f:
+                f.write(response.content)
+        return response
+
+
+def record_fixtures(directory: str = DEFAULT_FIXTURES_DIR):
+    """Record live provider responses made through the shared client into directory"""
+    client = get_http_client()
+    adapter = RecordingAdapter(directory, pool_connections=client.config.pool_connections,
+                               pool_maxsize=client.config.pool_maxsize, max_retries=client.adapter.max_retries)
+    client.session.mount("https://", adapter)
+    client.session.mount("http://", adapter)
+    return adapter
+
+
+class FakeLLM:
+    """
+    Canned agent completions: one tool call, then a final answer listing the tool's results
+
+    Speaks both crewai protocols: native tool calls when the executor passes tools,
+    otherwise the ReAct text format described in the agent's system prompt.
+    """
+
+    def __init__(self, answer_chars: int = 1200):
+        """
+        Args:
+            answer_chars: Approximate length of the final answer (its completion size)
+        """
+        self.answer_chars = answer_chars
+        self._calls = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _text(messages) -> str:
+        if isinstance(messages, str):
+            return messages
+        return "\n".join(str(message.get("content") or "") for message in messages)
+
+    @staticmethod
+    def _tool_was_called(messages) -> bool:
+        if isinstance(messages, str):
+            return "\nObservation:" in messages
+        return any(message.get("role") == "tool"
+                   or (message.get("role") == "assistant" and "Observation:" in str(message.get("content") or ""))
+                   for message in messages)
+
+    @staticmethod
+    def _task_query(text: str) -> str:
+        """The first quoted phrase of the current task, which is the user's query in every task template"""
+        task = text.split("Current Task:", 1)[-1]
+        match = re.search(r'"([^"\n]+)"', task)
+        return match.group(1) if match else task.strip()[:100]
+
+    def _arguments(self, schema: Dict[str, Any], query: str) -> Dict[str, Any]:
+        """Fill a tool's JSON schema: the query for strings, the default (or 5) for numbers"""
+        arguments = {}
+        properties = schema.get("properties", {})
+        for name in schema.get("required") or list(properties):
+            spec = properties.get(name, {})
+            if spec.get("type") in ("integer", "number"):
+                arguments[name] = spec.get("default", 5)
+            else:
+                arguments[name] = query
+        return arguments
+
+    def _answer(self, text: str) -> str:
+        titles = re.findall(r'"title":\s*"([^"]+)"', text.split("Current Task:", 1)[-1])
+        lines = [f"## {title}\n\nA short summary of this result." for title in dict.fromkeys(titles)]
+        answer = "Here is what I found:\n\n" + "\n\n".join(lines or ["No results were found."])
+        filler = "More details are available at the linked sources. "
+        if len(answer) < self.answer_chars:
+            answer += "\n\n" + filler * ((self.answer_chars - len(answer)) // len(filler) + 1)
+        return answer
+
+    def complete(self, messages, tools=None):
+        with self._lock:
+            self._calls += 1
+            call_id = f"call_{self._calls}"
+        text = self._text(messages)
+        query = self._task_query(text)
+
+        if not self._tool_was_called(messages):
+            if tools:
+                function = tools[0]["function"]
+                return [{"id": call_id, "type": "function", "function": {
+                    "name": function["name"],
+                    "arguments": json.dumps(self._arguments(function.get("parameters", {}), query))
+                }}]
+            tool = re.search(r"Tool Name: (.+)\nTool Arguments: (\{.*?\n\})\nTool Description", text, re.S)
+            if tool:
+                try:
+                    schema = json.loads(tool.group(2))
+                except ValueError:
+                    schema = {}
+                return (f"Thought: I should search for this.\nAction: {tool.group(1).strip()}\n"
+                        f"Action Input: {json.dumps(self._arguments(schema, query))}")
+
+        answer = self._answer(text)
+        return answer if tools else f"Thought: I now know the final answer\nFinal Answer: {answer}"
+
+
+class FakeLLMBackend(LLMBackend):
+    """Registry backend serving FakeLLM completions with the together provider's injected latency and errors"""
+
+    # FakeLLM answers native tool calls like the crewai backend it stands in for
+    supports_tools = True
+
+    def __init__(self, name: str = "together", config: Optional[ReplayConfig] = None, answer_chars: int = 1200):
+        super().__init__(name, "together", lambda: FakeLLM(answer_chars))
+        self.config = config or ReplayConfig.from_env()
+
+    def complete(self, messages, *args, **kwargs):
+        time.sleep(self.config.delay(self.provider))
+        if self.config.should_fail(self.provider):
+            raise InjectedError("Injected LLM error")
+        return self.client.complete(messages, kwargs.get("tools"))
+
+
+def install_replay(fixtures_dir: Optional[str] = None, config: Optional[ReplayConfig] = None,
+                   fake_llm: bool = True) -> FixtureStore:
+    """
+    Answer every provider call in this process from recorded fixtures
+
+    Call before the search crew builds its agents: the fake LLM replaces the
+    process-wide LLM registry, which agents bind to when they are created.
+
+    Args:
+        fixtures_dir: Directory of <fixture>.json bodies (default REPLAY_FIXTURES or data/fixtures)
+        config: Latency and error injection (default ReplayConfig.from_env())
+        fake_llm: Also replace the LLM backends with FakeLLMBackend
+
+    Returns:
+        The FixtureStore, whose calls counter reports requests per route
+    """
+    store = FixtureStore(fixtures_dir or os.getenv("REPLAY_FIXTURES", DEFAULT_FIXTURES_DIR))
+    config = config or ReplayConfig.from_env()
+
+    client = get_http_client()
+    adapter = ReplayAdapter(store, config)
+    client.session.mount("https://", adapter)
+    client.session.mount("http://", adapter)
+    configure_async_http_client(client.config, transport=ReplayTransport(store, config))
+
+    if fake_llm:
+        registry = LLMRegistry()
+        registry.register(FakeLLMBackend(config=config))
+        configure_llm_registry(registry)
+    return store
+
+
+if __name__ == "__main__":
+    # Record fixtures from live providers: python provider_replay.py [directory] "query" ...
+    import sys
+    from dotenv import load_dotenv
+    from unified_crewai import UnifiedSearchCrew
+
+    load_dotenv("keys.env")
+    # Provider calls must reach the network to be recorded
+    os.environ.setdefault("SEARCH_CACHE_BYPASS", "1")
+    directory = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_FIXTURES_DIR
+    queries = sys.argv[2:] or ["top 5 comedy movies", "movies with Tom Hanks", "films directed by Christopher Nolan",
+                               "songs by Taylor Swift", "latest news on AI", "what is the capital of France"]
+    record_fixtures(directory)
+    crew = UnifiedSearchCrew(os.getenv("TMDB_API_KEY"), os.getenv("TMDB_TOKEN"), os.getenv("SERP_API_KEY"))
+    for query in queries:
+        crew.run(query, bypass_cache=True)
+    print(f"Fixtures in {directory}: {', '.join(sorted(os.listdir(directory)))}")
@@ -0,0 +1,228 @@
+"""
+Precompiled query classification and criteria extraction.
+
+All patterns are compiled once at import. A query is lowercased once and scanned
+once for routing keywords; only the parser for the chosen type then runs.
+"""
+import re
+from functools import lru_cache
+from typing import Any, Dict, NamedTuple, Optional, Tuple
+
+
+MOVIE_KEYWORDS = ("movie", "film", "director", "actor", "actress", "genre", "rating", "imdb", "cinema")
+MUSIC_KEYWORDS = ("song", "music", "artist", "singer", "album", "track", "playlist", "band", "listen")
+NEWS_KEYWORDS = ("news", "latest", "update", "headline", "report", "article", "journalist", "current events")
+
+# Keywords that force a type on their own
+_MUSIC_STRONG = frozenset(("song", "music", "artist", "singer"))
+
+_KEYWORD_TYPE = {}
+for _keyword in MOVIE_KEYWORDS:
+    _KEYWORD_TYPE.setdefault(_keyword, "movie")
+for _keyword in MUSIC_KEYWORDS:
+    _KEYWORD_TYPE.setdefault(_keyword, "music")
+for _keyword in NEWS_KEYWORDS:
+    _KEYWORD_TYPE.setdefault(_keyword, "news")
+
+# Zero-width lookahead so overlapping keywords ("newsong" -> news, song) are all found in one scan
+_KEYWORD_SCAN = re.compile(
+    "(?=(" + "|".join(re.escape(k) for k in sorted(_KEYWORD_TYPE, key=len, reverse=True)) + "))"
+)
+
+_NAME = r"([A-Z][a-z]+(?:\s+[A-Z][a-z]+){0,2})"
+_NAME_PATTERN = re.compile(r"\b" + _NAME + r"\b")
+# Case-sensitive check of a name captured by the (case-insensitive) actor/director/artist patterns
+_PROPER_NAME = re.compile(r"[A-Z][a-z]+(?:\s+[A-Z][a-z]+){0,2}")
+
+_MOVIE_GENRE = re.compile(r"(comedy|sci-fi|horror|action|drama|romance|thriller|adventure|fantasy|animation|documentary|musical|western|crime|mystery|biography|family|war|history|sport)", re.IGNORECASE)
+_MOVIE_COUNT = re.compile(r"(?:top|best)\s+(\d+)", re.IGNORECASE)
+_MOVIE_ACTOR = re.compile(r"(?:actor|star|starring|with|of)\s+" + _NAME, re.IGNORECASE)
+_MOVIE_YEAR = re.compile(r"(?:from|in|year)\s+(\d{4})")
+_MOVIE_DIRECTOR = re.compile(r"(?:direct(?:ed|or)|by director)\s+" + _NAME, re.IGNORECASE)
+_MOVIE_RATING = re.compile(r"(?:rating|rated)\s+(?:above|over|higher than)\s+(\d(?:\.\d)?)", re.IGNORECASE)
+
+_MUSIC_GENRE = re.compile(r"(pop|rock|hip hop|rap|jazz|blues|country|classical|electronic|reggae|folk|metal|punk|r&b|soul|disco|indie|alternative|punjabi|hindi)", re.IGNORECASE)
+_MUSIC_COUNT = _MOVIE_COUNT
+_MUSIC_ARTIST = re.compile(r"(?:artist|singer|by|of)\s+" + _NAME, re.IGNORECASE)
+_MUSIC_TERM = re.compile(r"(?:about|related to|on)\s+([a-zA-Z]+(?:\s+[a-zA-Z]+){0,2})", re.IGNORECASE)
+
+_NEWS_COUNT = re.compile(r"(?:top|latest|recent)\s+(\d+)", re.IGNORECASE)
+_NEWS_PREFIXES = (
+    re.compile(r"^(?:get|find|show|tell me about|search for|what's new in|latest news on|updates on|news about)\s+", re.IGNORECASE),
+    re.compile(r"^(?:the latest|recent|current)\s+(?:news|updates|articles|stories|reports)\s+(?:about|on|regarding|concerning)\s+", re.IGNORECASE),
+)
+
+DEFAULT_COUNT = 5
+
+
+class ParsedQuery(NamedTuple):
+    """Compact, immutable result of classifying and parsing one query"""
+    query_type: str
+    criteria: Tuple[Tuple[str, Any], ...]
+    count: int
+    resolved: bool
+    search_query: Optional[str]
+    keyword_counts: Tuple[int, int, int]
+
+    @property
+    def search_criteria(self) -> Dict[str, Any]:
+        """Criteria as a fresh dict (safe for callers to modify)"""
+        return dict(self.criteria)
+
+    @property
+    def matched_types(self) -> Tuple[str, ...]:
+        """Every vertical with at least one keyword hit, strongest first"""
+        counts = dict(zip(("movie", "music", "news"), self.keyword_counts))
+        return tuple(t for t in sorted(counts, key=counts.get, reverse=True) if counts[t] > 0)
+
+
+def keyword_counts(lowered: str) -> Tuple[Tuple[int, int, int], frozenset]:
+    """Return (movie, music, news) distinct-keyword counts and the set of keywords found"""
+    found = frozenset(m.group(1) for m in _KEYWORD_SCAN.finditer(lowered))
+    movie = music = news = 0
+    for keyword in found:
+        kind = _KEYWORD_TYPE[keyword]
+        if kind == "movie":
+            movie += 1
+        elif kind == "music":
+            music += 1
+        else:
+            news += 1
+    return (movie, music, news), found
+
+
+def _classify(counts: Tuple[int, int, int], found: frozenset) -> str:
+    movie_count, music_count, news_count = counts
+    if "news" in found or news_count > max(movie_count, music_count):
+        return "news"
+    elif found & _MUSIC_STRONG or music_count > movie_count:
+        return "music"
+    elif movie_count > 0:
+        return "movie"
+    else:
+        return "general"
+
+
+def classify_query(user_input: str) -> str:
+    """Determine the query type (movie, music, news or general)"""
+    counts, found = keyword_counts(user_input.lower())
+    return _classify(counts, found)
+
+
+def _is_proper_name(name: str, user_input: str) -> bool:
+    """
+    Whether a captured name can be trusted as a person's name
+
+    The name patterns ignore case, so "top 5 movies of all time" captures "all time".
+    Only capitalized names count, and not in a title-cased query where every word is capitalized.
+    """
+    return bool(_PROPER_NAME.fullmatch(name)) and user_input != user_input.title()
+
+
+def parse_movie(user_input: str) -> Tuple[Dict[str, Any], int, bool]:
+    """Extract movie criteria, count, and whether explicit patterns (not name guessing) resolved them"""
+    search_criteria = {}
+
+    genre_match = _MOVIE_GENRE.search(user_input)
+    if genre_match:
+        search_criteria['genre'] = genre_match.group(1).lower()
+
+    count_match = _MOVIE_COUNT.search(user_input)
+    count = int(count_match.group(1)) if count_match else DEFAULT_COUNT
+
+    actor_match = _MOVIE_ACTOR.search(user_input)
+    if actor_match:
+        search_criteria['actor'] = actor_match.group(1)
+
+    year_match = _MOVIE_YEAR.search(user_input)
+    if year_match:
+        search_criteria['year'] = year_match.group(1)
+
+    director_match = _MOVIE_DIRECTOR.search(user_input)
+    if director_match:
+        search_criteria['director'] = director_match.group(1)
+
+    rating_match = _MOVIE_RATING.search(user_input)
+    if rating_match:
+        search_criteria['min_rating'] = float(rating_match.group(1))
+
+    resolved = bool(search_criteria) and all(
+        _is_proper_name(search_criteria[field], user_input) for field in ('actor', 'director') if field in search_criteria
+    )
+
+    # Without genre/actor/director context, assume the first capitalized name is an actor
+    if 'genre' not in search_criteria and 'actor' not in search_criteria and 'director' not in search_criteria:
+        name_match = _NAME_PATTERN.search(user_input)
+        if name_match:
+            search_criteria['actor'] = name_match.group(1)
+            resolved = False
+
+    return search_criteria, count, resolved
+
+
+def parse_music(user_input: str) -> Tuple[Dict[str, Any], int, bool]:
+    """Extract music criteria, count, and whether explicit patterns (not fallbacks) resolved them"""
+    search_criteria = {}
+
+    genre_match = _MUSIC_GENRE.search(user_input)
+    if genre_match:
+        search_criteria['genre'] = genre_match.group(1).lower()
+
+    count_match = _MUSIC_COUNT.search(user_input)
+    count = int(count_match.group(1)) if count_match else DEFAULT_COUNT
+
+    artist_match = _MUSIC_ARTIST.search(user_input)
+    if artist_match:
+        search_criteria['artist'] = artist_match.group(1)
+
+    term_match = _MUSIC_TERM.search(user_input)
+    if term_match:
+        search_criteria['term'] = term_match.group(1)
+
+    resolved = bool(search_criteria) and ('artist' not in search_criteria
+                                          or _is_proper_name(search_criteria['artist'], user_input))
+
+    if not search_criteria:
+        name_match = _NAME_PATTERN.search(user_input)
+        if name_match:
+            search_criteria['artist'] = name_match.group(1)
+        else:
+            # Fall back to the whole query as a general search term
+            search_criteria['term'] = user_input
+
+    return search_criteria, count, resolved
+
+
+def parse_news(user_input: str) -> Tuple[str, int]:
+    """Extract the news topic and article count"""
+    count_match = _NEWS_COUNT.search(user_input)
+    count = int(count_match.group(1)) if count_match else DEFAULT_COUNT
+
+    cleaned_query = user_input
+    for prefix in _NEWS_PREFIXES:
+        cleaned_query = prefix.sub("", cleaned_query)
+
+    return cleaned_query, count
+
+
+def _analyze(user_input: str) -> ParsedQuery:
+    counts, found = keyword_counts(user_input.lower())
+    query_type = _classify(counts, found)
+
+    if query_type == "movie":
+        criteria, count, resolved = parse_movie(user_input)
+        return ParsedQuery(query_type, tuple(criteria.items()), count, resolved, None, counts)
+    elif query_type == "music":
+        criteria, count, resolved = parse_music(user_input)
+        return ParsedQuery(query_type, tuple(criteria.items()), count, resolved, None, counts)
+    elif query_type == "news":
+        search_query, count = parse_news(user_input)
+        return ParsedQuery(query_type, (), count, True, search_query, counts)
+    else:
+        return ParsedQuery(query_type, (), DEFAULT_COUNT, False, user_input, counts)
+
+
+@lru_cache(maxsize=4096)
+def analyze_query(user_input: str) -> ParsedQuery:
+    """Classify a query and extract the criteria for its type in one pass (memoized)"""
+    return _analyze(user_input)
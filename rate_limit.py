@@ -0,0 +1,379 @@
+"""
+Per-provider token-bucket rate limiting shared by every thread in the process.
+
+Each upstream provider (TMDB, iTunes, SERP API, the Together LLM endpoint) gets its
+own bucket. Callers that find a bucket empty queue for the next token, and queued
+interactive requests are always served before queued batch work.
+
+Configure per deployment with RATE_LIMIT_<PROVIDER>="<requests per second>[/<burst>]",
+e.g. RATE_LIMIT_SERP=2/5; "0" or "off" removes a provider's limit.
+"""
+import asyncio
+import contextvars
+import heapq
+import itertools
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+
+# Queue priorities: lower values are served first
+INTERACTIVE = 0
+BATCH = 1
+PRIORITY_NAMES = {INTERACTIVE: "interactive", BATCH: "batch"}
+
+# (requests per second, burst) used unless overridden by RATE_LIMIT_<PROVIDER>
+DEFAULT_LIMITS: Dict[str, Tuple[float, float]] = {
+    "tmdb": (40.0, 40.0),
+    "itunes": (20 / 60.0, 20.0),
+}
+
+# Seconds a caller may queue before giving up, per priority
+DEFAULT_MAX_WAIT = {INTERACTIVE: 30.0, BATCH: 600.0}
+
+HOST_PROVIDERS = {
+    "api.themoviedb.org": "tmdb",
+    "itunes.apple.com": "itunes",
+    "serpapi.com": "serp",
+    "api.together.xyz": "together",
+}
+
+_priority: contextvars.ContextVar = contextvars.ContextVar("rate_limit_priority", default=INTERACTIVE)
+_wait_log: contextvars.ContextVar = contextvars.ContextVar("rate_limit_wait_log", default=None)
+
+
+class RateLimitTimeout(Exception):
+    """Raised when a caller waited longer than its allowed maximum for a token"""
+
+
+@contextmanager
+def request_priority(priority: int):
+    """Run the enclosed calls (and threads started with a copy of this context) at the given priority"""
+    token = _priority.set(priority)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+def current_priority() -> int:
+    return _priority.get()
+
+
+@contextmanager
+def track_waits():
+    """Collect the seconds spent waiting for tokens within this context; yields a list of waits"""
+    waits: List[float] = []
+    token = _wait_log.set(waits)
+    try:
+        yield waits
+    finally:
+        _wait_log.reset(token)
+
+
+def provider_for_url(url: str) -> Optional[str]:
+    """Map a request URL to its rate-limited provider name (None if unknown)"""
+    return HOST_PROVIDERS.get(urlsplit(url).hostname or "")
+
+
+class TokenBucket:
+    """Thread-safe token bucket with a priority-ordered wait queue"""
+
+    def __init__(self, rate: float, burst: float):
+        """
+        Args:
+            rate: Tokens added per second
+            burst: Bucket capacity (requests allowed back to back after idling)
+        """
+        self.rate = rate
+        self.capacity = max(1.0, burst)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._cond = threading.Condition()
+        self._waiters: List[Tuple[int, int]] = []
+        self._seq = itertools.count()
+        self._stats = {"acquired": 0, "waited": 0, "timeouts": 0, "total_wait": 0.0, "max_wait": 0.0}
+
+    def _refill(self, now: float):
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def _record(self, waited: float):
+        self._stats["acquired"] += 1
+        if waited > 0:
+            self._stats["waited"] += 1
+            self._stats["total_wait"] += waited
+            self._stats["max_wait"] = max(self._stats["max_wait"], waited)
+
+    def try_acquire(self) -> bool:
+        """Take a token only if one is free and nobody is queued ahead"""
+        with self._cond:
+            self._refill(time.monotonic())
+            if not self._waiters and self._tokens >= 1:
+                self._tokens -= 1
+                self._record(0.0)
+                return True
+            return False
+
+    def acquire(self, priority: int = INTERACTIVE, timeout: Optional[float] = None) -> float:
+        """
+        Block until a token is available
+
+        Args:
+            priority: Queue priority (INTERACTIVE before BATCH)
+            timeout: Maximum seconds to wait (None waits indefinitely)
+
+        Returns:
+            Seconds spent waiting
+
+        Raises:
+            RateLimitTimeout: If no token became available within timeout
+        """
+        with self._cond:
+            start = time.monotonic()
+            self._refill(start)
+            if not self._waiters and self._tokens >= 1:
+                self._tokens -= 1
+                self._record(0.0)
+                return 0.0
+
+            entry = (priority, next(self._seq))
+            heapq.heappush(self._waiters, entry)
+            deadline = start + timeout if timeout is not None else None
+            while True:
+                now = time.monotonic()
+                self._refill(now)
+                at_head = self._waiters[0] == entry
+                if at_head and self._tokens >= 1:
+                    heapq.heappop(self._waiters)
+                    self._tokens -= 1
+                    waited = now - start
+                    self._record(waited)
+                    # Let the next queued caller re-check
+                    self._cond.notify_all()
+                    return waited
+
+                if deadline is not None and now >= deadline:
+                    self._waiters.remove(entry)
+                    heapq.heapify(self._waiters)
+                    self._stats["timeouts"] += 1
+                    self._cond.notify_all()
+                    raise RateLimitTimeout(f"No rate-limit token within {timeout:.1f}s")
+
+                # The head sleeps until its token is due; everyone else until the head moves
+                wait_for = (1 - self._tokens) / self.rate if at_head else None
+                if deadline is not None:
+                    remaining = deadline - now
+                    wait_for = remaining if wait_for is None else min(wait_for, remaining)
+                self._cond.wait(wait_for)
+
+    async def aacquire(self, priority: int = INTERACTIVE, timeout: Optional[float] = None) -> float:
+        """
+        Async variant of acquire that queues in the same priority order without holding a thread
+
+        The caller sleeps on the event loop until its token should be due, estimated from
+        its place in the queue, and re-checks; the bucket lock is only held for those checks.
+
+        Args:
+            priority: Queue priority (INTERACTIVE before BATCH)
+            timeout: Maximum seconds to wait (None waits indefinitely)
+
+        Returns:
+            Seconds spent waiting
+
+        Raises:
+            RateLimitTimeout: If no token became available within timeout
+        """
+        with self._cond:
+            start = time.monotonic()
+            self._refill(start)
+            if not self._waiters and self._tokens >= 1:
+                self._tokens -= 1
+                self._record(0.0)
+                return 0.0
+            entry = (priority, next(self._seq))
+            heapq.heappush(self._waiters, entry)
+        deadline = start + timeout if timeout is not None else None
+
+        try:
+            while True:
+                with self._cond:
+                    now = time.monotonic()
+                    self._refill(now)
+                    if self._waiters[0] == entry and self._tokens >= 1:
+                        heapq.heappop(self._waiters)
+                        self._tokens -= 1
+                        waited = now - start
+                        self._record(waited)
+                        self._cond.notify_all()
+                        return waited
+
+                    if deadline is not None and now >= deadline:
+                        self._waiters.remove(entry)
+                        heapq.heapify(self._waiters)
+                        self._stats["timeouts"] += 1
+                        self._cond.notify_all()
+                        raise RateLimitTimeout(f"No rate-limit token within {timeout:.1f}s")
+
+                    # Wake a blocked thread at the head if its token is already free
+                    if self._tokens >= 1:
+                        self._cond.notify_all()
+                    ahead = sum(1 for waiter in self._waiters if waiter < entry)
+                    sleep_for = max((ahead + 1 - self._tokens) / self.rate, 0.001)
+                    if deadline is not None:
+                        sleep_for = min(sleep_for, deadline - now)
+                await asyncio.sleep(sleep_for)
+        except asyncio.CancelledError:
+            with self._cond:
+                if entry in self._waiters:
+                    self._waiters.remove(entry)
+                    heapq.heapify(self._waiters)
+                    self._cond.notify_all()
+            raise
+
+    def stats(self) -> Dict:
+        with self._cond:
+            self._refill(time.monotonic())
+            depth_by_priority: Dict[str, int] = {}
+            for priority, _ in self._waiters:
+                name = PRIORITY_NAMES.get(priority, str(priority))
+                depth_by_priority[name] = depth_by_priority.get(name, 0) + 1
+            waited = self._stats["waited"]
+            return {
+                "rate": self.rate,
+                "burst": self.capacity,
+                "tokens": round(self._tokens, 2),
+                "queue_depth": len(self._waiters),
+                "queue_depth_by_priority": depth_by_priority,
+                "acquired": self._stats["acquired"],
+                "waited": waited,
+                "timeouts": self._stats["timeouts"],
+                "avg_wait_ms": round(self._stats["total_wait"] / waited * 1000, 1) if waited else 0.0,
+                "max_wait_ms": round(self._stats["max_wait"] * 1000, 1)
+            }
+
+
+def parse_limit(value: str) -> Optional[Tuple[float, float]]:
+    """Parse "rate[/burst]" (burst defaults to max(1, rate)); "0"/"off" means unlimited"""
+    value = value.strip().lower()
+    if value in ("", "0", "off", "none"):
+        return None
+    rate, _, burst = value.partition("/")
+    rate = float(rate)
+    if rate <= 0:
+        return None
+    return rate, float(burst) if burst else max(1.0, rate)
+
+
+class RateLimiter:
+    """Registry of per-provider buckets"""
+
+    def __init__(self, limits: Optional[Dict[str, Tuple[float, float]]] = None,
+                 max_wait: Optional[Dict[int, float]] = None):
+        """
+        Args:
+            limits: provider -> (requests per second, burst); providers not listed are unlimited
+            max_wait: priority -> seconds a caller may queue before RateLimitTimeout
+        """
+        self.buckets = {provider: TokenBucket(rate, burst) for provider, (rate, burst) in (limits or {}).items()}
+        self.max_wait = dict(DEFAULT_MAX_WAIT)
+        self.max_wait.update(max_wait or {})
+
+    @classmethod
+    def from_env(cls, overrides: Optional[Dict[str, str]] = None) -> "RateLimiter":
+        """Build from DEFAULT_LIMITS, RATE_LIMIT_<PROVIDER> variables and then explicit overrides"""
+        limits = dict(DEFAULT_LIMITS)
+        settings = {
+            key[len("RATE_LIMIT_"):].lower(): value
+            for key, value in os.environ.items()
+            if key.startswith("RATE_LIMIT_") and key not in ("RATE_LIMIT_MAX_WAIT", "RATE_LIMIT_BATCH_MAX_WAIT")
+        }
+        settings.update(overrides or {})
+        for provider, value in settings.items():
+            limit = parse_limit(value)
+            if limit is None:
+                limits.pop(provider, None)
+            else:
+                limits[provider] = limit
+
+        return cls(limits, max_wait={
+            INTERACTIVE: float(os.getenv("RATE_LIMIT_MAX_WAIT", DEFAULT_MAX_WAIT[INTERACTIVE])),
+            BATCH: float(os.getenv("RATE_LIMIT_BATCH_MAX_WAIT", DEFAULT_MAX_WAIT[BATCH]))
+        })
+
+    def acquire(self, provider: Optional[str], priority: Optional[int] = None,
+                timeout: Optional[float] = None) -> float:
+        """
+        Wait for the provider's next token at the given (or current context's) priority
+
+        Args:
+            provider: Bucket name (None or an unlimited provider returns at once)
+            priority: Queue priority (default: the current context's)
+            timeout: Wait at most this long, if shorter than the priority's maximum wait
+
+        Returns:
+            Seconds spent waiting (0 for unlimited providers)
+        """
+        bucket = self.buckets.get(provider) if provider else None
+        if bucket is None:
+            return 0.0
+        priority, max_wait = self._queue_limits(priority, timeout)
+        return self._log_wait(bucket.acquire(priority, timeout=max_wait))
+
+    def _queue_limits(self, priority: Optional[int], timeout: Optional[float]) -> Tuple[int, Optional[float]]:
+        if priority is None:
+            priority = current_priority()
+        max_wait = self.max_wait.get(priority)
+        if timeout is not None:
+            max_wait = timeout if max_wait is None else min(max_wait, timeout)
+        return priority, max_wait
+
+    @staticmethod
+    def _log_wait(waited: float) -> float:
+        waits = _wait_log.get()
+        if waits is not None:
+            waits.append(waited)
+        return waited
+
+    def acquire_for_url(self, url: str, priority: Optional[int] = None) -> float:
+        return self.acquire(provider_for_url(url), priority)
+
+    async def aacquire(self, provider: Optional[str], priority: Optional[int] = None,
+                       timeout: Optional[float] = None) -> float:
+        """Async variant of acquire; waits on the event loop, not on a worker thread"""
+        bucket = self.buckets.get(provider) if provider else None
+        if bucket is None:
+            return 0.0
+        priority, max_wait = self._queue_limits(priority, timeout)
+        return self._log_wait(await bucket.aacquire(priority, timeout=max_wait))
+
+    async def aacquire_for_url(self, url: str, priority: Optional[int] = None) -> float:
+        return await self.aacquire(provider_for_url(url), priority)
+
+    def stats(self) -> Dict[str, Dict]:
+        return {provider: bucket.stats() for provider, bucket in self.buckets.items()}
+
+
+_default_limiter: Optional[RateLimiter] = None
+_default_limiter_lock = threading.Lock()
+
+
+def get_rate_limiter() -> RateLimiter:
+    """Return the process-wide limiter, creating it from the environment on first use"""
+    global _default_limiter
+    if _default_limiter is None:
+        with _default_limiter_lock:
+            if _default_limiter is None:
+                _default_limiter = RateLimiter.from_env()
+    return _default_limiter
+
+
+def configure_rate_limiter(limiter: RateLimiter) -> RateLimiter:
+    """Replace the process-wide limiter"""
+    global _default_limiter
+    with _default_limiter_lock:
+        _default_limiter = limiter
+    return _default_limiter
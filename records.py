@@ -0,0 +1,165 @@
+"""
+Compact record types for provider results.
+
+Movies, songs, news articles and web results are slotted objects instead of
+per-item dicts. A record stores only its values; the field names live once on the
+class, which is what keeps large caches and batch runs small. Records keep the
+read-only dict interface the renderers and tools use (get, [], in), so items can
+be either records or dicts from older cache entries.
+
+Serialization:
+    to_dict() / json_default     JSON for API responses and SSE events
+    encode_record / decode_record tagged array form ({"__r": kind, "v": [...]}) for storage
+    packb / unpackb              msgpack in the same tagged form (needs the msgpack package)
+
+HTML (e.g. the song preview <audio> player) is produced by result_renderers.py at
+presentation time, never stored in a record.
+"""
+import json
+from typing import Any, Dict, Type
+
+
+class Record:
+    """Base for slotted result records; subclasses list their fields in __slots__"""
+
+    __slots__ = ()
+    KIND = ""
+
+    def __init__(self, *values, **fields):
+        names = self.__slots__
+        if len(values) > len(names):
+            raise TypeError(f"{type(self).__name__} takes at most {len(names)} values")
+        for name, value in zip(names, values):
+            setattr(self, name, value)
+        for name in names[len(values):]:
+            setattr(self, name, fields.pop(name, None))
+        if fields:
+            raise TypeError(f"{type(self).__name__} has no field(s) {', '.join(fields)}")
+
+    # Read-only mapping interface, so code written against item dicts keeps working
+
+    def get(self, field: str, default=None):
+        value = getattr(self, field, None) if field in self.__slots__ else None
+        return default if value is None else value
+
+    def __getitem__(self, field: str):
+        if field not in self.__slots__:
+            raise KeyError(field)
+        return getattr(self, field)
+
+    def __contains__(self, field: str) -> bool:
+        return field in self.__slots__ and getattr(self, field) is not None
+
+    def keys(self):
+        return [name for name in self.__slots__ if getattr(self, name) is not None]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {name: getattr(self, name) for name in self.__slots__ if getattr(self, name) is not None}
+
+    def to_list(self) -> list:
+        return [getattr(self, name) for name in self.__slots__]
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Record":
+        return cls(**{name: data.get(name) for name in cls.__slots__})
+
+    @classmethod
+    def from_list(cls, values) -> "Record":
+        return cls(*values)
+
+    def __eq__(self, other):
+        return type(other) is type(self) and other.to_list() == self.to_list()
+
+    def __repr__(self):
+        fields = ", ".join(f"{name}={value!r}" for name, value in self.to_dict().items())
+        return f"{type(self).__name__}({fields})"
+
+    def __deepcopy__(self, memo):
+        # Values are scalars, so a new record with the same values is a deep copy
+        return type(self)(*self.to_list())
+
+
+class MovieRecord(Record):
+    __slots__ = ("title", "year", "rating", "description", "thumbnail", "link", "director", "runtime", "genres")
+    KIND = "movie"
+
+
+class SongRecord(Record):
+    __slots__ = ("title", "artist", "album", "genre", "release_date", "preview_url", "artwork", "track_url", "popularity")
+    KIND = "song"
+
+
+class NewsRecord(Record):
+    __slots__ = ("title", "source", "date", "link", "thumbnail", "snippet")
+    KIND = "news"
+
+
+class WebResult(Record):
+    __slots__ = ("title", "link", "snippet")
+    KIND = "web"
+
+
+class KnowledgeGraph(Record):
+    __slots__ = ("title", "type", "description", "thumbnail")
+    KIND = "knowledge_graph"
+
+
+RECORD_TYPES: Dict[str, Type[Record]] = {
+    record_type.KIND: record_type
+    for record_type in (MovieRecord, SongRecord, NewsRecord, WebResult, KnowledgeGraph)
+}
+
+
+def is_error(item) -> bool:
+    """Whether a result item is an {"error": ...} placeholder rather than a record"""
+    return isinstance(item, dict) and "error" in item
+
+
+def json_default(obj):
+    """json.dumps default= hook for API output: records become plain dicts"""
+    if isinstance(obj, Record):
+        return obj.to_dict()
+    return str(obj)
+
+
+def encode_record(obj):
+    """json.dumps / msgpack default= hook for storage: records become tagged value arrays"""
+    if isinstance(obj, Record):
+        return {"__r": obj.KIND, "v": obj.to_list()}
+    return str(obj)
+
+
+def decode_record(data: Dict[str, Any]):
+    """json.loads / msgpack object_hook reversing encode_record"""
+    kind = data.get("__r")
+    if kind is not None and len(data) == 2 and "v" in data:
+        record_type = RECORD_TYPES.get(kind)
+        if record_type is not None:
+            return record_type.from_list(data["v"])
+    return data
+
+
+def dumps(value) -> str:
+    """Serialize a result (records nested anywhere) to storage JSON"""
+    return json.dumps(value, default=encode_record, separators=(",", ":"))
+
+
+def loads(payload: str):
+    return json.loads(payload, object_hook=decode_record)
+
+
+def _msgpack():
+    try:
+        import msgpack
+    except ImportError:
+        raise ImportError("msgpack serialization needs the msgpack package (pip install msgpack)")
+    return msgpack
+
+
+def packb(value) -> bytes:
+    """Serialize a result (records nested anywhere) to msgpack"""
+    return _msgpack().packb(value, default=encode_record, use_bin_type=True)
+
+
+def unpackb(payload: bytes):
+    return _msgpack().unpackb(payload, object_hook=decode_record, raw=False)
@@ -0,0 +1,358 @@
+import asyncio
+import copy
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Any, Awaitable, Callable, Optional
+
+import records
+from tracing import trace_error
+
+
+# Default time-to-live (seconds) per provider; news goes stale fast, movie metadata barely changes
+DEFAULT_TTLS = {
+    "news": 15 * 60,
+    "web": 60 * 60,
+    "tmdb": 24 * 60 * 60,
+    "itunes": 12 * 60 * 60,
+}
+
+# Request parameters that must never become part of a cache key
+_SECRET_PARAMS = {"api_key", "read_access_token", "token"}
+
+
+def _normalize(value):
+    """Normalize query parameters so equivalent requests share a key"""
+    if isinstance(value, str):
+        return " ".join(value.lower().split())
+    if isinstance(value, dict):
+        return {str(k): _normalize(v) for k, v in value.items()
+                if k not in _SECRET_PARAMS and v not in (None, "", [], {})}
+    if isinstance(value, (list, tuple)):
+        return [_normalize(v) for v in value]
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    return value
+
+
+def make_cache_key(provider: str, params: Dict[str, Any]) -> str:
+    """Build a stable key from the provider name and normalized query parameters"""
+    payload = json.dumps(_normalize(params), sort_keys=True, separators=(",", ":"), default=str)
+    return f"{provider}:{hashlib.sha1(payload.encode('utf-8')).hexdigest()}"
+
+
+def is_cacheable(value) -> bool:
+    """Error results are never cached"""
+    if value is None:
+        return False
+    if isinstance(value, dict):
+        return "error" not in value
+    if isinstance(value, list):
+        return not any(isinstance(item, dict) and "error" in item for item in value)
+    return True
+
+
+class MemoryLRUCache:
+    """Thread-safe in-memory LRU with per-entry expiry and a size cap"""
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.evictions = 0
+
+    def get(self, key: str):
+        """Return (found, value); expired entries are dropped"""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return False, None
+            expires_at, value = entry
+            if expires_at < time.time():
+                del self._data[key]
+                return False, None
+            self._data.move_to_end(key)
+            return True, value
+
+    def set(self, key: str, value, ttl: float):
+        with self._lock:
+            self._data[key] = (time.time() + ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, key: str):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+class DiskCache:
+    """SQLite-backed cache tier that survives restarts and is shared by worker processes"""
+
+    def __init__(self, path: str, serializer: str = "json"):
+        """
+        Args:
+            path: SQLite file
+            serializer: "json" or "msgpack" for new rows; rows in either format are readable
+        """
+        self.path = path
+        self.serializer = serializer
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=5, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)"
+        )
+
+    def get(self, key: str):
+        """Return (found, value, expires_at); expired rows are deleted"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, expires_at FROM cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return False, None, None
+            if row[1] < time.time():
+                self._conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+                return False, None, None
+        # Records are stored as tagged value arrays and come back as records
+        payload = row[0]
+        value = records.unpackb(payload) if isinstance(payload, bytes) else records.loads(payload)
+        return True, value, row[1]
+
+    def set(self, key: str, value, ttl: float):
+        payload = records.packb(value) if self.serializer == "msgpack" else records.dumps(value)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO cache (key, value, expires_at) VALUES (?, ?, ?)",
+                (key, payload, time.time() + ttl)
+            )
+
+    def delete(self, key: str):
+        with self._lock:
+            self._conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+
+    def purge_expired(self) -> int:
+        with self._lock:
+            cursor = self._conn.execute("DELETE FROM cache WHERE expires_at < ?", (time.time(),))
+            return cursor.rowcount
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM cache")
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class TieredCache:
+    """Memory LRU in front of an optional disk tier, with per-provider TTLs and counters"""
+
+    def __init__(self,
+                 memory: Optional[MemoryLRUCache] = None,
+                 disk: Optional[DiskCache] = None,
+                 ttls: Optional[Dict[str, float]] = None,
+                 bypass: bool = False):
+        """
+        Args:
+            memory: Memory tier (a 1024-entry LRU if not given)
+            disk: Disk tier, or None to keep the cache in memory only
+            ttls: Per-provider TTLs in seconds, merged over DEFAULT_TTLS
+            bypass: Skip the cache entirely (reads and writes)
+        """
+        self.memory = memory or MemoryLRUCache()
+        self.disk = disk
+        self.ttls = dict(DEFAULT_TTLS)
+        if ttls:
+            self.ttls.update(ttls)
+        self.bypass = bypass
+
+        self._lock = threading.Lock()
+        self._counters = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "sets": 0, "bypassed": 0, "errors": 0}
+
+    @classmethod
+    def from_env(cls) -> "TieredCache":
+        """Build a cache from SEARCH_CACHE_* / CACHE_TTL_* environment variables"""
+        disk = None
+        if os.getenv("SEARCH_CACHE_DISK", "1").lower() not in ("0", "false", "no"):
+            disk = DiskCache(os.getenv("SEARCH_CACHE_PATH", os.path.join(".cache", "search_cache.sqlite3")),
+                             serializer=os.getenv("SEARCH_CACHE_SERIALIZER", "json").lower())
+        ttls = {}
+        for provider in DEFAULT_TTLS:
+            value = os.getenv(f"CACHE_TTL_{provider.upper()}")
+            if value:
+                ttls[provider] = float(value)
+        return cls(
+            memory=MemoryLRUCache(int(os.getenv("SEARCH_CACHE_MAX_ENTRIES", 1024))),
+            disk=disk,
+            ttls=ttls,
+            bypass=os.getenv("SEARCH_CACHE_BYPASS", "0").lower() in ("1", "true", "yes")
+        )
+
+    def _count(self, name: str):
+        with self._lock:
+            self._counters[name] += 1
+
+    def get(self, provider: str, params: Dict[str, Any]):
+        """Return (found, value) for a provider request, checking memory then disk"""
+        key = make_cache_key(provider, params)
+        found, value = self.memory.get(key)
+        if found:
+            self._count("memory_hits")
+            return True, copy.deepcopy(value)
+
+        if self.disk is not None:
+            try:
+                found, value, expires_at = self.disk.get(key)
+            except Exception as e:
+                trace_error("cache_read", e, provider=provider)
+                self._count("errors")
+                found = False
+            if found:
+                self._count("disk_hits")
+                # Promote to memory only for what is left of the row's TTL, so it expires in both tiers together
+                remaining = expires_at - time.time()
+                if remaining > 0:
+                    self.memory.set(key, value, remaining)
+                return True, copy.deepcopy(value)
+
+        self._count("misses")
+        return False, None
+
+    def set(self, provider: str, params: Dict[str, Any], value):
+        key = make_cache_key(provider, params)
+        ttl = self.ttls.get(provider, 300)
+        self.memory.set(key, copy.deepcopy(value), ttl)
+        if self.disk is not None:
+            try:
+                self.disk.set(key, value, ttl)
+            except Exception as e:
+                trace_error("cache_write", e, provider=provider)
+                self._count("errors")
+        self._count("sets")
+
+    async def aget(self, provider: str, params: Dict[str, Any]):
+        """Async variant of get; the disk tier is read in a worker thread so SQLite never blocks the event loop"""
+        if self.disk is None:
+            return self.get(provider, params)
+        found, value = self.memory.get(make_cache_key(provider, params))
+        if found:
+            self._count("memory_hits")
+            return True, copy.deepcopy(value)
+        return await asyncio.to_thread(self.get, provider, params)
+
+    async def aset(self, provider: str, params: Dict[str, Any], value):
+        """Async variant of set; the disk write runs in a worker thread"""
+        if self.disk is None:
+            self.set(provider, params, value)
+        else:
+            await asyncio.to_thread(self.set, provider, params, value)
+
+    def get_or_fetch(self, provider: str, params: Dict[str, Any], fetch: Callable[[], Any], bypass: bool = False):
+        """
+        Return a cached result or call fetch() and cache what it returns
+
+        Args:
+            provider: Provider name, used for the TTL and key namespace
+            params: Query parameters identifying the request
+            fetch: Zero-argument callable performing the real request
+            bypass: Skip the cache for this call
+
+        Returns:
+            The cached or freshly fetched value
+        """
+        if bypass or self.bypass:
+            self._count("bypassed")
+            return fetch()
+
+        found, value = self.get(provider, params)
+        if found:
+            return value
+
+        value = fetch()
+        if is_cacheable(value):
+            self.set(provider, params, value)
+        return value
+
+    async def aget_or_fetch(self, provider: str, params: Dict[str, Any], fetch: Callable[[], Awaitable[Any]],
+                            bypass: bool = False):
+        """Async variant of get_or_fetch; fetch() returns an awaitable"""
+        if bypass or self.bypass:
+            self._count("bypassed")
+            return await fetch()
+
+        found, value = await self.aget(provider, params)
+        if found:
+            return value
+
+        value = await fetch()
+        if is_cacheable(value):
+            await self.aset(provider, params, value)
+        return value
+
+    def invalidate(self, provider: str, params: Dict[str, Any]):
+        key = make_cache_key(provider, params)
+        self.memory.delete(key)
+        if self.disk is not None:
+            self.disk.delete(key)
+
+    def clear(self):
+        self.memory.clear()
+        if self.disk is not None:
+            self.disk.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            counters = dict(self._counters)
+        hits = counters["memory_hits"] + counters["disk_hits"]
+        lookups = hits + counters["misses"]
+        counters.update({
+            "hits": hits,
+            "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.memory.evictions,
+            "memory_entries": len(self.memory),
+            "memory_max_entries": self.memory.max_entries,
+            "disk_enabled": self.disk is not None,
+            "bypass": self.bypass,
+            "ttls": dict(self.ttls)
+        })
+        return counters
+
+
+_default_cache: Optional[TieredCache] = None
+_default_cache_lock = threading.Lock()
+
+
+def get_response_cache() -> TieredCache:
+    """Return the process-wide response cache, creating it on first use"""
+    global _default_cache
+    if _default_cache is None:
+        with _default_cache_lock:
+            if _default_cache is None:
+                _default_cache = TieredCache.from_env()
+    return _default_cache
+
+
+def configure_response_cache(cache: TieredCache) -> TieredCache:
+    """Replace the process-wide response cache"""
+    global _default_cache
+    with _default_cache_lock:
+        _default_cache = cache
+    return _default_cache
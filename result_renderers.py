@@ -0,0 +1,42 @@
+from typing import Dict, List
+
+
+def audio_player(preview_url: str) -> str:
+    """HTML5 audio player for a song preview URL"""
+    if not preview_url:
+        return "Not available"
+    return f'<audio controls style="height:30px"><source src="{preview_url}" type="audio/mpeg"></audio>'
+
+
+def render_movies(movies: List[Dict]) -> str:
+    """Render TMDB movie records as markdown in the same layout the movie task asks the LLM for"""
+    blocks = []
+    for movie in movies:
+        blocks.append("\n".join([
+            f"- **Title:** {movie.get('title', 'Unknown Title')} ({movie.get('year', 'N/A')})",
+            f"- **Rating:** {movie.get('rating', 'N/A')}/10",
+            f"- **Director:** {movie.get('director', 'N/A')}",
+            f"- **Genres:** {movie.get('genres') or 'N/A'}",
+            f"- **Runtime:** {movie.get('runtime') or 'N/A'} minutes",
+            f"- **Description:** {movie.get('description', 'No description available')}",
+            f"- **Thumbnail:** ![Thumbnail]({movie.get('thumbnail', '')})",
+            f"- **Link:** [Link]({movie.get('link', '#')})",
+        ]))
+    return "\n\n".join(blocks)
+
+
+def render_songs(songs: List[Dict]) -> str:
+    """Render iTunes song records as markdown in the same layout the music task asks the LLM for"""
+    blocks = []
+    for song in songs:
+        blocks.append("\n".join([
+            f"- **Title:** {song.get('title', 'Unknown Track')}",
+            f"- **Artist:** {song.get('artist', 'Unknown Artist')}",
+            f"- **Album:** {song.get('album', 'Unknown Album')}",
+            f"- **Genre:** {song.get('genre', 'Unknown Genre')}",
+            f"- **Release Date:** {song.get('release_date', 'Unknown')}",
+            f"- **Preview:** {audio_player(song.get('preview_url'))}",
+            f"- **Artwork:** ![Album Cover]({song.get('artwork', '')})",
+            f"- **Link:** [Listen Link]({song.get('track_url', '#')})",
+        ]))
+    return "\n\n".join(blocks)
@@ -0,0 +1,274 @@
+import contextvars
+import json
+import os
+import queue
+import threading
+from contextlib import contextmanager
+from typing import Any, Callable, Iterator, Optional
+
+from records import json_default
+from singleflight import shared_with_waiters
+from tracing import trace_error
+
+
+_current_stream: contextvars.ContextVar = contextvars.ContextVar("search_event_stream", default=None)
+# The LLM attempt whose tokens the current thread produces (see llm_attempt)
+_current_attempt: contextvars.ContextVar = contextvars.ContextVar("search_llm_attempt", default=None)
+
+# Sentinel marking the end of a stream
+_CLOSED = object()
+
+
+class SearchCancelled(Exception):
+    """Raised at the next LLM call of a streamed search whose client has gone away"""
+
+
+class EventStream:
+    """
+    Thread-safe queue of (event, data) pairs produced while a search runs
+
+    Token events beyond max_pending unread events are dropped (the final "result"
+    event carries the whole answer); other events are always queued. Once the
+    reader cancels the stream, every emit is a no-op.
+    """
+
+    def __init__(self, max_pending: Optional[int] = None):
+        self.max_pending = max_pending if max_pending is not None else int(os.getenv("STREAM_MAX_PENDING", 1000))
+        self.cancelled = False
+        self.dropped_tokens = 0
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._attempt: Optional[object] = None
+        self._attempt_chars = 0
+
+    def emit(self, event: str, data: Any) -> bool:
+        """Queue an event; returns False when it was dropped"""
+        if self.cancelled:
+            return False
+        if event == "token" and self._queue.qsize() >= self.max_pending:
+            self.dropped_tokens += 1
+            return False
+        self._queue.put((event, data))
+        return True
+
+    def cancel(self):
+        """Stop accepting events: the reader is gone"""
+        self.cancelled = True
+
+    def begin_attempt(self) -> object:
+        """
+        Start an LLM attempt
+
+        A superseded attempt that streamed tokens is followed by a "reset" event whose
+        "discard" field is the number of characters of its text to remove.
+        """
+        with self._lock:
+            self._supersede()
+            self._attempt = object()
+            return self._attempt
+
+    def end_attempt(self, attempt: object, succeeded: bool):
+        """Finish an attempt; a failed one that streamed tokens is reset at once"""
+        with self._lock:
+            if self._attempt is not attempt:
+                return
+            if succeeded:
+                self._attempt = None
+                self._attempt_chars = 0
+            else:
+                self._supersede()
+
+    def abandon_attempts(self):
+        """Drop any token still arriving from an attempt the caller gave up on (e.g. at the deadline)"""
+        with self._lock:
+            self._supersede()
+
+    def emit_token(self, attempt: Optional[object], text: str):
+        with self._lock:
+            if attempt is not None and attempt is not self._attempt:
+                # A retried, failed-over or abandoned attempt that is still streaming
+                return
+            if self.emit("token", {"text": text}) and attempt is not None:
+                self._attempt_chars += len(text)
+
+    def _supersede(self):
+        if self._attempt is not None and self._attempt_chars:
+            self.emit("reset", {"discard": self._attempt_chars})
+        self._attempt = None
+        self._attempt_chars = 0
+
+    def close(self):
+        if not self.cancelled:
+            self._queue.put(_CLOSED)
+
+    def __iter__(self) -> Iterator:
+        while True:
+            item = self._queue.get()
+            if item is _CLOSED:
+                return
+            yield item
+
+
+@contextmanager
+def bind_stream(stream: EventStream):
+    """Route emit_event() calls made in this context (and threads started with its copy) to stream"""
+    token = _current_stream.set(stream)
+    try:
+        yield stream
+    finally:
+        _current_stream.reset(token)
+
+
+def emit_event(event: str, data: Any):
+    """Publish an event to the current request's stream; a no-op outside streaming requests"""
+    stream = _current_stream.get()
+    if stream is not None:
+        stream.emit(event, data)
+
+
+def streaming_active() -> bool:
+    return _current_stream.get() is not None
+
+
+def raise_if_cancelled():
+    """
+    Stop the current search if its stream's client has disconnected
+
+    A search other requests are waiting on (single-flight followers) keeps running for them.
+
+    Raises:
+        SearchCancelled: The stream was cancelled and nobody else needs the result
+    """
+    stream = _current_stream.get()
+    if stream is not None and stream.cancelled and not shared_with_waiters():
+        raise SearchCancelled("Client disconnected")
+
+
+@contextmanager
+def llm_attempt():
+    """
+    Mark one LLM attempt for the current stream
+
+    Tokens are forwarded only from the latest attempt, and an attempt that fails after
+    streaming tokens is followed by a "reset" event, so clients discard its partial text.
+    """
+    stream = _current_stream.get()
+    if stream is None:
+        yield
+        return
+    attempt = stream.begin_attempt()
+    token = _current_attempt.set(attempt)
+    succeeded = False
+    try:
+        yield
+        succeeded = True
+    finally:
+        _current_attempt.reset(token)
+        stream.end_attempt(attempt, succeeded)
+
+
+def abandon_llm_attempts():
+    """Discard the tokens of the current stream's unfinished LLM attempts (the call has given up on them)"""
+    stream = _current_stream.get()
+    if stream is not None:
+        stream.abandon_attempts()
+
+
+def format_sse(event: str, data: Any) -> str:
+    """Encode one Server-Sent Event"""
+    payload = json.dumps(data, default=json_default)
+    return f"event: {event}\ndata: {payload}\n\n"
+
+
+def stream_search(search: Callable[[str], Any], user_input: str,
+                  extract_content: Callable[[Any], str], default_type: str) -> Iterator[str]:
+    """
+    Run a search in a background thread and yield its events as SSE messages
+
+    Args:
+        search: Callable taking the user input (e.g. UnifiedSearchCrew.run)
+        user_input: The search query
+        extract_content: Turns the search result into the final answer string
+        default_type: Result type reported when the search result does not carry one
+
+    Yields:
+        SSE-formatted strings, ending with a "result" (or "error") event and "done"
+    """
+    _ensure_llm_token_listener()
+    # Copied now, while the request's trace is current: servers iterate the response after the view returns
+    context = contextvars.copy_context()
+    return _stream_events(context, search, user_input, extract_content, default_type)
+
+
+def _stream_events(context: contextvars.Context, search: Callable[[str], Any], user_input: str,
+                   extract_content: Callable[[Any], str], default_type: str) -> Iterator[str]:
+    stream = EventStream()
+
+    def worker():
+        with bind_stream(stream):
+            try:
+                result = search(user_input)
+                if isinstance(result, dict) and "error" in result and "result" not in result:
+                    stream.emit("error", {"error": f"An error occurred: {result['error']}"})
+                else:
+                    stream.emit("result", {
+                        "type": result.get("type", default_type) if isinstance(result, dict) else default_type,
+                        "content": extract_content(result),
+                        "cached": result.get("cached", False) if isinstance(result, dict) else False
+                    })
+            except SearchCancelled:
+                pass
+            except Exception as e:
+                trace_error("stream", e)
+                stream.emit("error", {"error": f"An error occurred: {str(e)}"})
+            finally:
+                stream.emit("done", {})
+                stream.close()
+
+    threading.Thread(target=context.run, args=(worker,), daemon=True, name="search-stream").start()
+
+    try:
+        for event, data in stream:
+            yield format_sse(event, data)
+    finally:
+        # Client disconnected (GeneratorExit) or stream finished: stop queueing, and stop the
+        # search at its next LLM call unless other requests share it
+        stream.cancel()
+
+
+def _register_llm_token_listener() -> Optional[Callable]:
+    """Forward crewai LLM stream chunks to the current request's stream, when crewai supports it"""
+    try:
+        from crewai.events import crewai_event_bus, LLMStreamChunkEvent
+    except ImportError:
+        try:
+            # Older crewai releases kept the event bus under crewai.utilities
+            from crewai.utilities.events import crewai_event_bus, LLMStreamChunkEvent
+        except ImportError as e:
+            trace_error("stream", e, detail="crewai LLM stream events unavailable; token events disabled")
+            return None
+
+    # crewai calls stream-chunk handlers synchronously in the LLM's thread, so the request's stream is bound
+    @crewai_event_bus.on(LLMStreamChunkEvent)
+    def on_llm_chunk(source, event):
+        stream = _current_stream.get()
+        if stream is not None and event.chunk:
+            stream.emit_token(_current_attempt.get(), event.chunk)
+
+    return on_llm_chunk
+
+
+# Registered by the first stream rather than at import: loading crewai's event bus pulls in all of crewai
+_llm_token_listener: Optional[Callable] = None
+_llm_token_listener_checked = False
+_llm_token_listener_lock = threading.Lock()
+
+
+def _ensure_llm_token_listener() -> Optional[Callable]:
+    global _llm_token_listener, _llm_token_listener_checked
+    if not _llm_token_listener_checked:
+        with _llm_token_listener_lock:
+            if not _llm_token_listener_checked:
+                _llm_token_listener = _register_llm_token_listener()
+                _llm_token_listener_checked = True
+    return _llm_token_listener
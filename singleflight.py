@@ -0,0 +1,177 @@
+import asyncio
+import contextvars
+import copy
+import hashlib
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from tracing import trace_error
+
+try:
+    import fcntl
+except ImportError:  # Windows: cross-worker locking is unavailable
+    fcntl = None
+
+
+# The flight the current thread is leading (set while a leader runs fn)
+_current_call: contextvars.ContextVar = contextvars.ContextVar("single_flight_call", default=None)
+
+
+class _Call:
+    """One in-flight execution shared by every caller with the same key"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error: Optional[BaseException] = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    """
+    Collapse concurrent calls with the same key into a single execution
+
+    In-process callers share one thread's result. With lock_dir set, the executing
+    caller also holds a per-key file lock, so other worker processes wait for it and
+    can then re-check a shared cache instead of repeating the work.
+    """
+
+    def __init__(self, lock_dir: Optional[str] = None, lock_timeout: float = 120.0):
+        """
+        Args:
+            lock_dir: Directory for per-key lock files (None keeps coalescing in-process)
+            lock_timeout: Seconds to wait for another worker's lock before running anyway
+        """
+        if lock_dir and fcntl is None:
+            trace_error("singleflight", "fcntl unavailable, cross-worker locking disabled")
+            lock_dir = None
+        if lock_dir:
+            os.makedirs(lock_dir, exist_ok=True)
+        self.lock_dir = lock_dir
+        self.lock_timeout = lock_timeout
+
+        self._lock = threading.Lock()
+        self._calls: Dict[str, _Call] = {}
+        self._async_calls: Dict[str, asyncio.Future] = {}
+        self._stats = {"executions": 0, "coalesced": 0, "lock_waits": 0}
+
+    @classmethod
+    def from_env(cls) -> "SingleFlight":
+        return cls(
+            lock_dir=os.getenv("SINGLE_FLIGHT_LOCK_DIR") or None,
+            lock_timeout=float(os.getenv("SINGLE_FLIGHT_LOCK_TIMEOUT", 120))
+        )
+
+    def do(self, key: str, fn: Callable[[], Any]) -> Tuple[Any, bool]:
+        """
+        Run fn() once for all concurrent callers with the same key
+
+        Args:
+            key: Identity of the work (e.g. normalized query and type)
+            fn: Zero-argument callable doing the work
+
+        Returns:
+            (result, shared) where shared is True for callers that reused another call's result
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self._stats["executions"] += 1
+            else:
+                call.waiters += 1
+                self._stats["coalesced"] += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            # Followers get their own top-level copy so per-response flags don't leak
+            return copy.copy(call.result), True
+
+        token = _current_call.set(call)
+        try:
+            with self._file_lock(key):
+                call.result = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            _current_call.reset(token)
+            with self._lock:
+                self._calls.pop(key, None)
+            call.done.set()
+        return call.result, False
+
+    async def ado(self, key: str, fn: Callable[[], Any]) -> Tuple[Any, bool]:
+        """Async variant of do(); fn() returns an awaitable. Coalesces within one event loop"""
+        future = self._async_calls.get(key)
+        if future is not None:
+            with self._lock:
+                self._stats["coalesced"] += 1
+            return copy.copy(await asyncio.shield(future)), True
+
+        future = asyncio.get_running_loop().create_future()
+        self._async_calls[key] = future
+        with self._lock:
+            self._stats["executions"] += 1
+        try:
+            result = await fn()
+            future.set_result(result)
+            return result, False
+        except BaseException as e:
+            future.set_exception(e)
+            # Mark the exception as retrieved when nobody else was waiting on it
+            future.exception()
+            raise
+        finally:
+            self._async_calls.pop(key, None)
+
+    @contextmanager
+    def _file_lock(self, key: str):
+        """Hold an exclusive per-key lock file across worker processes (no-op without lock_dir)"""
+        if not self.lock_dir:
+            yield
+            return
+
+        name = hashlib.sha1(key.encode("utf-8")).hexdigest()
+        with open(os.path.join(self.lock_dir, f"{name}.lock"), "a+") as lock_file:
+            acquired = False
+            waited = False
+            deadline = time.monotonic() + self.lock_timeout
+            while True:
+                try:
+                    fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    acquired = True
+                    break
+                except BlockingIOError:
+                    if not waited:
+                        waited = True
+                        with self._lock:
+                            self._stats["lock_waits"] += 1
+                    if time.monotonic() >= deadline:
+                        trace_error("singleflight", "lock wait timed out, running anyway", key=name)
+                        break
+                    time.sleep(0.05)
+            try:
+                yield
+            finally:
+                if acquired:
+                    fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+            stats["in_flight"] = len(self._calls) + len(self._async_calls)
+        stats["cross_worker"] = bool(self.lock_dir)
+        return stats
+
+
+def shared_with_waiters() -> bool:
+    """Whether the flight this thread (or a thread started with a copy of its context) is leading has followers"""
+    call = _current_call.get()
+    return call is not None and call.waiters > 0
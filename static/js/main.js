@@ -104,34 +104,23 @@ document.addEventListener('DOMContentLoaded', function () {
         resultsContainer.classList.add('hidden');
 
         // Update search type icon
-        let searchTypeIcon = 'fa-search';
-        switch (currentSearchType) {
-            case 'movie':
-                searchTypeIcon = 'fa-film';
-                break;
-            case 'music':
-                searchTypeIcon = 'fa-music';
-                break;
-            case 'news':
-                searchTypeIcon = 'fa-newspaper';
-                break;
-            case 'general':
-                searchTypeIcon = 'fa-globe';
-                break;
-        }
-
-        searchTypeDisplay.innerHTML = `<i class="fas ${searchTypeIcon}"></i> ${capitalizeFirstLetter(currentSearchType === 'all' ? 'Smart' : currentSearchType)} Search`;
+        setSearchTypeDisplay(currentSearchType);
 
         // Start timer
         const startTime = performance.now();
 
         try {
             let result;
+            const endpoint = currentSearchType === 'all' ? '/api/search' : `/api/${currentSearchType}`;
 
-            if (currentSearchType === 'all') {
-                result = await performSearch('/api/search', query);
-            } else {
-                result = await performSearch(`/api/${currentSearchType}`, query);
+            // Prefer the streaming endpoint; fall back to the plain JSON one if it is unavailable
+            try {
+                result = await performStreamingSearch(endpoint, query);
+            } catch (streamErr) {
+                if (!streamErr.fallback) {
+                    throw streamErr;
+                }
+                result = await performSearch(endpoint, query);
             }
 
             // Calculate duration
@@ -176,6 +165,179 @@ document.addEventListener('DOMContentLoaded', function () {
         };
     }
 
+    async function performStreamingSearch(endpoint, query) {
+        const response = await fetch(`${endpoint}/stream`, {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/json',
+                'Accept': 'text/event-stream'
+            },
+            body: JSON.stringify({ user_input: query })
+        });
+
+        const contentType = response.headers.get('Content-Type') || '';
+        if (!response.ok || !response.body || !contentType.includes('text/event-stream')) {
+            const err = new Error(`Streaming search unavailable (status ${response.status})`);
+            err.fallback = true;
+            throw err;
+        }
+
+        const reader = response.body.getReader();
+        const decoder = new TextDecoder();
+        let buffer = '';
+        let streamedText = '';
+        let finalResult = null;
+
+        while (true) {
+            const { value, done } = await reader.read();
+            if (done) {
+                break;
+            }
+            buffer += decoder.decode(value, { stream: true });
+
+            // SSE messages are separated by a blank line
+            let boundary;
+            while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+                const message = parseSseMessage(buffer.slice(0, boundary));
+                buffer = buffer.slice(boundary + 2);
+                if (!message) {
+                    continue;
+                }
+
+                switch (message.event) {
+                    case 'query_type':
+                        setSearchTypeDisplay(message.data.type);
+                        updateAgentDisplay(message.data.type);
+                        break;
+                    case 'tool_result':
+                        showProgressiveContent(renderToolPreview(message.data));
+                        break;
+                    case 'token':
+                        streamedText += message.data.text || '';
+                        showStreamedText(streamedText);
+                        break;
+                    case 'reset':
+                        // A failed LLM attempt's partial text; the retry streams it again
+                        streamedText = streamedText.slice(0, Math.max(0, streamedText.length - (message.data.discard || 0)));
+                        showStreamedText(streamedText);
+                        break;
+                    case 'result':
+                        finalResult = {
+                            type: message.data.type || 'general',
+                            result: message.data.content || '',
+                            error: null
+                        };
+                        break;
+                    case 'error':
+                        finalResult = { type: 'general', result: '', error: message.data.error };
+                        break;
+                }
+            }
+        }
+
+        if (!finalResult) {
+            throw new Error('The search stream ended before a result was received');
+        }
+        return finalResult;
+    }
+
+    function parseSseMessage(raw) {
+        let event = 'message';
+        const dataLines = [];
+
+        raw.split('\n').forEach(line => {
+            if (line.startsWith('event:')) {
+                event = line.slice(6).trim();
+            } else if (line.startsWith('data:')) {
+                dataLines.push(line.slice(5).trim());
+            }
+        });
+
+        if (dataLines.length === 0) {
+            return null;
+        }
+
+        try {
+            return { event, data: JSON.parse(dataLines.join('\n')) };
+        } catch (e) {
+            console.error('Malformed stream event:', raw);
+            return null;
+        }
+    }
+
+    function showProgressiveContent(html) {
+        // Swap the loader for the results panel as soon as there is something to show
+        loaderContainer.classList.add('hidden');
+        resultsContainer.classList.remove('hidden');
+
+        let preview = resultsContent.querySelector('.stream-preview');
+        if (!preview) {
+            resultsContent.innerHTML = '';
+            preview = document.createElement('div');
+            preview.className = 'stream-preview';
+            resultsContent.appendChild(preview);
+        }
+        preview.insertAdjacentHTML('beforeend', html);
+    }
+
+    function showStreamedText(text) {
+        showProgressiveContent('');
+
+        let output = resultsContent.querySelector('.stream-output');
+        if (!output) {
+            output = document.createElement('div');
+            output.className = 'stream-output';
+            resultsContent.appendChild(output);
+        }
+        output.textContent = text;
+    }
+
+    function renderToolPreview(toolResult) {
+        // Raw provider items arrive before the formatted answer; show their titles and links
+        let items = toolResult.result;
+        if (items && !Array.isArray(items)) {
+            items = items.organic_results || [];
+        }
+        items = (items || []).filter(item => item && item.title);
+        if (items.length === 0) {
+            return '';
+        }
+
+        const list = items.map(item => {
+            const link = item.link || item.track_url || '#';
+            const title = escapeHtml(item.title);
+            return `<li><a href="${escapeHtml(link)}" target="_blank" rel="noopener">${title}</a></li>`;
+        }).join('');
+
+        return `<div class="stream-tool-result"><h3><i class="fas fa-bolt"></i> Found ${items.length} results, preparing answer...</h3><ul>${list}</ul></div>`;
+    }
+
+    function escapeHtml(text) {
+        const div = document.createElement('div');
+        div.textContent = String(text);
+        return div.innerHTML.replace(/"/g, '&quot;');
+    }
+
+    function setSearchTypeDisplay(type) {
+        let searchTypeIcon = 'fa-search';
+        switch (type) {
+            case 'movie':
+                searchTypeIcon = 'fa-film';
+                break;
+            case 'music':
+                searchTypeIcon = 'fa-music';
+                break;
+            case 'news':
+                searchTypeIcon = 'fa-newspaper';
+                break;
+            case 'general':
+                searchTypeIcon = 'fa-globe';
+                break;
+        }
+
+        searchTypeDisplay.innerHTML = `<i class="fas ${searchTypeIcon}"></i> ${capitalizeFirstLetter(type === 'all' ? 'Smart' : type)} Search`;
+    }
+
     function displayResults(result) {
         // Clear previous results
         resultsContent.innerHTML = '';
@@ -0,0 +1,13 @@
+import os
+import sys
+
+# Tests import the flat modules from the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Keep crewai/litellm offline and the caches out of the working tree
+os.environ.setdefault("LITELLM_LOCAL_MODEL_COST_MAP", "True")
+os.environ.setdefault("CREWAI_DISABLE_TELEMETRY", "true")
+os.environ.setdefault("OTEL_SDK_DISABLED", "true")
+os.environ.setdefault("SEARCH_CACHE_DISK", "0")
+os.environ.setdefault("ANSWER_CACHE_DISK", "0")
+os.environ.setdefault("TRACE_LOG_PATH", "off")
@@ -0,0 +1,89 @@
+from answer_cache import AnswerCache, normalize_query
+
+
+class CrewOutput:
+    def __init__(self, raw):
+        self.raw = raw
+
+
+def _general(cache, text, count=None):
+    return AnswerCache.make_params("general", text, count)
+
+
+def test_paraphrases_normalize_to_one_key():
+    assert normalize_query("Show me the best films of 2020!") == "top movies 2020"
+    assert AnswerCache.make_params("movie", {"genre": "Sci-Fi  Films"}, 5) == \
+        AnswerCache.make_params("movie", {"genre": "sci-fi movies"}, 5)
+
+
+def test_exact_hit_stores_the_answer_text_without_token_usage():
+    cache = AnswerCache()
+    params = AnswerCache.make_params("movie", {"genre": "comedy"}, 5)
+    cache.set("movie", params, {"type": "movie", "result": CrewOutput("Five comedies"), "token_usage": {"llm_calls": 3}})
+
+    assert cache.get("movie", params) == {"type": "movie", "result": "Five comedies"}
+    assert cache.get("movie", params, bypass=True) is None
+
+
+def test_error_results_are_not_cached():
+    cache = AnswerCache()
+    params = _general(cache, "why is the sky blue")
+    cache.set("general", params, {"type": "general", "error": "LLM unavailable"})
+
+    assert cache.get("general", params) is None
+
+
+def test_semantic_match_finds_a_near_duplicate_query():
+    cache = AnswerCache(semantic=True, similarity_threshold=0.85)
+    cache.set("general", _general(cache, "how do solar panels work"),
+              {"type": "general", "result": "Photovoltaic cells..."}, text="how do solar panels work")
+
+    hit = cache.get("general", _general(cache, "how do solar panel work"), text="how do solar panel work")
+
+    assert hit == {"type": "general", "result": "Photovoltaic cells..."}
+    assert cache.stats()["semantic_hits"] == 1
+    assert cache.get("general", _general(cache, "how do magnets work"), text="how do magnets work") is None
+
+
+def test_semantic_match_respects_count_type_and_switch():
+    cache = AnswerCache(semantic=True, similarity_threshold=0.85)
+    text = "latest headlines on the election"
+    cache.set("news", AnswerCache.make_params("news", text, 5), {"type": "news", "result": "Five stories"}, text=text)
+    similar = "latest headline on the elections"
+
+    assert cache.get("news", AnswerCache.make_params("news", similar, 5), text=similar) is not None
+    assert cache.get("news", AnswerCache.make_params("news", similar, 10), text=similar) is None
+    assert cache.get("general", AnswerCache.make_params("general", similar, 5), text=similar) is None
+
+    exact_only = AnswerCache(semantic=False)
+    exact_only.set("news", AnswerCache.make_params("news", text, 5), {"type": "news", "result": "x"}, text=text)
+    assert exact_only.get("news", AnswerCache.make_params("news", similar, 5), text=similar) is None
+
+
+def test_answer_ttls_apply_per_query_type():
+    cache = AnswerCache(ttls={"news": 30})
+
+    assert cache.store.ttls["answer_news"] == 30
+    assert cache.store.ttls["answer_movie"] == 12 * 60 * 60
+
+
+def test_crew_run_answers_a_near_duplicate_from_the_cache(monkeypatch):
+    from unified_crewai import UnifiedSearchCrew
+
+    monkeypatch.delenv("SEARCH_DIRECT_MODE", raising=False)
+    crew = UnifiedSearchCrew("key", "token", "key", answer_cache=AnswerCache(semantic=True, similarity_threshold=0.85))
+    calls = []
+
+    def run_general_search(user_input):
+        calls.append(user_input)
+        return {"type": "general", "result": CrewOutput("Photovoltaic cells...")}
+
+    monkeypatch.setattr(crew, "run_general_search", run_general_search)
+
+    first = crew.run("how do solar panels work")
+    second = crew.run("how do solar panel work")
+
+    assert calls == ["how do solar panels work"]
+    assert not first["cached"]
+    assert second["cached"]
+    assert second["result"] == "Photovoltaic cells..."
@@ -0,0 +1,45 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from unified_crewai import UnifiedSearchCrew
+
+
+@pytest.fixture
+def crew(monkeypatch):
+    monkeypatch.delenv("SEARCH_DIRECT_MODE", raising=False)
+    crew = UnifiedSearchCrew("key", "token", "key")
+    calls = []
+
+    def run_news_search(user_input):
+        calls.append(threading.current_thread().name)
+        time.sleep(0.1)
+        return {"type": "news", "result": f"news about {user_input}"}
+
+    monkeypatch.setattr(crew, "run_news_search", run_news_search)
+    crew.news_calls = calls
+    return crew
+
+
+def test_arun_runs_agent_searches_on_the_crew_pool_and_caches_them(crew):
+    first = asyncio.run(crew.arun("latest news on solar power"))
+    second = asyncio.run(crew.arun("latest news on solar power"))
+
+    assert first["result"] == "news about latest news on solar power"
+    assert not first["cached"]
+    assert second["cached"]
+    assert len(crew.news_calls) == 1
+    assert crew.news_calls[0].startswith("crew")
+
+
+def test_concurrent_identical_aruns_share_one_search(crew):
+    async def burst():
+        return await asyncio.gather(*(crew.arun("latest news on wind farms") for _ in range(5)))
+
+    results = asyncio.run(burst())
+
+    assert len(crew.news_calls) == 1
+    assert {result["result"] for result in results} == {"news about latest news on wind farms"}
+    assert sum(bool(result.get("coalesced")) for result in results) == 4
@@ -0,0 +1,75 @@
+import json
+import threading
+
+import pytest
+
+import unified_main
+from rate_limit import BATCH, current_priority
+from tracing import current_trace_id
+from unified_crewai import UnifiedSearchCrew
+
+
+@pytest.fixture
+def crew(monkeypatch):
+    monkeypatch.delenv("SEARCH_DIRECT_MODE", raising=False)
+    crew = UnifiedSearchCrew("key", "token", "key")
+    crew.calls = []
+    lock = threading.Lock()
+
+    def run_query_type(query_type, user_input, bypass_cache=False):
+        with lock:
+            crew.calls.append((query_type, user_input, current_priority(), current_trace_id()))
+        if "fail" in user_input:
+            raise RuntimeError("search failed")
+        return {"type": query_type, "result": f"answer to {user_input}", "cached": False}
+
+    monkeypatch.setattr(crew, "_run_query_type", run_query_type)
+    return crew
+
+
+def test_run_batch_runs_each_unique_query_once_at_batch_priority(crew):
+    queries = ["comedy movies", "  comedy   movies ", "latest news on AI", "fail this", "", "comedy movies"]
+
+    items = {item["query"]: item for item in crew.run_batch(queries, max_concurrency=2)}
+
+    assert set(items) == {"comedy movies", "latest news on AI", "fail this"}
+    assert items["comedy movies"]["indices"] == [0, 1, 5]
+    assert items["comedy movies"]["type"] == "movie"
+    assert items["latest news on AI"]["result"]["result"] == "answer to latest news on AI"
+    assert items["fail this"]["result"] == {"type": "general", "error": "search failed"}
+    assert len(crew.calls) == 3
+    assert {priority for _, _, priority, _ in crew.calls} == {BATCH}
+    # Every query gets its own trace
+    trace_ids = [item["trace_id"] for item in items.values()]
+    assert all(trace_ids) and len(set(trace_ids)) == 3
+
+
+def test_batch_endpoint_streams_one_line_per_unique_query(crew, monkeypatch):
+    monkeypatch.setattr(unified_main, "_crew_manager", crew)
+    client = unified_main.app.test_client()
+
+    response = client.post("/api/batch", json={"queries": ["comedy movies", "comedy movies", "fail this"],
+                                               "max_concurrency": 50})
+
+    assert response.mimetype == "application/x-ndjson"
+    lines = {line["query"]: line for line in map(json.loads, response.get_data(as_text=True).splitlines())}
+    assert lines["comedy movies"]["indices"] == [0, 1]
+    assert lines["comedy movies"]["content"] == "answer to comedy movies"
+    assert lines["fail this"]["error"] == "search failed"
+    assert "content" not in lines["fail this"]
+
+
+@pytest.mark.parametrize("body", [{}, {"queries": []}, {"queries": "comedy"}, {"queries": ["ok", 3]}])
+def test_batch_endpoint_rejects_bad_input(body):
+    response = unified_main.app.test_client().post("/api/batch", json=body)
+
+    assert response.status_code == 400
+
+
+def test_batch_endpoint_caps_the_batch_size(monkeypatch):
+    monkeypatch.setenv("BATCH_MAX_QUERIES", "2")
+
+    response = unified_main.app.test_client().post("/api/batch", json={"queries": ["a", "b", "c"]})
+
+    assert response.status_code == 400
+    assert "at most 2" in response.get_json()["error"]
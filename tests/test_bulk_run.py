@@ -0,0 +1,79 @@
+import json
+
+from bulk_run import bulk_run, completed_ids, parse_rates, read_queries
+
+
+class FakeCrew:
+    def __init__(self, failing=()):
+        self.failing = set(failing)
+        self.queries = []
+
+    def run(self, query, bypass_cache=False, multi=None):
+        self.queries.append(query)
+        if query in self.failing:
+            return {"type": "news", "error": "rate limited"}
+        return {"type": "general", "result": f"answer to {query}", "cached": False}
+
+    def determine_query_type(self, query):
+        return "general"
+
+
+def _write_lines(path, lines):
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+
+def _records(path):
+    return [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+
+
+def test_read_queries_accepts_objects_and_strings(tmp_path):
+    source = tmp_path / "queries.jsonl"
+    _write_lines(source, ['{"id": "a", "query": "comedy movies"}', '"bare string"', "",
+                          '{"user_input": "jazz albums"}', "not json", '{"id": "x"}'])
+
+    assert list(read_queries(str(source))) == [("a", "comedy movies"), ("2", "bare string"), ("4", "jazz albums")]
+
+
+def test_completed_ids_skip_errors_and_a_torn_last_line(tmp_path):
+    output = tmp_path / "results.jsonl"
+    output.write_text('{"id": "1", "content": "ok"}\n{"id": "2", "error": "timeout"}\n{"id": "3", "cont',
+                      encoding="utf-8")
+
+    assert completed_ids(str(output)) == {"1"}
+    assert completed_ids(str(tmp_path / "missing.jsonl")) == set()
+
+
+def test_resumed_run_retries_only_failed_and_missing_queries(tmp_path):
+    source, output = tmp_path / "queries.jsonl", tmp_path / "out" / "results.jsonl"
+    _write_lines(source, ['{"id": "1", "query": "q1"}', '{"id": "2", "query": "q2"}', '{"id": "3", "query": "q3"}'])
+
+    first = bulk_run(FakeCrew(failing={"q2"}), str(source), str(output), workers=2)
+    assert (first["completed"], first["errors"], first["skipped"]) == (3, 1, 0)
+
+    crew = FakeCrew()
+    second = bulk_run(crew, str(source), str(output), workers=2)
+
+    assert crew.queries == ["q2"]
+    assert (second["completed"], second["errors"], second["skipped"]) == (1, 0, 2)
+    records = _records(output)
+    assert len(records) == 4
+    assert records[-1]["id"] == "2" and records[-1]["content"] == "answer to q2"
+    assert set(records[-1]["timings_ms"]) == {"queued", "rate_wait", "search", "total"}
+    assert completed_ids(str(output)) == {"1", "2", "3"}
+
+
+def test_restart_discards_previous_output(tmp_path):
+    source, output = tmp_path / "queries.jsonl", tmp_path / "results.jsonl"
+    _write_lines(source, ['{"id": "1", "query": "q1"}'])
+    bulk_run(FakeCrew(), str(source), str(output))
+
+    crew = FakeCrew()
+    summary = bulk_run(crew, str(source), str(output), restart=True)
+
+    assert crew.queries == ["q1"]
+    assert summary["skipped"] == 0
+    assert len(_records(output)) == 1
+
+
+def test_parse_rates():
+    assert parse_rates(["serp=2", "TMDB=10/20"]) == {"serp": "2", "tmdb": "10/20"}
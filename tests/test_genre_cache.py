@@ -0,0 +1,52 @@
+import threading
+import time
+
+from api_tools import TMDBGenreCache
+
+
+GENRES = [{"id": 28, "name": "Action"}, {"id": 878, "name": "Science Fiction"}, {"id": 35, "name": "Comedy"}]
+
+
+def test_lookup_matches_exact_partial_and_aliases():
+    cache = TMDBGenreCache()
+    cache.load(GENRES)
+
+    assert cache.lookup("action") == 28
+    assert cache.lookup("  COMEDY ") == 35
+    assert cache.lookup("sci-fi") == 878
+    assert cache.lookup("fiction") == 878
+    assert cache.lookup("western") is None
+
+
+def test_table_goes_stale_after_ttl():
+    cache = TMDBGenreCache(ttl=0.05)
+    assert cache.is_stale()
+    cache.load(GENRES)
+    assert not cache.is_stale()
+    time.sleep(0.06)
+    assert cache.is_stale()
+
+
+def test_concurrent_stale_lookups_refresh_once():
+    cache = TMDBGenreCache()
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        time.sleep(0.1)
+        return GENRES
+
+    start = threading.Barrier(8)
+
+    def refresh():
+        start.wait()
+        cache.refresh_if_stale(fetch)
+
+    threads = [threading.Thread(target=refresh) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1
+    assert cache.lookup("action") == 28
@@ -0,0 +1,162 @@
+import asyncio
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+import pytest
+import requests
+
+import http_client
+import rate_limit
+from api_tools import ITunesMusicTools, TMDBMovieTools
+from http_client import AsyncHTTPClient, HTTPClientConfig, PooledHTTPClient, get_http_client
+from rate_limit import RateLimiter, configure_rate_limiter
+
+
+def _response(status, headers=None):
+    response = requests.Response()
+    response.status_code = status
+    response.headers.update(headers or {})
+    response._content = b"{}"
+    response._content_consumed = True
+    return response
+
+
+@pytest.fixture(autouse=True)
+def restore_rate_limiter():
+    previous = rate_limit.get_rate_limiter()
+    yield
+    configure_rate_limiter(previous)
+
+
+class KeepAliveHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        body = b'{"ok": true}'
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def local_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), KeepAliveHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+def test_requests_to_one_host_reuse_a_kept_alive_connection(local_server):
+    client = PooledHTTPClient(HTTPClientConfig(pool_maxsize=4))
+    try:
+        for path in ("/a", "/b", "/c"):
+            assert client.get(local_server + path).json() == {"ok": True}
+        stats = client.stats()
+    finally:
+        client.close()
+
+    assert stats["totals"]["opened"] == 1
+    assert stats["totals"]["reused"] == 2
+    assert stats["totals"]["idle"] == 1
+    assert stats["requests_by_host"] == {local_server.split("//")[1]: 3}
+
+
+def test_provider_clients_share_the_process_pool():
+    movies, music = TMDBMovieTools("key", "token"), ITunesMusicTools()
+
+    assert movies.http is get_http_client()
+    assert music.http is movies.http
+
+
+def test_config_reads_http_environment(monkeypatch):
+    monkeypatch.setenv("HTTP_POOL_MAXSIZE", "50")
+    monkeypatch.setenv("HTTP_READ_TIMEOUT", "4.5")
+    monkeypatch.setenv("HTTP_KEEP_ALIVE", "false")
+
+    config = HTTPClientConfig.from_env()
+
+    assert config.pool_maxsize == 50
+    assert config.timeout == (3.05, 4.5)
+    assert config.keep_alive is False
+
+
+def test_retry_delay_prefers_retry_after_and_caps_it():
+    config = HTTPClientConfig(backoff_factor=0.5, backoff_max=4.0)
+
+    assert config.retry_delay(0) == 0.5
+    assert config.retry_delay(2) == 2.0
+    assert config.retry_delay(5) == 4.0
+    assert config.retry_delay(0, "3") == 3.0
+    assert config.retry_delay(0, "120") == 4.0
+    assert config.retry_delay(1, "Wed, 21 Oct 2026 07:28:00 GMT") == 1.0
+
+
+def test_get_retries_429_after_retry_after_and_spends_a_token_per_attempt(monkeypatch):
+    limiter = configure_rate_limiter(RateLimiter({"tmdb": (1000.0, 10.0)}))
+    sleeps = []
+    monkeypatch.setattr(http_client.time, "sleep", sleeps.append)
+    client = PooledHTTPClient(HTTPClientConfig(max_retries=2))
+    responses = [_response(429, {"Retry-After": "2"}), _response(503), _response(200)]
+    monkeypatch.setattr(client.session, "get", lambda *args, **kwargs: responses.pop(0))
+
+    response = client.get("https://api.themoviedb.org/3/movie/1")
+
+    assert response.status_code == 200
+    assert sleeps == [2.0, 0.6]
+    assert limiter.stats()["tmdb"]["acquired"] == 3
+
+
+def test_get_returns_the_last_response_once_retries_run_out(monkeypatch):
+    configure_rate_limiter(RateLimiter())
+    monkeypatch.setattr(http_client.time, "sleep", lambda seconds: None)
+    client = PooledHTTPClient(HTTPClientConfig(max_retries=1))
+    calls = []
+
+    def fake_get(*args, **kwargs):
+        calls.append(1)
+        return _response(500)
+
+    monkeypatch.setattr(client.session, "get", fake_get)
+
+    assert client.get("https://example.com/").status_code == 500
+    assert len(calls) == 2
+
+
+def test_async_get_retries_transport_errors_and_honours_retry_after(monkeypatch):
+    configure_rate_limiter(RateLimiter())
+    sleeps = []
+
+    async def fake_sleep(seconds):
+        sleeps.append(seconds)
+
+    monkeypatch.setattr(http_client.asyncio, "sleep", fake_sleep)
+    attempts = []
+
+    def handler(request):
+        attempts.append(request.url)
+        if len(attempts) == 1:
+            raise httpx.ConnectError("refused", request=request)
+        if len(attempts) == 2:
+            return httpx.Response(429, headers={"Retry-After": "1"})
+        return httpx.Response(200, json={"ok": True})
+
+    async def main():
+        client = AsyncHTTPClient(HTTPClientConfig(max_retries=2, backoff_factor=0.1),
+                                 transport=httpx.MockTransport(handler))
+        try:
+            return await client.get("https://serpapi.com/search")
+        finally:
+            await client.aclose()
+
+    response = asyncio.run(main())
+
+    assert response.status_code == 200
+    assert sleeps == [0.1, 1.0]
@@ -0,0 +1,64 @@
+import os
+
+from intent_model import IntentModel, load_examples, query_fingerprint, split_seen, _evaluate
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TRAIN_PATH = os.path.join(ROOT, "data", "intent_queries.jsonl")
+EVAL_PATH = os.path.join(ROOT, "data", "intent_queries_eval.jsonl")
+MODEL_PATH = os.path.join(ROOT, "models", "intent_model.json")
+
+EXAMPLES = [
+    ("new sci-fi movies", "movie"), ("best comedy films", "movie"), ("Nolan film trailer", "movie"),
+    ("jazz albums to stream", "music"), ("top pop songs", "music"), ("Taylor Swift new album", "music"),
+    ("election results headlines", "news"), ("breaking news on the economy", "news"),
+    ("latest headlines", "news"), ("how do magnets work", "general"), ("weather forecast", "general"),
+    ("recipe for pancakes", "general"),
+]
+
+
+def test_train_and_predict():
+    model = IntentModel.train(EXAMPLES, epochs=30)
+
+    assert model.predict("comedy movies").label == "movie"
+    assert model.predict("new album songs").label == "music"
+    assert model.predict("breaking headlines").label == "news"
+    assert abs(sum(model.predict_proba("anything").values()) - 1.0) < 1e-6
+
+
+def test_save_load_round_trip_keeps_predictions_and_metadata(tmp_path):
+    model = IntentModel.train(EXAMPLES, epochs=30)
+    model.metadata = {"holdout_accuracy": 0.8, "training_queries": [query_fingerprint("latest headlines")]}
+    path = str(tmp_path / "model.json")
+    model.save(path)
+
+    loaded = IntentModel.load(path)
+
+    assert loaded.metadata == model.metadata
+    for text, _ in EXAMPLES:
+        assert loaded.predict(text).label == model.predict(text).label
+
+
+def test_split_seen_matches_normalized_training_queries():
+    model = IntentModel()
+    model.metadata = {"training_queries": [query_fingerprint("Latest  Headlines")]}
+
+    seen, unseen = split_seen(model, [("latest headlines", "news"), ("jazz albums", "music")])
+
+    assert seen == [("latest headlines", "news")]
+    assert unseen == [("jazz albums", "music")]
+
+
+def test_eval_file_is_held_out_from_training_data():
+    training = {query_fingerprint(text) for text, _ in load_examples(TRAIN_PATH)}
+    assert not any(query_fingerprint(text) in training for text, _ in load_examples(EVAL_PATH))
+
+
+def test_shipped_model_on_held_out_queries():
+    model = IntentModel.load(MODEL_PATH)
+    seen, unseen = split_seen(model, load_examples(EVAL_PATH))
+
+    assert not seen
+    assert _evaluate(model, unseen) >= 0.85
+    assert "holdout_accuracy" in model.metadata
+    assert model.predict("weather today").label == "general"
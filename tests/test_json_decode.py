@@ -0,0 +1,66 @@
+import json
+
+import pytest
+
+import json_decode
+from json_decode import iter_items, parse, project, select, take
+
+DECODERS = ["json", pytest.param("ijson", marks=pytest.mark.skipif(json_decode.ijson is None,
+                                                                    reason="no compiled ijson backend"))]
+
+BODY = json.dumps({
+    "title": "Heat", "runtime": 170, "rating": 8.3,
+    "news_results": [{"title": f"Story {i}", "link": f"https://n.com/{i}", "thumbnail": "t.png", "score": i}
+                     for i in range(10)],
+    "credits": {"crew": [{"job": "Director", "name": "Michael Mann"}, {"job": "Writer", "name": "Someone"}]},
+}).encode()
+
+
+@pytest.mark.parametrize("decoder", DECODERS)
+def test_take_projects_and_filters(decoder):
+    items = take(BODY, "news_results", 3, fields=("title", "score"), where=lambda item: item["score"] % 2,
+                 decoder=decoder)
+
+    assert items == [{"title": "Story 1", "score": 1}, {"title": "Story 3", "score": 3},
+                     {"title": "Story 5", "score": 5}]
+    assert take(BODY, "news_results", 0, decoder=decoder) == []
+    assert take(BODY, "missing", 5, decoder=decoder) == []
+
+
+@pytest.mark.parametrize("decoder", DECODERS)
+def test_nested_paths_and_top_level_fields(decoder):
+    crew = list(iter_items(BODY, "credits.crew", fields=("name",), decoder=decoder))
+
+    assert crew == [{"name": "Michael Mann"}, {"name": "Someone"}]
+    assert select(BODY, ("runtime", "title", "missing"), decoder=decoder) == {"runtime": 170, "title": "Heat"}
+
+
+def test_streaming_stops_once_the_request_is_satisfied():
+    if json_decode.ijson is None:
+        pytest.skip("no compiled ijson backend")
+    # Anything after the wanted values is never parsed, so a broken tail goes unnoticed
+    body = b'{"title": "Heat", "news_results": [{"title": "a"}, {"title": "b"}' + b" " * 200000 + b"<broken"
+
+    assert take(body, "news_results", 1, decoder="ijson") == [{"title": "a"}]
+    assert select(body, ("title",), decoder="ijson") == {"title": "Heat"}
+    with pytest.raises(ValueError):
+        take(body, "news_results", 1, decoder="json")
+
+
+def test_parsed_content_is_reused(monkeypatch):
+    monkeypatch.setattr(json_decode, "DECODER", "json")
+    data = parse(BODY)
+
+    assert isinstance(data, dict)
+    assert take(data, "news_results", 1, fields=("link",)) == [{"link": "https://n.com/0"}]
+    assert select(data, ("rating",)) == {"rating": 8.3}
+    assert select(b"[1, 2]", ("rating",)) == {}
+
+    monkeypatch.setattr(json_decode, "DECODER", "ijson")
+    assert parse(BODY) is BODY
+
+
+def test_project_leaves_non_dicts_alone():
+    assert project({"a": 1, "b": 2}, ("b", "c")) == {"b": 2}
+    assert project({"a": 1}, None) == {"a": 1}
+    assert project("text", ("a",)) == "text"
@@ -0,0 +1,35 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _loaded_after(code):
+    """Run code in a fresh interpreter and return which heavy modules it loaded"""
+    probe = code + "\nimport sys\nprint(sorted(m for m in ('crewai', 'litellm', 'unified_crewai', 'unified_agents') if m in sys.modules))"
+    output = subprocess.run([sys.executable, "-c", probe], cwd=ROOT, capture_output=True, text=True,
+                            timeout=120, env=dict(os.environ, PYTHONPATH=ROOT))
+    assert output.returncode == 0, output.stderr
+    return output.stdout.strip().splitlines()[-1]
+
+
+@pytest.mark.parametrize("module", ["unified_main", "unified_asgi", "api_tools", "llm_registry", "unified_tasks"])
+def test_importing_entry_points_loads_no_crewai(module):
+    assert _loaded_after(f"import {module}") == "[]"
+
+
+def test_tools_and_crew_load_crewai_on_first_use():
+    import api_tools
+    import unified_main
+
+    search_movies = api_tools.search_movies
+    assert search_movies.name == "search_movies"
+    assert api_tools.search_movies is search_movies
+
+    crew = unified_main.get_crew_manager()
+    assert unified_main.get_crew_manager() is crew
+    assert "crewai" in sys.modules
@@ -0,0 +1,71 @@
+import pytest
+
+from llm_registry import InvokeBackend, LLMBackend, LLMRegistry, ToolsNotSupportedError, uses_tools
+
+
+class Reply:
+    def __init__(self, content):
+        self.content = content
+
+
+class TextClient:
+    def __init__(self):
+        self.prompts = []
+
+    def invoke(self, prompt):
+        self.prompts.append(prompt)
+        return Reply("from text backend")
+
+
+class ToolBackend(LLMBackend):
+    supports_tools = True
+
+    def complete(self, messages, *args, **kwargs):
+        return "from tool backend"
+
+
+TOOLS = [{"type": "function", "function": {"name": "search_movies"}}]
+
+
+def _registry(monkeypatch, prefix):
+    monkeypatch.setenv("LLM_ROUTE_DEFAULT", f"{prefix}-text,{prefix}-crew")
+    registry = LLMRegistry(routing="ordered")
+    text_client = TextClient()
+    registry.register(InvokeBackend(f"{prefix}-text", "gemini", lambda: text_client))
+    registry.register(ToolBackend(f"{prefix}-crew", "together", lambda: object()))
+    return registry, text_client
+
+
+def test_uses_tools_reads_positional_and_keyword_arguments():
+    assert not uses_tools((), {})
+    assert not uses_tools((None, ["callback"]), {})
+    assert uses_tools((TOOLS,), {})
+    assert uses_tools((None, None, {"search_movies": print}), {})
+    assert uses_tools((), {"available_functions": {"search_movies": print}})
+
+
+def test_route_skips_text_only_backends_when_tools_are_passed(monkeypatch):
+    registry, _ = _registry(monkeypatch, "route")
+
+    assert [backend.name for backend in registry.route()] == ["route-text", "route-crew"]
+    assert [backend.name for backend in registry.route(tools=True)] == ["route-crew"]
+
+
+def test_complete_with_tools_goes_to_a_tool_backend(monkeypatch):
+    registry, text_client = _registry(monkeypatch, "complete")
+    messages = [{"role": "user", "content": "new sci-fi movies"}]
+
+    assert registry.complete(messages) == "from text backend"
+    assert registry.complete(messages, call_kwargs={"tools": TOOLS}) == "from tool backend"
+    assert len(text_client.prompts) == 1
+
+
+def test_complete_with_tools_fails_clearly_without_a_tool_backend(monkeypatch):
+    monkeypatch.setenv("LLM_ROUTE_DEFAULT", "only-text")
+    registry = LLMRegistry()
+    backend = registry.register(InvokeBackend("only-text", "gemini", TextClient))
+
+    with pytest.raises(RuntimeError, match="tool-calling"):
+        registry.complete("hi", call_args=(TOOLS,))
+    with pytest.raises(ToolsNotSupportedError):
+        backend.complete("hi", tools=TOOLS)
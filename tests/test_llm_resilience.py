@@ -0,0 +1,68 @@
+import threading
+import time
+
+import pytest
+
+from llm_resilience import DeadlineExceeded, ResiliencePolicy, call_with_failover, call_with_resilience, get_breaker
+
+
+def test_hung_attempt_is_cut_off_at_the_deadline():
+    policy = ResiliencePolicy(max_attempts=3, deadline=0.3)
+    release = threading.Event()
+
+    def hang():
+        release.wait(5)
+        return "late"
+
+    started = time.monotonic()
+    try:
+        with pytest.raises(DeadlineExceeded):
+            call_with_resilience(hang, "test:hang", policy)
+    finally:
+        release.set()
+    assert time.monotonic() - started < 1.0
+    assert get_breaker("test:hang", policy).failures == 1
+
+
+def test_failover_shares_one_deadline_with_a_hung_endpoint():
+    policy = ResiliencePolicy(max_attempts=1, deadline=0.3)
+    release = threading.Event()
+    calls = []
+
+    def hang():
+        release.wait(5)
+
+    started = time.monotonic()
+    try:
+        with pytest.raises(DeadlineExceeded):
+            call_with_failover([("test:slow", hang, None), ("test:next", lambda: calls.append(1), None)], policy)
+    finally:
+        release.set()
+    assert time.monotonic() - started < 1.0
+    assert calls == []
+
+
+def test_attempt_keeps_the_callers_context():
+    from tracing import current_trace_id, start_trace
+
+    with start_trace("abc123", sampled=False):
+        assert call_with_resilience(current_trace_id, "test:context", ResiliencePolicy()) == "abc123"
+
+
+def test_rate_limit_timeout_is_not_a_breaker_failure():
+    from rate_limit import RateLimitTimeout, RateLimiter, configure_rate_limiter, get_rate_limiter
+
+    previous = get_rate_limiter()
+    limiter = configure_rate_limiter(RateLimiter({"slowllm": (0.01, 1.0)}, max_wait={0: 0.1, 1: 0.1}))
+    limiter.acquire("slowllm")
+    policy = ResiliencePolicy(max_attempts=3, deadline=5.0, failure_threshold=1)
+    calls = []
+    try:
+        with pytest.raises(RateLimitTimeout):
+            call_with_resilience(lambda: calls.append(1), "test:limited", policy, rate_limit="slowllm")
+        assert call_with_failover([("test:limited", lambda: calls.append(1), "slowllm"),
+                                   ("test:other", lambda: "ok", None)], policy) == "ok"
+    finally:
+        configure_rate_limiter(previous)
+    assert calls == []
+    assert get_breaker("test:limited", policy).stats() == {"state": "closed", "consecutive_failures": 0}
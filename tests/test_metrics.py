@@ -0,0 +1,83 @@
+import contextvars
+import threading
+
+import pytest
+
+import unified_main
+from metrics import Histogram, render_metrics, span, stage_seconds, timed, track_stages
+
+
+@pytest.fixture(autouse=True)
+def clear_histograms():
+    stage_seconds.clear()
+    yield
+    stage_seconds.clear()
+
+
+def test_histogram_renders_cumulative_buckets_per_label_set():
+    histogram = Histogram("demo_seconds", "Demo latency", buckets=(0.5, 0.1, 1.0))
+    for value in (0.05, 0.3, 0.3, 2.0):
+        histogram.observe(value, {"stage": "http", "provider": 'say "hi"'})
+    histogram.observe(0.2)
+
+    assert histogram.render().splitlines() == [
+        "# HELP demo_seconds Demo latency",
+        "# TYPE demo_seconds histogram",
+        'demo_seconds_bucket{le="0.1"} 0',
+        'demo_seconds_bucket{le="0.5"} 1',
+        'demo_seconds_bucket{le="1"} 1',
+        'demo_seconds_bucket{le="+Inf"} 1',
+        "demo_seconds_sum{} 0.200000",
+        "demo_seconds_count{} 1",
+        'demo_seconds_bucket{provider="say \\"hi\\"",stage="http",le="0.1"} 1',
+        'demo_seconds_bucket{provider="say \\"hi\\"",stage="http",le="0.5"} 3',
+        'demo_seconds_bucket{provider="say \\"hi\\"",stage="http",le="1"} 3',
+        'demo_seconds_bucket{provider="say \\"hi\\"",stage="http",le="+Inf"} 4',
+        'demo_seconds_sum{provider="say \\"hi\\"",stage="http"} 2.650000',
+        'demo_seconds_count{provider="say \\"hi\\"",stage="http"} 4',
+    ]
+
+
+def test_spans_feed_the_histogram_and_the_request_breakdown():
+    with track_stages() as timings:
+        with span("http", provider="tmdb") as fields:
+            fields["status"] = 200
+        with span("http", provider="tmdb"):
+            pass
+        with pytest.raises(ValueError):
+            with span("parse", query_type="movie"):
+                raise ValueError("bad criteria")
+        # Threads started with the request's context add to the same breakdown
+        worker = threading.Thread(target=contextvars.copy_context().run,
+                                  args=(timed("tool", tool="search_news")(lambda: None),))
+        worker.start()
+        worker.join()
+    with span("classify"):
+        pass
+
+    assert {stage: entry["count"] for stage, entry in timings.to_dict().items()} == \
+        {"http:tmdb": 2, "parse:movie": 1, "tool:search_news": 1}
+    rendered = render_metrics()
+    assert 'search_stage_duration_seconds_count{provider="tmdb",stage="http"} 2' in rendered
+    assert 'search_stage_duration_seconds_count{query_type="movie",stage="parse"} 1' in rendered
+    assert 'search_stage_duration_seconds_count{stage="classify"} 1' in rendered
+    assert 'search_stage_duration_seconds_count{stage="tool",tool="search_news"} 1' in rendered
+
+
+def test_endpoints_return_timings_and_expose_metrics(monkeypatch):
+    class Crew:
+        def run_movie_search(self, user_input):
+            with span("kickoff", query_type="movie"):
+                return {"type": "movie", "result": f"movies for {user_input}"}
+
+    monkeypatch.setattr(unified_main, "_crew_manager", Crew())
+    client = unified_main.app.test_client()
+
+    body = client.post("/api/movie", json={"user_input": "heist films", "timings": True}).get_json()
+    assert body["content"] == "movies for heist films"
+    assert set(body["timings"]) == {"kickoff:movie", "extract", "request:movie"}
+    assert "timings" not in client.post("/api/movie", json={"user_input": "heist films"}).get_json()
+
+    metrics = client.get("/metrics")
+    assert metrics.mimetype == "text/plain"
+    assert 'search_stage_duration_seconds_count{endpoint="movie",stage="request"} 2' in metrics.get_data(as_text=True)
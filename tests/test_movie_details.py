@@ -0,0 +1,62 @@
+import threading
+import time
+
+from api_tools import TMDBMovieTools
+
+
+def _tools(**kwargs):
+    return TMDBMovieTools("key", "token", **kwargs)
+
+
+def test_details_run_concurrently_and_keep_ranking_order(monkeypatch):
+    tools = _tools(detail_workers=4)
+    active, peak = [0], [0]
+    lock = threading.Lock()
+
+    def details(movie_id):
+        with lock:
+            active[0] += 1
+            peak[0] = max(peak[0], active[0])
+        # Later-ranked movies finish first
+        time.sleep(0.05 * (5 - movie_id))
+        with lock:
+            active[0] -= 1
+        return f"movie {movie_id}"
+
+    monkeypatch.setattr(tools, "_get_movie_details", details)
+    started = time.monotonic()
+
+    result = tools._get_detailed_movies([{"id": i} for i in range(1, 5)] + [{"id": 9}], count=4)
+
+    assert result == ["movie 1", "movie 2", "movie 3", "movie 4"]
+    assert peak[0] == 4
+    assert time.monotonic() - started < 0.35
+
+
+def test_failed_and_late_details_are_skipped(monkeypatch):
+    tools = _tools(detail_deadline=0.2)
+    release = threading.Event()
+
+    def details(movie_id):
+        if movie_id == 2:
+            raise ValueError("bad body")
+        if movie_id == 3:
+            release.wait(2)
+        return movie_id
+
+    monkeypatch.setattr(tools, "_get_movie_details", details)
+    started = time.monotonic()
+    try:
+        result = tools._get_detailed_movies([{"id": 1}, {"id": 2}, {"id": 3}, {"id": 4}], count=10)
+    finally:
+        release.set()
+
+    assert result == [1, 4]
+    assert time.monotonic() - started < 1.0
+
+
+def test_no_candidates_makes_no_requests(monkeypatch):
+    tools = _tools()
+    monkeypatch.setattr(tools, "_get_movie_details", lambda movie_id: 1 / 0)
+
+    assert tools._get_detailed_movies([], count=5) == []
@@ -0,0 +1,94 @@
+import asyncio
+import time
+
+import pytest
+
+from unified_crewai import UnifiedSearchCrew
+
+
+@pytest.fixture
+def crew(monkeypatch):
+    monkeypatch.delenv("SEARCH_DIRECT_MODE", raising=False)
+    monkeypatch.delenv("QUERY_CLASSIFIER", raising=False)
+    crew = UnifiedSearchCrew("key", "token", "key", multi_mode=True)
+    crew.delays = {}
+    crew.failures = set()
+
+    def search(query_type):
+        def run(user_input):
+            time.sleep(crew.delays.get(query_type, 0))
+            if query_type in crew.failures:
+                raise RuntimeError(f"{query_type} agent failed")
+            return {"type": query_type, "result": f"{query_type} answer"}
+        return run
+
+    def asearch(query_type):
+        async def arun(user_input):
+            return await asyncio.to_thread(search(query_type), user_input)
+        return arun
+
+    for query_type in ("movie", "music", "news", "general"):
+        monkeypatch.setattr(crew, f"run_{query_type}_search", search(query_type))
+        monkeypatch.setattr(crew, f"arun_{query_type}_search", asearch(query_type))
+    return crew
+
+
+def test_ambiguous_query_searches_every_matching_vertical(crew):
+    assert crew.ambiguous_query_types("movie soundtrack songs") == ("music", "movie")
+
+    result = crew.run("movie soundtrack songs")
+
+    assert result["type"] == "multi"
+    assert result["types"] == ["music", "movie"]
+    assert result["result"] == "## Music\n\nmusic answer\n\n## Movies\n\nmovie answer"
+    assert result["branches"] == {"music": {"status": "ok", "cached": False},
+                                  "movie": {"status": "ok", "cached": False}}
+    assert not result["partial"]
+
+
+def test_single_vertical_query_runs_normally(crew):
+    result = crew.run("how do magnets work")
+
+    assert result == {"type": "general", "result": "general answer", "cached": False}
+
+
+def test_branches_search_concurrently(crew):
+    crew.delays = {"music": 0.2, "movie": 0.2}
+    started = time.monotonic()
+
+    crew.run("movie soundtrack songs")
+
+    assert time.monotonic() - started < 0.35
+
+
+def test_slow_and_failing_branches_leave_a_partial_answer(crew, monkeypatch):
+    monkeypatch.setenv("MULTI_SEARCH_TIMEOUT_MOVIE", "0.1")
+    crew.delays = {"movie": 0.5}
+
+    result = crew.run("movie soundtrack songs")
+
+    assert result["partial"]
+    assert result["result"] == "## Music\n\nmusic answer"
+    assert result["branches"]["movie"] == {"status": "timeout", "error": "timed out"}
+
+    crew.delays, crew.failures = {}, {"music", "movie"}
+    failed = crew.run("film and album reviews", bypass_cache=True)
+    assert "result" not in failed
+    assert failed["error"] == "movie: movie agent failed; music: music agent failed"
+
+
+def test_async_multi_search_merges_the_same_way(crew, monkeypatch):
+    monkeypatch.setenv("MULTI_SEARCH_TIMEOUT_MOVIE", "0.1")
+    crew.delays = {"movie": 0.5}
+
+    result = asyncio.run(crew.arun("movie soundtrack songs"))
+
+    assert result["types"] == ["music", "movie"]
+    assert result["result"] == "## Music\n\nmusic answer"
+    assert result["branches"]["movie"]["status"] == "timeout"
+
+
+def test_multi_mode_is_opt_in(monkeypatch):
+    monkeypatch.delenv("SEARCH_MULTI_MODE", raising=False)
+
+    assert not UnifiedSearchCrew("key", "token", "key").multi_mode
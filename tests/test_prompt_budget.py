@@ -0,0 +1,68 @@
+import json
+
+from prompt_budget import compact_tool_output, dedupe_results, estimate_message_tokens, estimate_tokens, tool_budget
+
+
+def _web_result(count, snippet_words=60):
+    return {
+        "knowledge_graph": {"title": "Solar panel", "type": "Device", "description": "Converts light",
+                            "image": "https://example.com/panel.png"},
+        "organic_results": [{"position": i, "title": f"Result {i}", "link": f"https://example.com/{i}",
+                             "snippet": " ".join(f"word{i}" for _ in range(snippet_words)),
+                             "favicon": "https://example.com/favicon.ico", "source": "Example"}
+                            for i in range(count)]
+    }
+
+
+def test_estimates_are_about_four_characters_per_token():
+    assert estimate_tokens("") == 0
+    assert estimate_tokens("abcd") == 1
+    assert estimate_tokens("abcde") == 2
+    assert estimate_message_tokens([{"role": "user", "content": "abcd"}, {"role": "system"}]) == 9
+
+
+def test_web_results_keep_only_the_fields_the_task_uses():
+    observation = json.loads(compact_tool_output("general", _web_result(2, snippet_words=3), budget=0))
+
+    assert observation["knowledge_graph"] == {"title": "Solar panel", "type": "Device", "description": "Converts light"}
+    assert observation["results"][0] == {"title": "Result 0", "link": "https://example.com/0",
+                                         "snippet": "word0 word0 word0"}
+
+
+def test_budget_drops_lowest_ranked_results_but_keeps_the_top_one():
+    observation = compact_tool_output("general", _web_result(10), budget=300)
+    kept = json.loads(observation)["results"]
+
+    assert estimate_tokens(observation) <= 300
+    assert [item["title"] for item in kept] == [f"Result {i}" for i in range(len(kept))]
+    assert 1 <= len(kept) < 10
+    assert all(len(item["snippet"]) <= 303 for item in kept)
+
+    assert len(json.loads(compact_tool_output("general", _web_result(10), budget=1))["results"]) == 1
+
+
+def test_duplicate_links_and_snippets_are_dropped():
+    items = [{"link": "https://a.com/x/", "snippet": "Same story!"}, {"link": "https://a.com/x", "snippet": "other"},
+             {"link": "https://b.com", "snippet": "same  STORY"}, {"link": "https://c.com", "snippet": "new"}]
+
+    assert dedupe_results(items) == [items[0], items[3]]
+
+
+def test_news_errors_and_plain_text():
+    news = [{"title": "Story", "source": "Wire", "date": "today", "link": "https://n.com/1", "snippet": "Text",
+             "thumbnail": "https://n.com/t.png"}, {"error": "quota"}]
+
+    assert json.loads(compact_tool_output("news", news)) == {"results": [
+        {"title": "Story", "source": "Wire", "date": "today", "link": "https://n.com/1", "snippet": "Text"}]}
+    assert json.loads(compact_tool_output("news", [{"error": "quota"}])) == {"error": "quota"}
+    assert json.loads(compact_tool_output("general", {"error": "SERP down"})) == {"error": "SERP down"}
+    assert compact_tool_output("movie", "word " * 100, budget=10).endswith("...")
+
+
+def test_budgets_come_from_the_environment(monkeypatch):
+    assert tool_budget("news") == 1000
+    monkeypatch.setenv("PROMPT_TOOL_BUDGET_NEWS", "0")
+    monkeypatch.setenv("PROMPT_TOOL_BUDGET_GENERAL", "250")
+
+    assert tool_budget("news") is None
+    assert tool_budget("general") == 250
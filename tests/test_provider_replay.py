@@ -0,0 +1,106 @@
+import asyncio
+import json
+
+import pytest
+import requests
+
+from http_client import AsyncHTTPClient
+from provider_replay import (FakeLLM, FakeLLMBackend, FixtureStore, InjectedError, ReplayAdapter, ReplayConfig,
+                             ReplayTransport, match_route)
+
+
+@pytest.fixture
+def store(tmp_path):
+    (tmp_path / "serp_news.json").write_text(json.dumps({"news_results": [{"title": "Story"}]}))
+    (tmp_path / "itunes_search.json").write_text(json.dumps({"results": [{"trackName": "Blue"}]}))
+    (tmp_path / "notes.txt").write_text("ignored")
+    return FixtureStore(str(tmp_path))
+
+
+def test_urls_map_to_fixtures():
+    assert match_route("https://serpapi.com/search?q=ai&tbm=nws") == ("serp", "serp_news")
+    assert match_route("https://serpapi.com/search?q=ai") == ("serp", "serp_search")
+    assert match_route("https://api.themoviedb.org/3/movie/949?append_to_response=credits") == \
+        ("tmdb", "tmdb_movie_details")
+    assert match_route("https://api.themoviedb.org/3/person/12/movie_credits") == ("tmdb", "tmdb_person_credits")
+    assert match_route("https://itunes.apple.com/lookup?id=1") == ("itunes", None)
+    assert match_route("https://example.com/search") == (None, None)
+
+
+def test_adapter_replays_recorded_bodies(store):
+    session = requests.Session()
+    session.mount("https://", ReplayAdapter(store, ReplayConfig()))
+
+    response = session.get("https://serpapi.com/search", params={"q": "ai", "tbm": "nws"})
+    assert response.status_code == 200
+    assert response.json() == {"news_results": [{"title": "Story"}]}
+
+    missing = session.get("https://api.themoviedb.org/3/genre/movie/list")
+    assert missing.status_code == 404
+    assert "No fixture recorded" in missing.json()["error"]
+    assert store.calls == {"serp_news": 1, "tmdb_genres": 1}
+
+
+def test_injected_errors(store):
+    session = requests.Session()
+    session.mount("https://", ReplayAdapter(store, ReplayConfig(provider_error_rate={"itunes": 1.0},
+                                                                error_status="429")))
+    assert session.get("https://itunes.apple.com/search?term=blue").status_code == 429
+    assert session.get("https://serpapi.com/search?tbm=nws").status_code == 200
+
+    session.mount("https://", ReplayAdapter(store, ReplayConfig(error_rate=1.0, error_status="connection")))
+    with pytest.raises(requests.ConnectionError):
+        session.get("https://itunes.apple.com/search?term=blue")
+
+
+def test_latency_is_seeded_and_configured_from_env(monkeypatch):
+    first, second = ReplayConfig(latency_ms=100, seed=7), ReplayConfig(latency_ms=100, seed=7)
+    delays = [first.delay("tmdb") for _ in range(5)]
+
+    assert delays == [second.delay("tmdb") for _ in range(5)]
+    assert all(0.08 <= delay <= 0.12 for delay in delays)
+    assert ReplayConfig(latency_ms=100, provider_latency_ms={"tmdb": 0}).delay("tmdb") == 0
+
+    monkeypatch.setenv("REPLAY_LATENCY_MS", "50")
+    monkeypatch.setenv("REPLAY_ERROR_RATE_SERP", "0.5")
+    monkeypatch.setenv("REPLAY_ERROR_STATUS", "Connection")
+    config = ReplayConfig.from_env()
+    assert (config.latency_ms, config.provider_error_rate, config.error_status) == (50, {"serp": 0.5}, "connection")
+
+
+def test_async_transport_replays_recorded_bodies(store):
+    async def fetch():
+        client = AsyncHTTPClient(transport=ReplayTransport(store, ReplayConfig()))
+        try:
+            return await client.get("https://itunes.apple.com/search?term=blue")
+        finally:
+            await client.aclose()
+
+    response = asyncio.run(fetch())
+    assert response.status_code == 200
+    assert response.json() == {"results": [{"trackName": "Blue"}]}
+
+
+def test_fake_llm_calls_the_tool_once_then_answers():
+    llm = FakeLLM(answer_chars=200)
+    tools = [{"type": "function", "function": {"name": "search_news", "parameters": {
+        "type": "object", "properties": {"query": {"type": "string"}, "num_results": {"type": "integer"}},
+        "required": ["query", "num_results"]}}}]
+    messages = [{"role": "user", "content": 'Current Task: Find news about "solar power" for the user'}]
+
+    call = llm.complete(messages, tools)[0]
+    assert call["function"]["name"] == "search_news"
+    assert json.loads(call["function"]["arguments"]) == {"query": "solar power", "num_results": 5}
+
+    messages.append({"role": "tool", "content": '{"results":[{"title":"Panels get cheaper"}]}'})
+    answer = llm.complete(messages, tools)
+    assert "## Panels get cheaper" in answer
+    assert len(answer) >= 200
+
+
+def test_fake_backend_injects_llm_errors():
+    backend = FakeLLMBackend(config=ReplayConfig(provider_error_rate={"together": 1.0}))
+
+    assert backend.supports_tools
+    with pytest.raises(InjectedError):
+        backend.complete([{"role": "user", "content": "hi"}])
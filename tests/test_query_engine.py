@@ -0,0 +1,116 @@
+import pytest
+
+from query_engine import analyze_query, classify_query, parse_movie, parse_music, parse_news
+
+
+def _substring_classifier(user_input):
+    """The keyword routing the engine replaced: one substring test per keyword"""
+    lowered = user_input.lower()
+    movie = sum(k in lowered for k in ["movie", "film", "director", "actor", "actress", "genre", "rating", "imdb", "cinema"])
+    music = sum(k in lowered for k in ["song", "music", "artist", "singer", "album", "track", "playlist", "band", "listen"])
+    news = sum(k in lowered for k in ["news", "latest", "update", "headline", "report", "article", "journalist",
+                                     "current events"])
+    if "news" in lowered or news > max(movie, music):
+        return "news"
+    if any(term in lowered for term in ["song", "music", "artist", "singer"]) or music > movie:
+        return "music"
+    if movie > 0:
+        return "movie"
+    return "general"
+
+
+@pytest.mark.parametrize("query", [
+    "top 5 comedy movies from 2019",
+    "Songs by Adele",
+    "latest headlines on the election",
+    "how do magnets work",
+    "newsong releases",
+    "film scores and soundtrack albums",
+    "actress interviews report",
+    "best rock band playlist",
+    "what's the weather like today",
+    "current events in music",
+    "",
+])
+def test_single_pass_classifier_matches_keyword_routing(query):
+    assert classify_query(query) == _substring_classifier(query)
+    assert analyze_query(query).query_type == _substring_classifier(query)
+
+
+def test_analyze_query_parses_only_the_chosen_type():
+    movie = analyze_query("top 3 comedy movies from 2019")
+    assert movie.search_criteria == {"genre": "comedy", "year": "2019"}
+    assert (movie.count, movie.search_query) == (3, None)
+
+    news = analyze_query("news about Tesla")
+    assert (news.query_type, news.search_query, news.criteria) == ("news", "Tesla", ())
+    assert parse_news("top 3 news on AI") == ("top 3 news on AI", 3)
+
+    general = analyze_query("how do magnets work")
+    assert (general.query_type, general.search_query, general.resolved) == ("general", "how do magnets work", False)
+
+
+def test_analyze_query_is_memoized_and_criteria_copies_are_independent():
+    first = analyze_query("movies with Tom Hanks")
+    assert analyze_query("movies with Tom Hanks") is first
+
+    criteria = first.search_criteria
+    criteria["actor"] = "changed"
+    assert first.search_criteria == {"actor": "Tom Hanks"}
+
+
+def test_matched_types_lists_every_vertical_with_a_keyword_hit():
+    assert analyze_query("movie soundtrack songs").matched_types == ("music", "movie")
+    assert analyze_query("how do magnets work").matched_types == ()
+
+
+@pytest.mark.parametrize("query", [
+    "top 5 movies of all time",
+    "Top 5 Movies Of All Time",
+    "top comedy movies of all time",
+    "movies with tom hanks",
+    "films directed by Christopher Nolan",
+])
+def test_movie_name_guesses_are_not_resolved(query):
+    _, _, resolved = parse_movie(query)
+    assert not resolved
+
+
+@pytest.mark.parametrize("query", [
+    "top 10 songs of all time",
+    "songs by the beatles",
+    "Songs By Adele",
+])
+def test_music_name_guesses_are_not_resolved(query):
+    _, _, resolved = parse_music(query)
+    assert not resolved
+
+
+@pytest.mark.parametrize("query, criteria", [
+    ("movies with Tom Hanks", {"actor": "Tom Hanks"}),
+    ("top 5 comedy movies", {"genre": "comedy"}),
+    ("horror movies from 2019", {"genre": "horror", "year": "2019"}),
+])
+def test_movie_explicit_criteria_are_resolved(query, criteria):
+    parsed, _, resolved = parse_movie(query)
+    assert parsed == criteria
+    assert resolved
+
+
+@pytest.mark.parametrize("query, criteria", [
+    ("songs by Taylor Swift", {"artist": "Taylor Swift"}),
+    ("top 10 jazz songs", {"genre": "jazz"}),
+])
+def test_music_explicit_criteria_are_resolved(query, criteria):
+    parsed, _, resolved = parse_music(query)
+    assert parsed == criteria
+    assert resolved
+
+
+def test_direct_mode_is_off_by_default(monkeypatch):
+    monkeypatch.delenv("SEARCH_DIRECT_MODE", raising=False)
+    monkeypatch.setenv("SEARCH_CACHE_DISK", "0")
+    monkeypatch.setenv("ANSWER_CACHE_DISK", "0")
+    from unified_crewai import UnifiedSearchCrew
+
+    assert not UnifiedSearchCrew("key", "token", "key").direct_mode
@@ -0,0 +1,121 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from rate_limit import BATCH, INTERACTIVE, RateLimiter, RateLimitTimeout, TokenBucket, track_waits
+
+
+def _drain(bucket):
+    while bucket.try_acquire():
+        pass
+
+
+def test_queued_interactive_callers_are_served_before_batch():
+    bucket = TokenBucket(rate=20, burst=1)
+    _drain(bucket)
+    order = []
+
+    def worker(priority, name):
+        bucket.acquire(priority)
+        order.append(name)
+
+    threads = [threading.Thread(target=worker, args=(BATCH, "batch"))]
+    threads[0].start()
+    time.sleep(0.01)
+    threads.append(threading.Thread(target=worker, args=(INTERACTIVE, "interactive")))
+    threads[1].start()
+    for thread in threads:
+        thread.join(2)
+
+    assert order == ["interactive", "batch"]
+
+
+def test_acquire_times_out_and_leaves_the_queue():
+    bucket = TokenBucket(rate=0.5, burst=1)
+    _drain(bucket)
+
+    with pytest.raises(RateLimitTimeout):
+        bucket.acquire(timeout=0.05)
+
+    stats = bucket.stats()
+    assert stats["timeouts"] == 1
+    assert stats["queue_depth"] == 0
+
+
+def test_async_acquire_keeps_priority_order_without_threads():
+    bucket = TokenBucket(rate=20, burst=1)
+    _drain(bucket)
+    order = []
+
+    async def worker(priority, name):
+        await bucket.aacquire(priority)
+        order.append(name)
+
+    async def main():
+        batch = asyncio.create_task(worker(BATCH, "batch"))
+        await asyncio.sleep(0.01)
+        interactive = asyncio.create_task(worker(INTERACTIVE, "interactive"))
+        await asyncio.gather(batch, interactive)
+
+    threads_before = threading.active_count()
+    asyncio.run(main())
+
+    assert order == ["interactive", "batch"]
+    assert threading.active_count() == threads_before
+
+
+def test_async_and_thread_waiters_share_one_queue():
+    bucket = TokenBucket(rate=20, burst=1)
+    _drain(bucket)
+    order = []
+
+    def blocking_batch():
+        bucket.acquire(BATCH)
+        order.append("thread-batch")
+
+    async def main():
+        thread = threading.Thread(target=blocking_batch)
+        thread.start()
+        await asyncio.sleep(0.01)
+        await bucket.aacquire(INTERACTIVE)
+        order.append("async-interactive")
+        await asyncio.to_thread(thread.join, 2)
+
+    asyncio.run(main())
+
+    assert order == ["async-interactive", "thread-batch"]
+
+
+def test_async_timeout_and_cancellation_leave_the_queue():
+    bucket = TokenBucket(rate=0.5, burst=1)
+    _drain(bucket)
+
+    async def main():
+        with pytest.raises(RateLimitTimeout):
+            await bucket.aacquire(timeout=0.05)
+        task = asyncio.create_task(bucket.aacquire())
+        await asyncio.sleep(0.01)
+        assert bucket.stats()["queue_depth"] == 1
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(main())
+
+    stats = bucket.stats()
+    assert stats["timeouts"] == 1
+    assert stats["queue_depth"] == 0
+
+
+def test_limiter_applies_max_wait_and_logs_waits():
+    limiter = RateLimiter({"serp": (0.5, 1)}, max_wait={INTERACTIVE: 0.05})
+
+    with track_waits() as waits:
+        assert limiter.acquire("serp") == 0.0
+        assert limiter.acquire("unlisted") == 0.0
+        with pytest.raises(RateLimitTimeout):
+            asyncio.run(limiter.aacquire("serp"))
+
+    assert waits == [0.0]
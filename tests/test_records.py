@@ -0,0 +1,75 @@
+import copy
+import json
+
+import pytest
+
+import records
+from records import KnowledgeGraph, MovieRecord, NewsRecord, SongRecord, WebResult, is_error, json_default
+
+
+def _result():
+    return {
+        "movies": [MovieRecord("Heat", "1995", 8.3, "Crime epic", None, "https://t.co/heat", "Michael Mann", 170,
+                               ["Crime", "Drama"])],
+        "songs": [SongRecord(title="Blue", artist="Joni Mitchell", popularity=71)],
+        "news": [NewsRecord("Story", "Wire"), {"error": "quota"}],
+        "web": {"knowledge_graph": KnowledgeGraph("Sun", "Star"), "results": [WebResult("Sun", "https://s.com", "Hot")]},
+    }
+
+
+def test_records_behave_like_read_only_dicts():
+    song = SongRecord(title="Blue", artist="Joni Mitchell")
+
+    assert song["title"] == "Blue"
+    assert song.get("album", "n/a") == "n/a"
+    assert song.get("unknown") is None
+    assert "artist" in song and "album" not in song
+    assert song.keys() == ["title", "artist"]
+    assert song.to_dict() == {"title": "Blue", "artist": "Joni Mitchell"}
+    assert SongRecord.from_dict(song.to_dict()) == song
+    with pytest.raises(KeyError):
+        song["unknown"]
+    with pytest.raises(TypeError):
+        SongRecord(nope=1)
+    assert not hasattr(song, "__dict__")
+
+
+def test_json_round_trip_restores_records():
+    result = _result()
+    restored = records.loads(records.dumps(result))
+
+    assert restored == result
+    assert type(restored["movies"][0]) is MovieRecord
+    assert restored["movies"][0]["genres"] == ["Crime", "Drama"]
+    assert restored["news"][1] == {"error": "quota"}
+
+
+def test_msgpack_round_trip_restores_records():
+    result = _result()
+    restored = records.unpackb(records.packb(result))
+
+    assert restored == result
+    assert type(restored["web"]["results"][0]) is WebResult
+
+
+def test_unknown_tags_are_left_as_dicts():
+    payload = json.dumps({"__r": "podcast", "v": ["x"]})
+
+    assert records.loads(payload) == {"__r": "podcast", "v": ["x"]}
+    assert records.loads('{"__r": "movie", "v": [], "extra": 1}') == {"__r": "movie", "v": [], "extra": 1}
+
+
+def test_api_json_uses_plain_dicts():
+    output = json.loads(json.dumps(_result(), default=json_default))
+
+    assert output["songs"][0] == {"title": "Blue", "artist": "Joni Mitchell", "popularity": 71}
+    assert output["web"]["knowledge_graph"] == {"title": "Sun", "type": "Star"}
+
+
+def test_error_items_and_copies():
+    movie = _result()["movies"][0]
+
+    assert is_error({"error": "quota"})
+    assert not is_error(movie)
+    assert not is_error({"title": "x"})
+    assert copy.deepcopy(movie) == movie and copy.deepcopy(movie) is not movie
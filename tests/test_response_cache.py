@@ -0,0 +1,115 @@
+import asyncio
+import time
+
+import pytest
+
+from records import MovieRecord
+from response_cache import DiskCache, MemoryLRUCache, TieredCache, make_cache_key
+
+
+def test_equivalent_requests_share_a_key_and_secrets_are_left_out():
+    key = make_cache_key("tmdb", {"query": "Dune  Part Two", "api_key": "a", "page": 1.0, "year": None})
+
+    assert key == make_cache_key("tmdb", {"query": "dune part two", "api_key": "b", "page": 1})
+    assert key != make_cache_key("itunes", {"query": "dune part two", "page": 1})
+    assert "dune" not in key
+
+
+def test_memory_tier_evicts_least_recently_used_and_expires():
+    memory = MemoryLRUCache(max_entries=2)
+    memory.set("a", 1, ttl=60)
+    memory.set("b", 2, ttl=60)
+    memory.get("a")
+    memory.set("c", 3, ttl=60)
+
+    assert memory.get("b") == (False, None)
+    assert memory.get("a") == (True, 1)
+    assert memory.evictions == 1
+
+    memory.set("short", 4, ttl=-1)
+    assert memory.get("short") == (False, None)
+
+
+def test_disk_hit_is_promoted_only_for_the_rows_remaining_ttl(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    writer = TieredCache(disk=DiskCache(path), ttls={"news": 60})
+    writer.set("news", {"q": "election"}, [{"title": "Result"}])
+    _, _, expires_at = writer.disk.get(make_cache_key("news", {"q": "election"}))
+
+    # A second worker process: empty memory, same disk file
+    reader = TieredCache(disk=DiskCache(path), ttls={"news": 3600})
+    time.sleep(0.05)
+    assert reader.get("news", {"q": "election"}) == (True, [{"title": "Result"}])
+    assert reader.get("news", {"q": "election"})[0]
+
+    promoted_until, _ = reader.memory._data[make_cache_key("news", {"q": "election"})]
+    assert promoted_until == pytest.approx(expires_at, abs=0.01)
+    stats = reader.stats()
+    assert (stats["disk_hits"], stats["memory_hits"]) == (1, 1)
+
+
+def test_expired_disk_rows_miss(tmp_path):
+    cache = TieredCache(disk=DiskCache(str(tmp_path / "cache.sqlite3")), ttls={"web": 0.05})
+    cache.set("web", {"q": "x"}, {"organic_results": []})
+    cache.memory.clear()
+    time.sleep(0.06)
+
+    assert cache.get("web", {"q": "x"}) == (False, None)
+    assert cache.disk.purge_expired() == 0
+
+
+@pytest.mark.parametrize("serializer", ["json", "msgpack"])
+def test_records_round_trip_through_the_disk_tier(tmp_path, serializer):
+    movie = MovieRecord(title="Dune", year="2021", rating="8.0", description="Sand", thumbnail="t",
+                        link="l", director="Villeneuve", runtime=155, genres="Science Fiction")
+    cache = TieredCache(disk=DiskCache(str(tmp_path / "cache.sqlite3"), serializer=serializer))
+    cache.set("tmdb", {"q": "dune"}, [movie])
+    cache.memory.clear()
+
+    found, value = cache.get("tmdb", {"q": "dune"})
+
+    assert found and value == [movie]
+    assert isinstance(value[0], MovieRecord)
+
+
+def test_get_or_fetch_skips_errors_and_honours_bypass():
+    cache = TieredCache()
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        return {"error": "quota"} if len(calls) == 1 else {"ok": True}
+
+    assert cache.get_or_fetch("web", {"q": "a"}, fetch) == {"error": "quota"}
+    assert cache.get_or_fetch("web", {"q": "a"}, fetch) == {"ok": True}
+    assert cache.get_or_fetch("web", {"q": "a"}, fetch) == {"ok": True}
+    assert len(calls) == 2
+    cache.get_or_fetch("web", {"q": "a"}, fetch, bypass=True)
+    assert len(calls) == 3
+    assert cache.stats()["bypassed"] == 1
+
+
+def test_cached_values_are_copies():
+    cache = TieredCache()
+    cache.set("itunes", {"q": "jazz"}, [{"title": "So What"}])
+    cache.get("itunes", {"q": "jazz"})[1][0]["title"] = "changed"
+
+    assert cache.get("itunes", {"q": "jazz"})[1] == [{"title": "So What"}]
+
+
+def test_async_get_or_fetch_uses_the_same_tiers(tmp_path):
+    cache = TieredCache(disk=DiskCache(str(tmp_path / "cache.sqlite3")))
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        return ["result"]
+
+    async def main():
+        first = await cache.aget_or_fetch("web", {"q": "async"}, fetch)
+        cache.memory.clear()
+        second = await cache.aget_or_fetch("web", {"q": "async"}, fetch)
+        return first, second
+
+    assert asyncio.run(main()) == (["result"], ["result"])
+    assert calls == [1]
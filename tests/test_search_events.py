@@ -0,0 +1,138 @@
+import json
+import threading
+import time
+
+import pytest
+from crewai.events import crewai_event_bus, LLMStreamChunkEvent
+
+import search_events
+from llm_registry import LLMBackend, LLMRegistry
+import llm_resilience
+from llm_resilience import ResiliencePolicy
+from search_events import EventStream, SearchCancelled, bind_stream, emit_event, raise_if_cancelled, stream_search
+from singleflight import SingleFlight
+
+
+def parse_sse(messages):
+    events = []
+    for message in messages:
+        fields = dict(line.split(": ", 1) for line in message.strip().splitlines())
+        events.append((fields["event"], json.loads(fields["data"])))
+    return events
+
+
+def test_token_listener_is_registered_on_first_stream():
+    assert search_events._ensure_llm_token_listener() is not None
+
+
+def test_llm_stream_chunks_reach_the_sse_stream():
+    def search(user_input):
+        # What crewai's LLM does for each streamed completion chunk
+        for chunk in ("Hello", "", " world"):
+            crewai_event_bus.emit(None, LLMStreamChunkEvent(chunk=chunk, call_id="test-call"))
+        return {"type": "general", "result": "Hello world"}
+
+    events = parse_sse(stream_search(search, "anything", lambda result: result["result"], "general"))
+
+    assert [data["text"] for event, data in events if event == "token"] == ["Hello", " world"]
+    assert events[-2] == ("result", {"type": "general", "content": "Hello world", "cached": False})
+    assert events[-1] == ("done", {})
+
+
+class FlakyStreamingBackend(LLMBackend):
+    """Streams a partial answer and fails on its first call, then streams the full answer"""
+
+    def __init__(self, name):
+        super().__init__(name, None, lambda: object())
+        self.calls = 0
+
+    def complete(self, messages, *args, **kwargs):
+        self.calls += 1
+        if self.calls == 1:
+            crewai_event_bus.emit(None, LLMStreamChunkEvent(chunk="Hel", call_id="first"))
+            raise ConnectionError("connection reset")
+        for chunk in ("Hello", " world"):
+            crewai_event_bus.emit(None, LLMStreamChunkEvent(chunk=chunk, call_id="second"))
+        return "Hello world"
+
+
+def test_retried_attempt_resets_its_partial_tokens(monkeypatch):
+    monkeypatch.setattr(llm_resilience, "_default_policy", ResiliencePolicy(backoff_base=0.01))
+    registry = LLMRegistry()
+    registry.register(FlakyStreamingBackend("flaky-stream"))
+
+    events = parse_sse(stream_search(lambda user_input: {"type": "general", "result": registry.complete(user_input)},
+                                     "hi", lambda result: result["result"], "general"))
+
+    assert [(event, data) for event, data in events if event in ("token", "reset")] == [
+        ("token", {"text": "Hel"}), ("reset", {"discard": 3}), ("token", {"text": "Hello"}), ("token", {"text": " world"})]
+    assert events[-2] == ("result", {"type": "general", "content": "Hello world", "cached": False})
+
+
+def test_disconnect_stops_the_search_at_its_next_llm_call():
+    registry = LLMRegistry()
+    backend = FlakyStreamingBackend("steady-stream")
+    backend.calls = 1
+    registry.register(backend)
+    finished = threading.Event()
+    outcome = []
+
+    def search(user_input):
+        try:
+            emit_event("query_type", {"type": "general"})
+            for _ in range(100):
+                registry.complete(user_input)
+                time.sleep(0.01)
+            outcome.append("completed")
+        except SearchCancelled:
+            outcome.append("cancelled")
+            raise
+        finally:
+            finished.set()
+
+    events = stream_search(search, "hi", str, "general")
+    assert next(events).startswith("event: query_type")
+    events.close()
+
+    assert finished.wait(5)
+    assert outcome == ["cancelled"]
+    assert backend.calls < 50
+
+
+def test_cancelled_leader_keeps_running_for_followers():
+    flight = SingleFlight()
+    stream = EventStream()
+    stream.cancel()
+    follower_joined = threading.Event()
+    checks = []
+
+    def lead():
+        follower_joined.wait(5)
+        time.sleep(0.05)
+        with bind_stream(stream):
+            raise_if_cancelled()
+        checks.append("kept running")
+        return "answer"
+
+    leader = threading.Thread(target=flight.do, args=("key", lead))
+    leader.start()
+    time.sleep(0.05)
+    follower = threading.Thread(target=lambda: (follower_joined.set(), flight.do("key", lambda: "own")))
+    follower.start()
+    leader.join(5)
+    follower.join(5)
+
+    assert checks == ["kept running"]
+    with bind_stream(stream), pytest.raises(SearchCancelled):
+        raise_if_cancelled()
+
+
+def test_tokens_beyond_the_pending_limit_are_dropped():
+    stream = EventStream(max_pending=2)
+    for text in ("a", "b", "c"):
+        stream.emit("token", {"text": text})
+    stream.emit("result", {"content": "abc"})
+    stream.close()
+
+    assert list(stream) == [("token", {"text": "a"}), ("token", {"text": "b"}), ("result", {"content": "abc"})]
+    assert stream.dropped_tokens == 1
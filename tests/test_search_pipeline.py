@@ -0,0 +1,67 @@
+import threading
+import time
+
+import pytest
+
+from unified_crewai import SearchPipeline, UnifiedSearchCrew
+
+
+class FakeCrew:
+    def __init__(self, release=None):
+        self.inputs = []
+        self.release = release
+
+    def kickoff(self, inputs):
+        self.inputs.append(inputs)
+        if self.release is not None:
+            self.release.wait(2)
+        if inputs.get("fail"):
+            raise RuntimeError("agent failed")
+        return f"answer for {inputs['q']}"
+
+
+def test_sequential_requests_reuse_one_crew():
+    crews = []
+    pipeline = SearchPipeline(lambda: crews.append(FakeCrew()) or crews[-1], prebuild=0)
+
+    assert pipeline.kickoff({"q": "a"}) == "answer for a"
+    assert pipeline.kickoff({"q": "b"}) == "answer for b"
+    with pytest.raises(RuntimeError):
+        pipeline.kickoff({"q": "c", "fail": True})
+    pipeline.kickoff({"q": "d"})
+
+    assert pipeline.built == 1
+    assert [inputs["q"] for inputs in crews[0].inputs] == ["a", "b", "c", "d"]
+
+
+def test_concurrent_requests_never_share_a_crew():
+    release = threading.Event()
+    crews = []
+    pipeline = SearchPipeline(lambda: crews.append(FakeCrew(release)) or crews[-1], prebuild=1, max_idle=2)
+    threads = [threading.Thread(target=pipeline.kickoff, args=({"q": str(i)},)) for i in range(3)]
+    for thread in threads:
+        thread.start()
+    deadline = time.monotonic() + 2
+    while sum(len(crew.inputs) for crew in crews) < 3 and time.monotonic() < deadline:
+        time.sleep(0.005)
+    release.set()
+    for thread in threads:
+        thread.join(2)
+
+    assert pipeline.built == 3
+    assert all(len(crew.inputs) == 1 for crew in crews)
+    # Only max_idle crews are kept for reuse
+    assert pipeline._idle.qsize() == 2
+
+
+def test_crews_are_built_on_first_use_unless_prebuilt(monkeypatch):
+    monkeypatch.delenv("SEARCH_PREBUILD_CREWS", raising=False)
+    lazy = UnifiedSearchCrew("key", "token", "key")
+    assert {pipeline.built for pipeline in lazy.pipelines.values()} == {0}
+
+    prebuilt = UnifiedSearchCrew("key", "token", "key", prebuild_crews=1)
+    assert {pipeline.built for pipeline in prebuilt.pipelines.values()} == {1}
+    # Pooled crews keep their task templates; each request only supplies inputs
+    crew = prebuilt.pipelines["news"]._idle.get_nowait()
+    assert '"{search_query}"' in crew.tasks[0].description
+    assert prebuilt.tasks.news_search_inputs("solar", 3) == {"search_query": "solar", "count": 3}
@@ -0,0 +1,143 @@
+import asyncio
+import threading
+import time
+
+from singleflight import SingleFlight, shared_with_waiters
+
+
+def _run_concurrently(flight, key, fn, callers=5):
+    results, errors = [], []
+    started = threading.Barrier(callers)
+
+    def caller():
+        started.wait()
+        try:
+            results.append(flight.do(key, fn))
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=caller) for _ in range(callers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(5)
+    return results, errors
+
+
+def test_do_runs_once_for_concurrent_callers_and_copies_the_result():
+    flight = SingleFlight()
+    calls = []
+
+    def work():
+        calls.append(1)
+        time.sleep(0.1)
+        return {"answer": 42}
+
+    results, errors = _run_concurrently(flight, "q", work)
+
+    assert not errors
+    assert len(calls) == 1
+    assert sorted(shared for _, shared in results) == [False, True, True, True, True]
+    assert all(result == {"answer": 42} for result, _ in results)
+    assert len({id(result) for result, _ in results}) == 5
+    assert flight.stats() == {"executions": 1, "coalesced": 4, "lock_waits": 0, "in_flight": 0, "cross_worker": False}
+
+
+def test_do_raises_the_leaders_error_in_every_caller_then_forgets_it():
+    flight = SingleFlight()
+    error = ValueError("provider down")
+
+    def fail():
+        time.sleep(0.1)
+        raise error
+
+    results, errors = _run_concurrently(flight, "q", fail)
+
+    assert results == []
+    assert len(errors) == 5 and all(e is error for e in errors)
+    assert flight.do("q", lambda: "recovered") == ("recovered", False)
+
+
+def test_leader_sees_whether_followers_are_waiting():
+    flight = SingleFlight()
+    seen = []
+    follower_joined = threading.Event()
+
+    def work():
+        seen.append(shared_with_waiters())
+        follower_joined.wait(2)
+        time.sleep(0.05)
+        seen.append(shared_with_waiters())
+
+    leader = threading.Thread(target=flight.do, args=("q", work))
+    leader.start()
+    time.sleep(0.05)
+    follower = threading.Thread(target=flight.do, args=("q", work))
+    follower.start()
+    follower_joined.set()
+    leader.join(2)
+    follower.join(2)
+
+    assert seen == [False, True]
+    assert not shared_with_waiters()
+
+
+def test_ado_coalesces_and_propagates_errors():
+    flight = SingleFlight()
+    calls = []
+
+    async def work():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return ["result"]
+
+    async def fail():
+        await asyncio.sleep(0.05)
+        raise KeyError("missing")
+
+    async def main():
+        ok = await asyncio.gather(*(flight.ado("ok", work) for _ in range(3)))
+        failed = await asyncio.gather(*(flight.ado("bad", fail) for _ in range(3)), return_exceptions=True)
+        return ok, failed
+
+    ok, failed = asyncio.run(main())
+
+    assert calls == [1]
+    assert [shared for _, shared in ok] == [False, True, True]
+    assert all(isinstance(error, KeyError) for error in failed)
+    assert flight.stats()["in_flight"] == 0
+
+
+def test_file_lock_makes_another_worker_wait(tmp_path):
+    workers = [SingleFlight(lock_dir=str(tmp_path)), SingleFlight(lock_dir=str(tmp_path))]
+    order = []
+
+    def work(name):
+        order.append(f"{name} start")
+        time.sleep(0.15)
+        order.append(f"{name} end")
+
+    first = threading.Thread(target=workers[0].do, args=("q", lambda: work("first")))
+    first.start()
+    time.sleep(0.05)
+    workers[1].do("q", lambda: work("second"))
+    first.join(2)
+
+    assert order == ["first start", "first end", "second start", "second end"]
+    assert workers[1].stats()["lock_waits"] == 1
+
+
+def test_file_lock_wait_is_bounded(tmp_path):
+    holder = SingleFlight(lock_dir=str(tmp_path))
+    impatient = SingleFlight(lock_dir=str(tmp_path), lock_timeout=0.1)
+    release = threading.Event()
+    thread = threading.Thread(target=holder.do, args=("q", lambda: release.wait(2)))
+    thread.start()
+    time.sleep(0.05)
+    try:
+        started = time.monotonic()
+        assert impatient.do("q", lambda: "ran anyway") == ("ran anyway", False)
+        assert time.monotonic() - started < 1.0
+    finally:
+        release.set()
+        thread.join(2)
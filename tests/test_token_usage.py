@@ -0,0 +1,104 @@
+import crewai
+from types import SimpleNamespace
+
+from llm_registry import CrewLLMBackend, InvokeBackend, LLMRegistry, usage_counts
+from prompt_budget import USAGE_ESTIMATE, USAGE_PROVIDER, record_llm_usage, track_tokens
+from unified_agents import PRIMARY_MODEL, RoutedLLM
+
+
+class Reply:
+    def __init__(self, content, usage=None):
+        self.content = content
+        self.usage = usage
+
+
+class TextClient:
+    def __init__(self, usage=None):
+        self.usage = usage
+
+    def invoke(self, prompt):
+        return Reply("four", self.usage)
+
+
+class CountingClient:
+    """Stands in for a crewai LLM: keeps running token totals like get_token_usage_summary()"""
+
+    def __init__(self):
+        self.totals = SimpleNamespace(prompt_tokens=0, completion_tokens=0, successful_requests=0)
+
+    def get_token_usage_summary(self):
+        return SimpleNamespace(**vars(self.totals))
+
+
+def test_usage_counts_reads_openai_and_gemini_reports():
+    assert usage_counts(None) is None
+    assert usage_counts({"prompt_tokens": 12, "completion_tokens": 3}) == {"prompt_tokens": 12, "completion_tokens": 3}
+    assert usage_counts(SimpleNamespace(prompt_token_count=40, candidates_token_count=7)) == \
+        {"prompt_tokens": 40, "completion_tokens": 7}
+    assert usage_counts(SimpleNamespace(total=5)) is None
+
+
+def test_track_tokens_labels_the_source_of_each_count():
+    with track_tokens() as usage:
+        record_llm_usage(100, 20, USAGE_PROVIDER)
+        assert usage["token_source"] == "provider"
+        record_llm_usage(50, 10, USAGE_ESTIMATE)
+
+    assert usage["llm_calls"] == 2
+    assert usage["prompt_tokens"] == 150
+    assert usage["provider_calls"] == 1
+    assert usage["estimate_calls"] == 1
+    assert usage["token_source"] == "mixed"
+
+
+def _routed(monkeypatch, name, client):
+    monkeypatch.setenv("LLM_ROUTE_DEFAULT", name)
+    registry = LLMRegistry()
+    registry.register(InvokeBackend(name, "gemini", lambda: client))
+    return RoutedLLM(model=PRIMARY_MODEL, registry=registry)
+
+
+def test_routed_llm_logs_provider_usage_when_reported(monkeypatch):
+    llm = _routed(monkeypatch, "usage-reported", TextClient({"prompt_tokens": 321, "completion_tokens": 9}))
+
+    with track_tokens() as usage:
+        assert llm.call([{"role": "user", "content": "2+2?"}]) == "four"
+
+    assert (usage["prompt_tokens"], usage["completion_tokens"]) == (321, 9)
+    assert usage["token_source"] == "provider"
+
+
+def test_routed_llm_falls_back_to_estimates(monkeypatch):
+    llm = _routed(monkeypatch, "usage-missing", TextClient())
+
+    with track_tokens() as usage:
+        llm.call([{"role": "user", "content": "x" * 40}])
+
+    assert usage["prompt_tokens"] == 14
+    assert usage["completion_tokens"] == 1
+    assert usage["token_source"] == "estimate"
+
+
+def test_crew_backend_reports_the_clients_usage_for_one_call(monkeypatch):
+    def fake_call(client, messages, *args, **kwargs):
+        client.totals.prompt_tokens += 200
+        client.totals.completion_tokens += 30
+        client.totals.successful_requests += 1
+        return "answer"
+
+    monkeypatch.setattr(crewai.LLM, "call", fake_call)
+    client = CountingClient()
+    client.totals.prompt_tokens = 1000
+    backend = CrewLLMBackend("usage-crew", "together", lambda: client)
+
+    assert backend.complete_with_usage("hi") == ("answer", {"prompt_tokens": 200, "completion_tokens": 30})
+
+    # A call that overlaps another on the same client can't be told apart from it
+    def overlapping_call(client, messages, *args, **kwargs):
+        if not getattr(client, "nested", False):
+            client.nested = True
+            assert backend.complete_with_usage("inner")[1] is None
+        return fake_call(client, messages)
+
+    monkeypatch.setattr(crewai.LLM, "call", overlapping_call)
+    assert backend.complete_with_usage("outer") == ("answer", None)
@@ -0,0 +1,82 @@
+import json
+import socket
+
+import pytest
+
+import tracing
+import unified_main
+from tracing import (Tracer, begin_trace, crew_verbose, current_trace_id, end_trace, start_trace, trace_error,
+                     trace_event)
+
+
+@pytest.fixture
+def trace_log(tmp_path, monkeypatch):
+    """Route trace events to a fresh log file; returns a reader that flushes and parses it"""
+    path = tmp_path / "trace.jsonl"
+    tracer = Tracer(sample_rate=1.0, log_path=str(path))
+    monkeypatch.setattr(tracing, "_default_tracer", tracer)
+
+    def read():
+        tracer.close()
+        return [json.loads(line) for line in path.read_text().splitlines()]
+
+    yield read
+    tracer.close()
+
+
+def test_events_are_written_for_sampled_traces_and_errors_always(trace_log):
+    with start_trace("request-1", sampled=True) as trace:
+        assert current_trace_id() == trace.trace_id == "request-1"
+        trace_event("http", provider="tmdb", status=200, error=None)
+    with start_trace("request-2", sampled=False):
+        trace_event("http", provider="itunes")
+        trace_error("tool", ValueError("bad input"), tool="search_music")
+    trace_event("outside")
+    assert current_trace_id() is None
+
+    events = trace_log()
+    assert [(event["trace_id"], event["stage"]) for event in events] == [("request-1", "http"), ("request-2", "tool")]
+    assert events[0]["provider"] == "tmdb" and "error" not in events[0]
+    assert events[1]["status"] == "error"
+    assert events[1]["error"] == "bad input"
+    assert events[1]["error_type"] == "ValueError"
+
+
+def test_malformed_trace_ids_are_replaced():
+    token = begin_trace("not a valid id!", sampled=False)
+    try:
+        trace_id = current_trace_id()
+        assert trace_id and trace_id != "not a valid id!"
+        assert len(trace_id) == 16
+    finally:
+        end_trace(token)
+    assert current_trace_id() is None
+
+
+def test_events_can_go_to_a_udp_collector():
+    receiver = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    receiver.bind(("127.0.0.1", 0))
+    receiver.settimeout(5)
+    tracer = Tracer(collector=f"udp://127.0.0.1:{receiver.getsockname()[1]}")
+    try:
+        tracer.emit({"stage": "kickoff", "duration_ms": 12.5})
+        assert json.loads(receiver.recv(65536)) == {"stage": "kickoff", "duration_ms": 12.5}
+    finally:
+        tracer.close()
+        receiver.close()
+
+
+def test_requests_get_a_trace_id_header():
+    client = unified_main.app.test_client()
+
+    assert client.get("/metrics", headers={"X-Trace-Id": "caller-42"}).headers["X-Trace-Id"] == "caller-42"
+    first, second = client.get("/metrics"), client.get("/metrics")
+    assert first.headers["X-Trace-Id"] != second.headers["X-Trace-Id"]
+    assert current_trace_id() is None
+
+
+def test_crew_output_is_quiet_unless_requested(monkeypatch):
+    monkeypatch.delenv("CREW_VERBOSE", raising=False)
+    assert not crew_verbose()
+    monkeypatch.setenv("CREW_VERBOSE", "true")
+    assert crew_verbose()
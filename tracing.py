@@ -0,0 +1,236 @@
+"""
+Structured request tracing.
+
+Every API request runs in a trace with its own ID (the caller's X-Trace-Id header,
+or a new one returned in that header). The stage spans from metrics.py (classify,
+parse, crew_build, kickoff, llm, tool, http, extract, request) and explicit
+trace_event / trace_error calls are written as compact JSON lines, e.g.
+
+    {"ts":1760000000.123,"trace_id":"9f1c2a7be0d34c51","stage":"http","duration_ms":212.4,"provider":"tmdb","status":200}
+
+Events are handed to a background thread, so requests never wait on log I/O.
+Only a sample of requests is traced; errors are written for every request.
+
+    TRACE_SAMPLE_RATE=0.1                 share of requests whose events are written
+    TRACE_LOG_PATH=logs/trace.jsonl       rotating log file ("off" disables it)
+    TRACE_LOG_MAX_BYTES=10485760          rotate after this size ...
+    TRACE_LOG_BACKUPS=5                   ... keeping this many old files
+    TRACE_COLLECTOR=udp://127.0.0.1:5170  also send each event as a UDP datagram to a local collector
+    CREW_VERBOSE=1                        restore crewai's console output (local debugging only)
+
+With neither a log file nor a collector, events go to stderr.
+"""
+import atexit
+import contextvars
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import re
+import socket
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Any, Dict, Optional
+from urllib.parse import urlsplit
+
+
+_trace: contextvars.ContextVar = contextvars.ContextVar("search_trace", default=None)
+
+# Caller-supplied IDs (X-Trace-Id) are kept only when they look like an ID
+_VALID_TRACE_ID = re.compile(r"^[A-Za-z0-9._-]{1,64}$")
+
+
+class Trace:
+    """One request's trace ID and sampling decision"""
+
+    __slots__ = ("trace_id", "sampled")
+
+    def __init__(self, trace_id: str, sampled: bool):
+        self.trace_id = trace_id
+        self.sampled = sampled
+
+
+class UDPJSONHandler(logging.Handler):
+    """Sends each formatted record as one UDP datagram (fire and forget)"""
+
+    def __init__(self, host: str, port: int):
+        super().__init__()
+        self.address = (host, port)
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+
+    def emit(self, record):
+        try:
+            self.sock.sendto(self.format(record).encode("utf-8"), self.address)
+        except Exception:
+            self.handleError(record)
+
+    def close(self):
+        self.sock.close()
+        super().close()
+
+
+class Tracer:
+    """Samples traces and writes their events through a queue to the configured sinks"""
+
+    def __init__(self, sample_rate: float = 0.1, log_path: Optional[str] = None,
+                 max_bytes: int = 10 * 2**20, backups: int = 5, collector: Optional[str] = None):
+        """
+        Args:
+            sample_rate: Share of traces whose events are written (errors are always written)
+            log_path: Rotating JSON-lines log file (None disables it)
+            max_bytes: Log size that triggers rotation
+            backups: Rotated files kept
+            collector: "udp://host:port" of a local collector (None disables it)
+        """
+        self.sample_rate = sample_rate
+        handlers = []
+        if log_path:
+            os.makedirs(os.path.dirname(log_path) or ".", exist_ok=True)
+            handlers.append(logging.handlers.RotatingFileHandler(log_path, maxBytes=max_bytes,
+                                                                 backupCount=backups, encoding="utf-8"))
+        if collector:
+            address = urlsplit(collector)
+            handlers.append(UDPJSONHandler(address.hostname or "127.0.0.1", address.port or 5170))
+        if not handlers:
+            handlers.append(logging.StreamHandler())
+        for handler in handlers:
+            handler.setFormatter(logging.Formatter("%(message)s"))
+
+        self._queue: queue.SimpleQueue = queue.SimpleQueue()
+        self.logger = logging.getLogger(f"search.trace.{id(self)}")
+        self.logger.propagate = False
+        self.logger.setLevel(logging.INFO)
+        self.logger.addHandler(logging.handlers.QueueHandler(self._queue))
+        self._listener = logging.handlers.QueueListener(self._queue, *handlers)
+        self._listener.start()
+        self._handlers = handlers
+
+    @classmethod
+    def from_env(cls) -> "Tracer":
+        """Build a tracer from TRACE_* environment variables"""
+        log_path = os.getenv("TRACE_LOG_PATH", os.path.join("logs", "trace.jsonl"))
+        return cls(
+            sample_rate=float(os.getenv("TRACE_SAMPLE_RATE", 0.1)),
+            log_path=None if log_path.lower() in ("", "0", "off", "none") else log_path,
+            max_bytes=int(os.getenv("TRACE_LOG_MAX_BYTES", 10 * 2**20)),
+            backups=int(os.getenv("TRACE_LOG_BACKUPS", 5)),
+            collector=os.getenv("TRACE_COLLECTOR") or None,
+        )
+
+    def sample(self) -> bool:
+        return self.sample_rate >= 1 or random.random() < self.sample_rate
+
+    def emit(self, event: Dict[str, Any]):
+        self.logger.info(json.dumps(event, separators=(",", ":"), default=str))
+
+    def close(self):
+        """Flush queued events and close the sinks"""
+        if self._listener._thread is None:
+            return
+        self._listener.stop()
+        for handler in self._handlers:
+            handler.close()
+
+
+_default_tracer: Optional[Tracer] = None
+_default_tracer_lock = threading.Lock()
+
+
+def get_tracer() -> Tracer:
+    """Return the process-wide tracer, creating it from the environment on first use"""
+    global _default_tracer
+    if _default_tracer is None:
+        with _default_tracer_lock:
+            if _default_tracer is None:
+                _default_tracer = Tracer.from_env()
+                atexit.register(_default_tracer.close)
+    return _default_tracer
+
+
+def configure_tracer(tracer: Tracer) -> Tracer:
+    """Replace the process-wide tracer (the previous one is flushed and closed)"""
+    global _default_tracer
+    with _default_tracer_lock:
+        if _default_tracer is not None:
+            _default_tracer.close()
+        _default_tracer = tracer
+    return _default_tracer
+
+
+def new_trace_id() -> str:
+    return uuid.uuid4().hex[:16]
+
+
+def begin_trace(trace_id: Optional[str] = None, sampled: Optional[bool] = None) -> contextvars.Token:
+    """
+    Start a trace in the current context
+
+    Args:
+        trace_id: ID to continue (e.g. the caller's X-Trace-Id); a new one is made when missing or malformed
+        sampled: Force the sampling decision (default: TRACE_SAMPLE_RATE)
+
+    Returns:
+        Token to pass to end_trace
+    """
+    if not trace_id or not _VALID_TRACE_ID.match(trace_id):
+        trace_id = new_trace_id()
+    if sampled is None:
+        sampled = get_tracer().sample()
+    return _trace.set(Trace(trace_id, sampled))
+
+
+def end_trace(token: contextvars.Token):
+    try:
+        _trace.reset(token)
+    except ValueError:
+        # Reset from another context (e.g. a streamed response finishing later); the context is discarded anyway
+        pass
+
+
+@contextmanager
+def start_trace(trace_id: Optional[str] = None, sampled: Optional[bool] = None):
+    """Run the enclosed block (and threads started with a copy of its context) in a trace"""
+    token = begin_trace(trace_id, sampled)
+    try:
+        yield _trace.get()
+    finally:
+        end_trace(token)
+
+
+def current_trace() -> Optional[Trace]:
+    return _trace.get()
+
+
+def current_trace_id() -> Optional[str]:
+    trace = _trace.get()
+    return trace.trace_id if trace is not None else None
+
+
+def trace_event(stage: str, force: bool = False, **fields):
+    """
+    Write one event for the current trace
+
+    Events of unsampled traces, and events outside any trace, are dropped unless force is set.
+    """
+    trace = _trace.get()
+    if not force and (trace is None or not trace.sampled):
+        return
+    event = {"ts": round(time.time(), 3), "trace_id": trace.trace_id if trace else None, "stage": stage}
+    event.update((name, value) for name, value in fields.items() if value is not None)
+    get_tracer().emit(event)
+
+
+def trace_error(stage: str, error: Any, **fields):
+    """Write an error event (always, regardless of sampling); error is an exception or a message"""
+    if isinstance(error, BaseException):
+        fields.setdefault("error_type", type(error).__name__)
+    trace_event(stage, force=True, status="error", error=str(error)[:500], **fields)
+
+
+def crew_verbose() -> bool:
+    """Whether agents and crews print crewai's console output (off unless CREW_VERBOSE is set)"""
+    return os.getenv("CREW_VERBOSE", "0").lower() in ("1", "true", "yes")
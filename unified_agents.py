@@ -1,26 +1,85 @@
 from crewai import Agent, LLM
 from crewai.tools import BaseTool
 from pydantic import BaseModel, Field, ConfigDict, PrivateAttr
-from typing import Type
+from typing import Dict, Optional, Type
 from api_tools import NewsTools, GeneralSearchTools
-from langchain_google_genai import GoogleGenerativeAI
-# from gemini import GeminiLLM 
-# from deepseek import PegasusLLM
-from langchain_openai import ChatOpenAI
-# from together import Together
-from langchain_together import Together
-from dotenv import load_dotenv
-load_dotenv("keys.env")
+from search_events import emit_event
+from llm_registry import CrewLLMBackend, get_llm_registry
+from prompt_budget import (USAGE_ESTIMATE, USAGE_PROVIDER, compact_tool_output, estimate_message_tokens,
+                           estimate_tokens, record_llm_usage)
+from metrics import span
+from tracing import crew_verbose
 import os
-
-
-llm=LLM(
-    model="together_ai/meta-llama/Llama-3.3-70B-Instruct-Turbo-Free",
-    # model="deepseek-ai/DeepSeek-R1-Distill-Llama-70B-free",
-    api_key=os.getenv("TOGETHER_API_KEY"),
-    api_base="https://api.together.xyz",
-    # endpont = "deepseek-ai/DeepSeek-R1-Distill-Llama-70B-free"
-)
+import threading
+
+
+class RoutedLLM(LLM):
+    """
+    crewai-facing LLM that hands each call to the backend registry, which picks the
+    fastest healthy backend for this LLM's query type and fails over down the route
+    """
+
+    def __init__(self, *args, query_type=None, registry=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.query_type = query_type
+        self.registry = registry or get_llm_registry()
+
+    def call(self, messages, *args, **kwargs):
+        response, usage = self.registry.complete_with_usage(messages, self.query_type, args, kwargs)
+        if usage is not None:
+            record_llm_usage(usage["prompt_tokens"], usage["completion_tokens"], USAGE_PROVIDER)
+        else:
+            record_llm_usage(estimate_message_tokens(messages), estimate_tokens(response), USAGE_ESTIMATE)
+        return response
+
+
+PRIMARY_MODEL = "together_ai/meta-llama/Llama-3.3-70B-Instruct-Turbo-Free"
+
+# Built on the first agent creation rather than at import, so importing this module
+# reads no keys and creates no clients (entry points load keys.env first)
+_agent_llms: Dict[Optional[str], RoutedLLM] = {}
+_agent_llms_lock = threading.Lock()
+
+
+def _llm_stream() -> bool:
+    return os.getenv("LLM_STREAM", "1").lower() not in ("0", "false", "no")
+
+
+def _register_llm_backends(registry):
+    """Register the Together model and any LLM_FALLBACK_MODELS with the backend registry"""
+    stream = _llm_stream()
+    registry.register(CrewLLMBackend("together", "together", lambda: LLM(
+        model=PRIMARY_MODEL,
+        # model="deepseek-ai/DeepSeek-R1-Distill-Llama-70B-free",
+        api_key=os.getenv("TOGETHER_API_KEY"),
+        api_base="https://api.together.xyz",
+        # Stream completions so /api/*/stream can forward tokens as they are generated
+        stream=stream,
+        # endpont = "deepseek-ai/DeepSeek-R1-Distill-Llama-70B-free"
+    )))
+    # Extra litellm models (comma-separated ids) registered as backends named by their model id
+    for fallback_model in [m.strip() for m in os.getenv("LLM_FALLBACK_MODELS", "").split(",") if m.strip()]:
+        registry.register(CrewLLMBackend(fallback_model, fallback_model.split("/", 1)[0],
+                                         lambda model=fallback_model: LLM(model=model, stream=stream)))
+
+
+def get_agent_llm(query_type: Optional[str] = None) -> RoutedLLM:
+    """
+    Return the routed LLM for a query type, registering the backends on first use
+
+    One routed LLM per query type, so LLM_ROUTE_<TYPE> can pick e.g. a cheap fast model for news.
+    """
+    llm = _agent_llms.get(query_type)
+    if llm is None:
+        with _agent_llms_lock:
+            llm = _agent_llms.get(query_type)
+            if llm is None:
+                registry = get_llm_registry()
+                if "together" not in registry.backends:
+                    _register_llm_backends(registry)
+                llm = _agent_llms[query_type] = RoutedLLM(model=PRIMARY_MODEL, stream=_llm_stream(),
+                                                          query_type=query_type, registry=registry)
+    return llm
 
 
 class MovieSearchInput(BaseModel):
@@ -51,8 +110,12 @@ class MovieSearchTool(BaseTool):
         self._search_tools = search_tools
 
     def _run(self, query: str) -> str:
-        # Use the web search implementation for movies
-        return self._search_tools.web_search(query)
+        with span("tool", tool=self.name):
+            # Use the web search implementation for movies
+            result = self._search_tools.web_search(query)
+            emit_event("tool_result", {"tool": self.name, "result": result})
+            # The agent sees only the fields its task uses, within the movie token budget
+            return compact_tool_output("movie", result)
 
 class MusicSearchTool(BaseTool):
     name: str = "Search Music"
@@ -67,8 +130,12 @@ class MusicSearchTool(BaseTool):
         self._search_tools = search_tools
 
     def _run(self, query: str) -> str:
-        # Use the web search implementation for music
-        return self._search_tools.web_search(query)
+        with span("tool", tool=self.name):
+            # Use the web search implementation for music
+            result = self._search_tools.web_search(query)
+            emit_event("tool_result", {"tool": self.name, "result": result})
+            # The agent sees only the fields its task uses, within the music token budget
+            return compact_tool_output("music", result)
 
 class NewsSearchTool(BaseTool):
     name: str = "Fetch News"
@@ -83,7 +150,11 @@ class NewsSearchTool(BaseTool):
         self._news_tools = news_tools
 
     def _run(self, search_query: str, count: int = 5) -> str:
-        return self._news_tools.fetch_news(search_query, count)
+        with span("tool", tool=self.name):
+            result = self._news_tools.fetch_news(search_query, count)
+            emit_event("tool_result", {"tool": self.name, "result": result})
+            # The agent sees only the fields its task uses, within the news token budget
+            return compact_tool_output("news", result)
 
 class WebSearchTool(BaseTool):
     name: str = "Web Search"
@@ -98,7 +169,11 @@ class WebSearchTool(BaseTool):
         self._search_tools = search_tools
 
     def _run(self, query: str) -> str:
-        return self._search_tools.web_search(query)
+        with span("tool", tool=self.name):
+            result = self._search_tools.web_search(query)
+            emit_event("tool_result", {"tool": self.name, "result": result})
+            # The agent sees only the fields its task uses, within the general token budget
+            return compact_tool_output("general", result)
 
 # ----------------- Unified Search Agents -----------------
 
@@ -118,9 +193,9 @@ class UnifiedSearchAgents:
             role='Movie Search Specialist',
             goal='Find high-quality movie information based on user queries',
             backstory='Expert in movie data analysis with vast knowledge of films, directors, and actors.',
-            llm=llm,
+            llm=get_agent_llm("movie"),
             tools=[self.movie_search_tool],
-            verbose=True,
+            verbose=crew_verbose(),
             allow_delegation=False
         )
 
@@ -129,9 +204,9 @@ class UnifiedSearchAgents:
             role='Music Discovery Specialist',
             goal='Find and present music that matches user preferences',
             backstory='Experienced music curator with deep knowledge of artists, genres, and trends.',
-            llm=llm,
+            llm=get_agent_llm("music"),
             tools=[self.music_search_tool],
-            verbose=True,
+            verbose=crew_verbose(),
             allow_delegation=False
         )
 
@@ -140,9 +215,9 @@ class UnifiedSearchAgents:
             role='News Analyst',
             goal='Find and summarize relevant news stories',
             backstory='Seasoned journalist with experience in quickly finding, analyzing, and summarizing news across various topics.',
-            llm=llm,
+            llm=get_agent_llm("news"),
             tools=[self.news_search_tool],
-            verbose=True,
+            verbose=crew_verbose(),
             allow_delegation=False
         )
 
@@ -151,15 +226,18 @@ class UnifiedSearchAgents:
             role='Research Specialist',
             goal='Find accurate information for general queries',
             backstory='Meticulous researcher with experience in finding reliable information across various domains.',
-            llm=llm,
+            llm=get_agent_llm("general"),
             tools=[self.web_search_tool],
-            verbose=True,
+            verbose=crew_verbose(),
             allow_delegation=False
         )
 
 # ----------------- Main Execution -----------------
 
 if __name__ == '__main__':
+    from dotenv import load_dotenv
+    load_dotenv("keys.env")
+
     # Replace with your actual API keys/tokens
     TMDB_API_KEY = "your_tmdb_api_key"
     TMDB_TOKEN = "your_tmdb_token"
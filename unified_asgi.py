@@ -0,0 +1,133 @@
+"""
+Async (ASGI) serving mode for the search API.
+
+Same routes and JSON contracts as unified_main.py, served from an event loop. Cached
+answers, coalesced duplicates and direct-mode TMDB/iTunes searches are awaited
+without taking a thread. Agent searches still run crewai's synchronous agent loop on
+a thread pool, so in-flight agent searches per worker are capped at
+CREW_EXECUTOR_WORKERS (default 128), the same as Flask with that many threads.
+Run with any ASGI server, e.g.:
+
+    hypercorn unified_asgi:app --bind 0.0.0.0:8000 --workers 2
+    uvicorn unified_asgi:app --workers 2
+"""
+import asyncio
+
+from quart import Quart, Response, g, render_template, request, jsonify
+from unified_main import extract_content_from_crew_output, get_crew_manager, timings_requested
+from http_client import get_async_http_client
+from metrics import render_metrics, span, track_stages
+from tracing import begin_trace, current_trace_id, end_trace
+
+
+app = Quart(__name__)
+
+
+@app.before_serving
+async def build_crew_manager():
+    """Build the crew (crewai import, agents, SQLite caches) off the event loop before taking requests"""
+    await asyncio.to_thread(get_crew_manager)
+
+
+@app.after_serving
+async def close_http_client():
+    """Close the pooled async connections on shutdown"""
+    await get_async_http_client().aclose()
+
+
+@app.before_request
+async def start_request_trace():
+    """Run each request in a trace, continuing the caller's X-Trace-Id when given"""
+    g.trace_token = begin_trace(request.headers.get("X-Trace-Id"))
+
+
+@app.after_request
+async def add_trace_header(response):
+    trace_id = current_trace_id()
+    if trace_id:
+        response.headers["X-Trace-Id"] = trace_id
+    return response
+
+
+@app.teardown_request
+async def end_request_trace(error=None):
+    token = g.pop("trace_token", None)
+    if token is not None:
+        end_trace(token)
+
+
+async def _handle(search, query_type, empty_message, include_cached=False, endpoint=None):
+    """Shared request handling for the search endpoints; search(user_input, data) is awaited"""
+    data = await request.get_json() or {}
+    user_input = data.get("user_input", "")
+
+    if not user_input:
+        return jsonify({"error": empty_message})
+
+    try:
+        with track_stages() as timings, span("request", endpoint=endpoint or query_type):
+            result = await search(user_input, data)
+            content = extract_content_from_crew_output(result)
+        response = {
+            "type": query_type,
+            "content": content
+        }
+        if include_cached:
+            response["cached"] = result.get("cached", False)
+        if timings_requested(data):
+            response["timings"] = timings.to_dict()
+        return jsonify(response)
+    except Exception as e:
+        return jsonify({"error": f"An error occurred: {str(e)}"})
+
+
+@app.route("/", methods=["GET"])
+async def index():
+    """Render the main page"""
+    return await render_template("index.html")
+
+
+@app.route("/api/search", methods=["POST"])
+async def api_search():
+    """Process search query and return results"""
+    return await _handle(lambda user_input, data: get_crew_manager().arun(user_input, bypass_cache=bool(data.get("bypass_cache")),
+                                                                     multi=data.get("multi")),
+                         "general", "Please provide a search query", include_cached=True, endpoint="search")
+
+
+@app.route("/api/movie", methods=["POST"])
+async def api_movie():
+    """Search for movies"""
+    return await _handle(lambda user_input, data: get_crew_manager().arun_movie_search(user_input),
+                         "movie", "Please provide a movie search query")
+
+
+@app.route("/api/music", methods=["POST"])
+async def api_music():
+    """Search for music"""
+    return await _handle(lambda user_input, data: get_crew_manager().arun_music_search(user_input),
+                         "music", "Please provide a music search query")
+
+
+@app.route("/api/news", methods=["POST"])
+async def api_news():
+    """Search for news"""
+    return await _handle(lambda user_input, data: get_crew_manager().arun_news_search(user_input),
+                         "news", "Please provide a news search query")
+
+
+@app.route("/api/general", methods=["POST"])
+async def api_general():
+    """General web search"""
+    return await _handle(lambda user_input, data: get_crew_manager().arun_general_search(user_input),
+                         "general", "Please provide a search query")
+
+
+@app.route("/metrics", methods=["GET"])
+async def api_metrics():
+    """Per-stage latency histograms in the Prometheus text format"""
+    return Response(render_metrics(), mimetype="text/plain; version=0.0.4")
+
+
+if __name__ == "__main__":
+    app.run(debug=True, use_reloader=False)
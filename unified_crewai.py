@@ -1,196 +1,288 @@
 from crewai import Crew
 from unified_agents import UnifiedSearchAgents
 from unified_tasks import UnifiedSearchTasks
+from answer_cache import AnswerCache, answer_text
+from response_cache import make_cache_key
+from singleflight import SingleFlight
+from api_tools import TMDBMovieTools, ITunesMusicTools
+from result_renderers import render_movies, render_songs
+from search_events import emit_event
+from query_engine import analyze_query, parse_movie, parse_music, parse_news
+from intent_model import get_intent_model
+from rate_limit import BATCH, request_priority
+from prompt_budget import track_tokens
+from metrics import span, timed
+from tracing import crew_verbose, start_trace, trace_error, trace_event
+from records import is_error
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError, as_completed
+import asyncio
+import contextvars
 import json
-import re
+import os
+import queue
+import time
+
+
+class SearchPipeline:
+    """Pool of pre-built crews for one query type
+
+    Each kickoff checks a crew out of the pool, so concurrent requests never share
+    task state; a new crew is only built when every pooled one is busy.
+    """
+
+    def __init__(self, build_crew, prebuild=1, max_idle=8, name=None):
+        self._build_crew = build_crew
+        self.name = name
+        self._idle = queue.LifoQueue(maxsize=max_idle)
+        self.built = 0
+        for _ in range(prebuild):
+            self._idle.put_nowait(self._new_crew())
+
+    def _new_crew(self):
+        self.built += 1
+        with span("crew_build", query_type=self.name):
+            return self._build_crew()
+
+    def kickoff(self, inputs):
+        """Run a pooled crew with the given task template inputs"""
+        try:
+            crew = self._idle.get_nowait()
+        except queue.Empty:
+            crew = self._new_crew()
+        try:
+            with span("kickoff", query_type=self.name):
+                return crew.kickoff(inputs=inputs)
+        finally:
+            try:
+                self._idle.put_nowait(crew)
+            except queue.Full:
+                pass
+
+
+# Section headings used when several verticals answer one query
+SECTION_TITLES = {"movie": "Movies", "music": "Music", "news": "News", "general": "Web Results"}
+
 
 class UnifiedSearchCrew:
-    def __init__(self, tmdb_api_key, tmdb_token, serp_api_key):
+    def __init__(self, tmdb_api_key, tmdb_token, serp_api_key, answer_cache=None, direct_mode=None,
+                 single_flight=None, intent_model=None, multi_mode=None, prebuild_crews=None):
         self.agents = UnifiedSearchAgents(tmdb_api_key, tmdb_token, serp_api_key)
         self.tasks = UnifiedSearchTasks()
+        # Final answers keyed on query type + parsed criteria, so repeat questions skip the LLM
+        self.answer_cache = answer_cache or AnswerCache.from_env()
+        # Coalesces identical in-flight searches (and across workers when SINGLE_FLIGHT_LOCK_DIR is set)
+        self.single_flight = single_flight or SingleFlight.from_env()
+        
+        # Query routing backend: "keyword" rules (default) or the trained intent model
+        if intent_model is None and os.getenv("QUERY_CLASSIFIER", "keyword").lower() == "model":
+            intent_model = get_intent_model()
+        self.intent_model = intent_model
+        self.intent_min_confidence = float(os.getenv("INTENT_MIN_CONFIDENCE", 0.6))
+        
+        # Ambiguous queries search every matching vertical concurrently and merge the answers
+        if multi_mode is None:
+            multi_mode = os.getenv("SEARCH_MULTI_MODE", "0").lower() in ("1", "true", "yes")
+        self.multi_mode = multi_mode
+        self.branch_timeout = float(os.getenv("MULTI_SEARCH_TIMEOUT", 60))
         
         # API keys and tokens for direct usage
         self.tmdb_api_key = tmdb_api_key
         self.tmdb_token = tmdb_token
         self.serp_api_key = serp_api_key
+        
+        # Optional direct (LLM-free) path for fully structured movie/music queries
+        if direct_mode is None:
+            direct_mode = os.getenv("SEARCH_DIRECT_MODE", "0").lower() in ("1", "true", "yes")
+        self.direct_mode = direct_mode
+        self.movie_tools = TMDBMovieTools(tmdb_api_key, tmdb_token)
+        self.music_tools = ITunesMusicTools()
+        # Thread pool for agent runs started from the async API, created on first use
+        self._executor = None
+        if os.getenv("TMDB_GENRE_SNAPSHOT"):
+            self.movie_tools.warm_genre_cache(os.getenv("TMDB_GENRE_SNAPSHOT"))
+        
+        # One reusable agent/task/crew pipeline per query type, built once instead of per request.
+        # Crews are built on each type's first request unless SEARCH_PREBUILD_CREWS asks for them
+        # up front (useful with gunicorn --preload, where the build happens once before forking)
+        if prebuild_crews is None:
+            prebuild_crews = int(os.getenv("SEARCH_PREBUILD_CREWS", 0))
+        self.pipelines = {
+            "movie": SearchPipeline(lambda: self._build_crew(self.agents.create_movie_agent, self.tasks.movie_search_task),
+                                    prebuild=prebuild_crews, name="movie"),
+            "music": SearchPipeline(lambda: self._build_crew(self.agents.create_music_agent, self.tasks.music_search_task),
+                                    prebuild=prebuild_crews, name="music"),
+            "news": SearchPipeline(lambda: self._build_crew(self.agents.create_news_agent, self.tasks.news_search_task),
+                                   prebuild=prebuild_crews, name="news"),
+            "general": SearchPipeline(lambda: self._build_crew(self.agents.create_search_agent, self.tasks.general_search_task),
+                                      prebuild=prebuild_crews, name="general"),
+        }
+
+    def _build_crew(self, create_agent, create_task):
+        """Build a single-agent crew whose task keeps its template placeholders"""
+        agent = create_agent()
+        return Crew(
+            agents=[agent],
+            tasks=[create_task(agent)],
+            verbose=crew_verbose()
+        )
+
+    def _kickoff(self, query_type, inputs):
+        """Run the query type's pooled crew, logging the tokens its LLM calls used (see prompt_budget.track_tokens)"""
+        with track_tokens() as usage:
+            result = self.pipelines[query_type].kickoff(inputs)
+        trace_event("tokens", query_type=query_type, **usage)
+        return result, usage
 
     def determine_query_type(self, user_input):
         """Determine the type of query based on user input"""
-        # Movie patterns
-        movie_keywords = ["movie", "film", "director", "actor", "actress", "genre", "rating", "imdb", "cinema"]
-        
-        # Music patterns
-        music_keywords = ["song", "music", "artist", "singer", "album", "track", "playlist", "band", "listen"]
-        
-        # News patterns
-        news_keywords = ["news", "latest", "update", "headline", "report", "article", "journalist", "current events"]
-        
-        # Count keyword occurrences
-        movie_count = sum(1 for keyword in movie_keywords if keyword.lower() in user_input.lower())
-        music_count = sum(1 for keyword in music_keywords if keyword.lower() in user_input.lower())
-        news_count = sum(1 for keyword in news_keywords if keyword.lower() in user_input.lower())
-        
-        # Determine primary search type
-        if "news" in user_input.lower() or news_count > max(movie_count, music_count):
-            return "news"
-        elif any(term in user_input.lower() for term in ["song", "music", "artist", "singer"]) or music_count > movie_count:
-            return "music"
-        elif any(term in user_input.lower() for term in ["movie", "film", "director", "actor"]) or movie_count > 0:
-            return "movie"
-        else:
-            return "general"
+        query_type, _ = self.classify_query(user_input)
+        return query_type
+
+    @timed("classify")
+    def classify_query(self, user_input):
+        """Return (query_type, confidence); keyword routing always reports full confidence"""
+        if self.intent_model is not None:
+            prediction = self.intent_model.predict(user_input)
+            return prediction.label, prediction.confidence
+        return analyze_query(user_input).query_type, 1.0
+
+    def candidate_query_types(self, user_input):
+        """Query types worth searching: the top type, or several when the intent model is unsure"""
+        if self.intent_model is not None:
+            return self.intent_model.candidates(user_input, min_confidence=self.intent_min_confidence)
+        return (analyze_query(user_input).query_type,)
 
     def parse_movie_query(self, user_input):
         """Extract movie search criteria from user input"""
-        # Patterns for different search criteria
-        genre_pattern = r"(comedy|sci-fi|horror|action|drama|romance|thriller|adventure|fantasy|animation|documentary|musical|western|crime|mystery|biography|family|war|history|sport)"
-        count_pattern = r"(?:top|best)\s+(\d+)"
-        actor_pattern = r"(?:actor|star|starring|with|of)\s+([A-Z][a-z]+(?:\s+[A-Z][a-z]+){0,2})"
-        year_pattern = r"(?:from|in|year)\s+(\d{4})"
-        director_pattern = r"(?:direct(?:ed|or)|by director)\s+([A-Z][a-z]+(?:\s+[A-Z][a-z]+){0,2})"
-        rating_pattern = r"(?:rating|rated)\s+(?:above|over|higher than)\s+(\d(?:\.\d)?)"
-        
-        # Extract search parameters
-        genre_match = re.search(genre_pattern, user_input, re.IGNORECASE)
-        count_match = re.search(count_pattern, user_input, re.IGNORECASE)
-        actor_match = re.search(actor_pattern, user_input, re.IGNORECASE)
-        year_match = re.search(year_pattern, user_input)
-        director_match = re.search(director_pattern, user_input, re.IGNORECASE)
-        rating_match = re.search(rating_pattern, user_input, re.IGNORECASE)
-        
-        # Build search criteria dictionary
-        search_criteria = {}
-        
-        if genre_match:
-            search_criteria['genre'] = genre_match.group(1).lower()
-        
-        # Default count to 5 if not specified
-        count = int(count_match.group(1)) if count_match else 5
-        
-        if actor_match:
-            search_criteria['actor'] = actor_match.group(1)
-        
-        if year_match:
-            search_criteria['year'] = year_match.group(1)
-        
-        if director_match:
-            search_criteria['director'] = director_match.group(1)
-        
-        if rating_match:
-            search_criteria['min_rating'] = float(rating_match.group(1))
-        
-        # Handle direct name searches without keywords (assumes first capitalized name is an actor)
-        if not any(key in search_criteria for key in ['genre', 'actor', 'director']):
-            name_pattern = r"\b([A-Z][a-z]+(?:\s+[A-Z][a-z]+){0,2})\b"
-            name_matches = re.findall(name_pattern, user_input)
-            if name_matches:
-                # Assume first name is an actor if no other context
-                search_criteria['actor'] = name_matches[0]
-        
+        search_criteria, count, _ = self._parse_movie_query(user_input)
         return search_criteria, count
 
+    @timed("parse", query_type="movie")
+    def _parse_movie_query(self, user_input):
+        """Extract movie search criteria, count, and whether explicit patterns (not name guessing) resolved them"""
+        parsed = analyze_query(user_input)
+        if parsed.query_type == "movie":
+            return parsed.search_criteria, parsed.count, parsed.resolved
+        return parse_movie(user_input)
+
     def parse_music_query(self, user_input):
         """Extract music search criteria from user input"""
-        # Patterns for different search criteria
-        genre_pattern = r"(pop|rock|hip hop|rap|jazz|blues|country|classical|electronic|reggae|folk|metal|punk|r&b|soul|disco|indie|alternative|punjabi|hindi)"
-        count_pattern = r"(?:top|best)\s+(\d+)"
-        artist_pattern = r"(?:artist|singer|by|of)\s+([A-Z][a-z]+(?:\s+[A-Z][a-z]+){0,2})"
-        term_pattern = r"(?:about|related to|on)\s+([a-zA-Z]+(?:\s+[a-zA-Z]+){0,2})"
-        
-        # Extract search parameters
-        genre_match = re.search(genre_pattern, user_input, re.IGNORECASE)
-        count_match = re.search(count_pattern, user_input, re.IGNORECASE)
-        artist_match = re.search(artist_pattern, user_input, re.IGNORECASE)
-        term_match = re.search(term_pattern, user_input, re.IGNORECASE)
-        
-        # Build search criteria dictionary
-        search_criteria = {}
-        
-        if genre_match:
-            search_criteria['genre'] = genre_match.group(1).lower()
-        
-        # Default count to 5 if not specified
-        count = int(count_match.group(1)) if count_match else 5
-        
-        if artist_match:
-            search_criteria['artist'] = artist_match.group(1)
-        
-        if term_match:
-            search_criteria['term'] = term_match.group(1)
-        
-        # Handle direct searches for artist names
-        if not search_criteria:
-            name_pattern = r"\b([A-Z][a-z]+(?:\s+[A-Z][a-z]+){0,2})\b"
-            name_matches = re.findall(name_pattern, user_input)
-            if name_matches:
-                search_criteria['artist'] = name_matches[0]
-                
-        # If no specific criteria found, use the whole query as a general search term
-        if not search_criteria:
-            search_criteria['term'] = user_input
-        
+        search_criteria, count, _ = self._parse_music_query(user_input)
         return search_criteria, count
 
+    @timed("parse", query_type="music")
+    def _parse_music_query(self, user_input):
+        """Extract music search criteria, count, and whether explicit patterns (not fallbacks) resolved them"""
+        parsed = analyze_query(user_input)
+        if parsed.query_type == "music":
+            return parsed.search_criteria, parsed.count, parsed.resolved
+        return parse_music(user_input)
+
+    @timed("parse", query_type="news")
     def parse_news_query(self, user_input):
         """Extract news search query from user input"""
-        # Extract count if specified
-        count_pattern = r"(?:top|latest|recent)\s+(\d+)"
-        count_match = re.search(count_pattern, user_input, re.IGNORECASE)
-        count = int(count_match.group(1)) if count_match else 5
-        
-        # Remove common prefixes to get the actual search topic
-        prefixes = [
-            r"^(?:get|find|show|tell me about|search for|what's new in|latest news on|updates on|news about)\s+",
-            r"^(?:the latest|recent|current)\s+(?:news|updates|articles|stories|reports)\s+(?:about|on|regarding|concerning)\s+"
-        ]
-        
-        cleaned_query = user_input
-        for prefix in prefixes:
-            cleaned_query = re.sub(prefix, "", cleaned_query, flags=re.IGNORECASE)
-        
-        return cleaned_query, count
+        parsed = analyze_query(user_input)
+        if parsed.query_type == "news":
+            return parsed.search_query, parsed.count
+        return parse_news(user_input)
 
-    def run(self, user_input):
+    def run(self, user_input, bypass_cache=False, multi=None):
         """Process user input and execute appropriate search"""
         # Determine the type of query
-        query_type = self.determine_query_type(user_input)
+        query_type, confidence = self.classify_query(user_input)
+        emit_event("query_type", {"type": query_type, "confidence": confidence})
+        
+        # Queries matching several verticals can search them all at once
+        if self.multi_mode if multi is None else multi:
+            query_types = self.ambiguous_query_types(user_input, query_type)
+            if len(query_types) > 1:
+                return self.run_multi(user_input, query_types, bypass_cache)
+        
+        return self._run_query_type(query_type, user_input, bypass_cache)
+    
+    def _run_query_type(self, query_type, user_input, bypass_cache=False):
+        """Answer an already-classified query from the cache or a (coalesced) search"""
+        # Serve repeat and near-duplicate questions from the answer cache
+        cache_params = self.answer_cache_params(query_type, user_input)
+        cached = self.answer_cache.get(query_type, cache_params, user_input, bypass=bypass_cache)
+        if cached is not None:
+            cached["cached"] = True
+            return cached
+        
+        # Identical concurrent searches share one execution
+        result, shared = self.single_flight.do(
+            self._flight_key(query_type, cache_params, bypass_cache),
+            lambda: self._execute_search(query_type, user_input, cache_params, bypass_cache)
+        )
+        if shared:
+            result["coalesced"] = True
+        return result
+    
+    def _flight_key(self, query_type, cache_params, bypass_cache):
+        return make_cache_key(f"flight_{query_type}", dict(cache_params, bypass_cache=bypass_cache))
+    
+    def _execute_search(self, query_type, user_input, cache_params, bypass_cache):
+        """Run the search for an already-classified query and cache the answer"""
+        # With cross-worker locking another worker may have just finished this query
+        if self.single_flight.lock_dir:
+            cached = self.answer_cache.get(query_type, cache_params, user_input, bypass=bypass_cache)
+            if cached is not None:
+                cached["cached"] = True
+                return cached
+        
+        if query_type == "movie":
+            result = self.run_movie_search(user_input)
+        elif query_type == "music":
+            result = self.run_music_search(user_input)
+        elif query_type == "news":
+            result = self.run_news_search(user_input)
+        else:
+            result = self.run_general_search(user_input)
         
+        if not bypass_cache:
+            self.answer_cache.set(query_type, cache_params, result, user_input)
+        result["cached"] = False
+        return result
+    
+    def answer_cache_params(self, query_type, user_input):
+        """Build the answer-cache key from the parsed criteria for the query type"""
         if query_type == "movie":
-            return self.run_movie_search(user_input)
+            search_criteria, count = self.parse_movie_query(user_input)
+            return self.answer_cache.make_params(query_type, search_criteria, count)
         elif query_type == "music":
-            return self.run_music_search(user_input)
+            search_criteria, count = self.parse_music_query(user_input)
+            return self.answer_cache.make_params(query_type, search_criteria, count)
         elif query_type == "news":
-            return self.run_news_search(user_input)
+            search_query, count = self.parse_news_query(user_input)
+            return self.answer_cache.make_params(query_type, search_query, count)
         else:
-            return self.run_general_search(user_input)
+            return self.answer_cache.make_params(query_type, user_input)
     
     def run_movie_search(self, user_input):
         """Run a movie search based on user input"""
         # Parse movie search criteria
-        search_criteria, count = self.parse_movie_query(user_input)
-        
-        # Create movie agent
-        movie_agent = self.agents.create_movie_agent()
+        search_criteria, count, resolved = self._parse_movie_query(user_input)
         
-        # Create task
-        movie_task = self.tasks.movie_search_task(movie_agent, search_criteria, count)
+        # Fully resolved queries go straight to TMDB; the agent is the fallback
+        if self.direct_mode and resolved:
+            direct_result = self.direct_movie_search(search_criteria, count)
+            if direct_result is not None:
+                return direct_result
         
-        # Create crew
-        crew = Crew(
-            agents=[movie_agent],
-            tasks=[movie_task],
-            verbose=True
-        )
-        
-        # Run the crew
+        return self._movie_agent_search(search_criteria, count)
+    
+    def _movie_agent_search(self, search_criteria, count):
+        """Run the movie agent for already-parsed criteria"""
+        # Run the pre-built movie crew with this request's task inputs
         try:
-            result = crew.kickoff()
+            result, usage = self._kickoff("movie", self.tasks.movie_search_inputs(search_criteria, count))
             # The result here is a CrewOutput object, which isn't JSON serializable
             # But we'll handle the conversion in the API endpoint
             return {
                 "type": "movie", 
                 "result": result,  # This will be processed by extract_content_from_crew_output
-                "search_criteria": search_criteria
+                "search_criteria": search_criteria,
+                "token_usage": usage
             }
         except Exception as e:
             return {"type": "movie", "error": str(e), "search_criteria": search_criteria}
@@ -198,71 +290,332 @@ class UnifiedSearchCrew:
     def run_music_search(self, user_input):
         """Run a music search based on user input"""
         # Parse music search criteria
-        search_criteria, count = self.parse_music_query(user_input)
+        search_criteria, count, resolved = self._parse_music_query(user_input)
         
-        # Create music agent
-        music_agent = self.agents.create_music_agent()
+        # Fully resolved queries go straight to iTunes; the agent is the fallback
+        if self.direct_mode and resolved:
+            direct_result = self.direct_music_search(search_criteria, count)
+            if direct_result is not None:
+                return direct_result
         
-        # Create task
-        music_task = self.tasks.music_search_task(music_agent, search_criteria, count)
-        
-        # Create crew
-        crew = Crew(
-            agents=[music_agent],
-            tasks=[music_task],
-            verbose=True
-        )
-        
-        # Run the crew
+        return self._music_agent_search(search_criteria, count)
+    
+    def _music_agent_search(self, search_criteria, count):
+        """Run the music agent for already-parsed criteria"""
+        # Run the pre-built music crew with this request's task inputs
         try:
-            result = crew.kickoff()
-            return {"type": "music", "result": result, "search_criteria": search_criteria}
+            result, usage = self._kickoff("music", self.tasks.music_search_inputs(search_criteria, count))
+            return {"type": "music", "result": result, "search_criteria": search_criteria, "token_usage": usage}
         except Exception as e:
             return {"type": "music", "error": str(e), "search_criteria": search_criteria}
     
+    def direct_movie_search(self, search_criteria, count):
+        """Answer a movie query from TMDB without the LLM; returns None if TMDB has no usable results"""
+        movies = self.movie_tools.search_movies(search_criteria, count)
+        return self._direct_result("movie", movies, search_criteria)
+    
+    def direct_music_search(self, search_criteria, count):
+        """Answer a music query from iTunes without the LLM; returns None if iTunes has no usable results"""
+        songs = self.music_tools.search_music(search_criteria, count)
+        return self._direct_result("music", songs, search_criteria)
+    
+    def _direct_result(self, query_type, items, search_criteria):
+        """Render direct provider results, or None when there is nothing usable"""
+        items = [item for item in items if not is_error(item)]
+        if not items:
+            return None
+        emit_event("tool_result", {"tool": "tmdb" if query_type == "movie" else "itunes", "result": items})
+        return {
+            "type": query_type,
+            "result": render_movies(items) if query_type == "movie" else render_songs(items),
+            "search_criteria": search_criteria,
+            "source": "direct"
+        }
+    
     def run_news_search(self, user_input):
         """Run a news search based on user input"""
         # Parse news search query
         search_query, count = self.parse_news_query(user_input)
         
-        # Create news agent
-        news_agent = self.agents.create_news_agent()
-        
-        # Create task
-        news_task = self.tasks.news_search_task(news_agent, search_query, count)
-        
-        # Create crew
-        crew = Crew(
-            agents=[news_agent],
-            tasks=[news_task],
-            verbose=True
-        )
-        
-        # Run the crew
+        # Run the pre-built news crew with this request's task inputs
         try:
-            result = crew.kickoff()
-            return {"type": "news", "result": result, "search_query": search_query}
+            result, usage = self._kickoff("news", self.tasks.news_search_inputs(search_query, count))
+            return {"type": "news", "result": result, "search_query": search_query, "token_usage": usage}
         except Exception as e:
             return {"type": "news", "error": str(e), "search_query": search_query}
     
     def run_general_search(self, user_input):
         """Run a general web search based on user input"""
-        # Create search agent
-        search_agent = self.agents.create_search_agent()
+        # Run the pre-built search crew with this request's task inputs
+        try:
+            result, usage = self._kickoff("general", self.tasks.general_search_inputs(user_input))
+            return {"type": "general", "result": result, "query": user_input, "token_usage": usage}
+        except Exception as e:
+            return {"type": "general", "error": str(e), "query": user_input}
+
+    # ----------------- Multi-vertical search -----------------
+
+    def ambiguous_query_types(self, user_input, query_type=None):
+        """
+        Every vertical the query plausibly belongs to, primary type first
+
+        With the intent model these are its low-confidence candidates; with keyword
+        routing, every vertical with at least one keyword hit.
+        """
+        if self.intent_model is not None:
+            query_types = self.candidate_query_types(user_input)
+        else:
+            query_types = analyze_query(user_input).matched_types
         
-        # Create task
-        search_task = self.tasks.general_search_task(search_agent, user_input)
+        query_type = query_type or self.determine_query_type(user_input)
+        return (query_type,) + tuple(t for t in query_types if t != query_type)
+    
+    def branch_timeout_for(self, query_type):
+        """Per-vertical timeout (MULTI_SEARCH_TIMEOUT_<TYPE>, else MULTI_SEARCH_TIMEOUT)"""
+        return float(os.getenv(f"MULTI_SEARCH_TIMEOUT_{query_type.upper()}", self.branch_timeout))
+    
+    def run_multi(self, user_input, query_types=None, bypass_cache=False):
+        """
+        Search several verticals concurrently and merge their answers
+        
+        Args:
+            user_input: The search query
+            query_types: Verticals to search (defaults to ambiguous_query_types)
+            bypass_cache: Skip the answer cache for every branch
+        
+        Returns:
+            A merged result; branches that time out or fail are reported in "branches"
+            and left out of the answer
+        """
+        query_types = query_types or self.ambiguous_query_types(user_input)
+        executor = self._get_executor()
+        
+        # Each branch gets its own copy of the context so streaming events still reach the request
+        started = time.monotonic()
+        futures = {
+            query_type: executor.submit(contextvars.copy_context().run,
+                                        self._run_query_type, query_type, user_input, bypass_cache)
+            for query_type in query_types
+        }
+        
+        outcomes = []
+        for query_type, future in futures.items():
+            remaining = started + self.branch_timeout_for(query_type) - time.monotonic()
+            try:
+                outcomes.append((query_type, future.result(timeout=max(remaining, 0))))
+            except FutureTimeoutError:
+                # The branch keeps running in the pool and still fills the caches when it finishes
+                outcomes.append((query_type, {"type": query_type, "error": "timed out", "timed_out": True}))
+            except Exception as e:
+                outcomes.append((query_type, {"type": query_type, "error": str(e)}))
+        
+        return self.merge_results(outcomes)
+    
+    def merge_results(self, outcomes):
+        """Combine (query_type, result) pairs into one multi-vertical result"""
+        sections = []
+        branches = {}
+        for query_type, result in outcomes:
+            if "error" in result and "result" not in result:
+                status = "timeout" if result.get("timed_out") else "error"
+                branches[query_type] = {"status": status, "error": result["error"]}
+                continue
+            branches[query_type] = {"status": "ok", "cached": result.get("cached", False)}
+            sections.append(f"## {SECTION_TITLES.get(query_type, query_type.title())}\n\n{answer_text(result)}")
+        
+        merged = {
+            "type": "multi",
+            "types": [query_type for query_type, _ in outcomes],
+            "branches": branches,
+            "partial": len(sections) < len(outcomes),
+            "cached": bool(sections) and all(b.get("cached") for b in branches.values())
+        }
+        if sections:
+            merged["result"] = "\n\n".join(sections)
+        else:
+            merged["error"] = "; ".join(f"{t}: {b['error']}" for t, b in branches.items())
+        return merged
+
+    # ----------------- Batch search -----------------
+
+    def run_batch(self, queries, max_concurrency=None, bypass_cache=False):
+        """
+        Run many queries with bounded concurrency, yielding each answer as it completes
+        
+        Duplicate queries (ignoring surrounding and repeated whitespace) run once. Unique
+        queries are classified up front and submitted grouped by type, so each type's
+        pooled crews are reused back to back.
+        
+        Args:
+            queries: List of query strings
+            max_concurrency: Searches running at once (default BATCH_MAX_CONCURRENCY, 8)
+            bypass_cache: Skip the answer cache
+        
+        Yields:
+            Dicts with the query, the input positions it answers ("indices"), its type,
+            the search result, the elapsed milliseconds and the query's trace ID
+        """
+        if max_concurrency is None:
+            max_concurrency = int(os.getenv("BATCH_MAX_CONCURRENCY", 8))
+        
+        # De-duplicate, remembering every position each query came from
+        unique = {}
+        for index, query in enumerate(queries):
+            key = " ".join(query.split())
+            if key:
+                unique.setdefault(key, []).append(index)
+        
+        groups = {}
+        for query in unique:
+            groups.setdefault(self.determine_query_type(query), []).append(query)
+        
+        def timed_search(query_type, query):
+            started = time.perf_counter()
+            # Each batch query is traced on its own, like an API request
+            with start_trace() as trace:
+                try:
+                    # Batch work queues behind interactive requests for provider rate limits
+                    with request_priority(BATCH), span("request", endpoint="batch"):
+                        result = self._run_query_type(query_type, query, bypass_cache)
+                except Exception as e:
+                    trace_error("batch", e, query_type=query_type)
+                    result = {"type": query_type, "error": str(e)}
+            return result, (time.perf_counter() - started) * 1000, trace.trace_id
+        
+        executor = ThreadPoolExecutor(max_workers=max(1, max_concurrency), thread_name_prefix="batch")
+        try:
+            futures = {
+                executor.submit(timed_search, query_type, query): (query_type, query)
+                for query_type, group in groups.items()
+                for query in group
+            }
+            for future in as_completed(futures):
+                query_type, query = futures[future]
+                result, elapsed_ms, trace_id = future.result()
+                yield {
+                    "query": query,
+                    "indices": unique[query],
+                    "type": query_type,
+                    "result": result,
+                    "elapsed_ms": round(elapsed_ms, 1),
+                    "trace_id": trace_id
+                }
+        finally:
+            # Stop queued searches if the consumer goes away early
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    # ----------------- Async variants -----------------
+    # Used by the ASGI app (unified_asgi.py). Answer-cache lookups, single-flight
+    # coalescing and the direct (SEARCH_DIRECT_MODE) TMDB/iTunes calls are awaited.
+    # Every agent search, which covers all news and general queries and movie/music
+    # queries outside direct mode, runs crewai's synchronous agent loop (tools and LLM
+    # calls included) on a thread from this pool. Concurrent agent searches per
+    # process are therefore capped at CREW_EXECUTOR_WORKERS, as with threaded Flask.
+
+    def _get_executor(self):
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=int(os.getenv("CREW_EXECUTOR_WORKERS", 128)),
+                thread_name_prefix="crew"
+            )
+        return self._executor
+
+    async def _in_executor(self, fn, *args):
+        loop = asyncio.get_running_loop()
+        # Run in a copy of the request's context so its stage timings and events see the agent run
+        return await loop.run_in_executor(self._get_executor(), contextvars.copy_context().run, fn, *args)
+
+    async def arun(self, user_input, bypass_cache=False, multi=None):
+        """Async variant of run"""
+        query_type = self.determine_query_type(user_input)
         
-        # Create crew
-        crew = Crew(
-            agents=[search_agent],
-            tasks=[search_task],
-            verbose=True
+        if self.multi_mode if multi is None else multi:
+            query_types = self.ambiguous_query_types(user_input, query_type)
+            if len(query_types) > 1:
+                return await self.arun_multi(user_input, query_types, bypass_cache)
+        
+        return await self._arun_query_type(query_type, user_input, bypass_cache)
+
+    async def _arun_query_type(self, query_type, user_input, bypass_cache=False):
+        """Async variant of _run_query_type"""
+        cache_params = self.answer_cache_params(query_type, user_input)
+        cached = await self.answer_cache.aget(query_type, cache_params, user_input, bypass=bypass_cache)
+        if cached is not None:
+            cached["cached"] = True
+            return cached
+        
+        result, shared = await self.single_flight.ado(
+            self._flight_key(query_type, cache_params, bypass_cache),
+            lambda: self._aexecute_search(query_type, user_input, cache_params, bypass_cache)
         )
+        if shared:
+            result["coalesced"] = True
+        return result
+
+    async def arun_multi(self, user_input, query_types=None, bypass_cache=False):
+        """Async variant of run_multi"""
+        query_types = query_types or self.ambiguous_query_types(user_input)
+        
+        async def branch(query_type):
+            try:
+                result = await asyncio.wait_for(self._arun_query_type(query_type, user_input, bypass_cache),
+                                                timeout=self.branch_timeout_for(query_type))
+            except asyncio.TimeoutError:
+                result = {"type": query_type, "error": "timed out", "timed_out": True}
+            except Exception as e:
+                result = {"type": query_type, "error": str(e)}
+            return query_type, result
+        
+        outcomes = await asyncio.gather(*(branch(query_type) for query_type in query_types))
+        return self.merge_results(outcomes)
+
+    async def _aexecute_search(self, query_type, user_input, cache_params, bypass_cache):
+        """Async variant of _execute_search"""
+        # With cross-worker locking another worker may have just finished this query
+        if self.single_flight.lock_dir:
+            cached = await self.answer_cache.aget(query_type, cache_params, user_input, bypass=bypass_cache)
+            if cached is not None:
+                cached["cached"] = True
+                return cached
         
-        # Run the crew
-        try:
-            result = crew.kickoff()
-            return {"type": "general", "result": result, "query": user_input}
-        except Exception as e:
-            return {"type": "general", "error": str(e), "query": user_input}
\ No newline at end of file
+        if query_type == "movie":
+            result = await self.arun_movie_search(user_input)
+        elif query_type == "music":
+            result = await self.arun_music_search(user_input)
+        elif query_type == "news":
+            result = await self.arun_news_search(user_input)
+        else:
+            result = await self.arun_general_search(user_input)
+        
+        if not bypass_cache:
+            await self.answer_cache.aset(query_type, cache_params, result, user_input)
+        result["cached"] = False
+        return result
+
+    async def arun_movie_search(self, user_input):
+        """Async variant of run_movie_search"""
+        search_criteria, count, resolved = self._parse_movie_query(user_input)
+        if self.direct_mode and resolved:
+            movies = await self.movie_tools.asearch_movies(search_criteria, count)
+            direct_result = self._direct_result("movie", movies, search_criteria)
+            if direct_result is not None:
+                return direct_result
+        return await self._in_executor(self._movie_agent_search, search_criteria, count)
+
+    async def arun_music_search(self, user_input):
+        """Async variant of run_music_search"""
+        search_criteria, count, resolved = self._parse_music_query(user_input)
+        if self.direct_mode and resolved:
+            songs = await self.music_tools.asearch_music(search_criteria, count)
+            direct_result = self._direct_result("music", songs, search_criteria)
+            if direct_result is not None:
+                return direct_result
+        return await self._in_executor(self._music_agent_search, search_criteria, count)
+
+    async def arun_news_search(self, user_input):
+        """Async variant of run_news_search; the agent run takes a pool thread"""
+        return await self._in_executor(self.run_news_search, user_input)
+
+    async def arun_general_search(self, user_input):
+        """Async variant of run_general_search; the agent run takes a pool thread"""
+        return await self._in_executor(self.run_general_search, user_input)
@@ -1,8 +1,13 @@
-from flask import Flask, render_template, request, jsonify
-from unified_crewai import UnifiedSearchCrew
+from flask import Flask, g, render_template, request, jsonify, Response, stream_with_context
+from search_events import emit_event, stream_search
+from rate_limit import get_rate_limiter
+from llm_registry import get_llm_registry
+from metrics import render_metrics, span, track_stages
+from tracing import begin_trace, current_trace_id, end_trace
 import os
 import json
 import re
+import threading
 from dotenv import load_dotenv
 
 
@@ -13,20 +18,35 @@ TMDB_API_KEY = os.getenv("TMDB_API_KEY")
 TMDB_TOKEN = os.getenv("TMDB_TOKEN")
 SERP_API_KEY = os.getenv("SERP_API_KEY")
 SERP_API_KEY = os.getenv("SERP_API_KEY")
-# Initialize the crew
-crew_manager = UnifiedSearchCrew(TMDB_API_KEY, TMDB_TOKEN, SERP_API_KEY)
+# The crew (crewai, agents, SQLite caches) is built by the first request that needs it,
+# so importing this module, and starting a worker, stays cheap
+_crew_manager = None
+_crew_manager_lock = threading.Lock()
+
+def get_crew_manager():
+    """Return the process-wide UnifiedSearchCrew, building it on first use"""
+    global _crew_manager
+    if _crew_manager is None:
+        with _crew_manager_lock:
+            if _crew_manager is None:
+                from unified_crewai import UnifiedSearchCrew
+                _crew_manager = UnifiedSearchCrew(TMDB_API_KEY, TMDB_TOKEN, SERP_API_KEY)
+    return _crew_manager
 
 def extract_content_from_crew_output(output):
     """Extract the actual content string from the CrewOutput object or string"""
-    
+    with span("extract"):
+        return _extract_content(output)
+
+def _extract_content(output):
     # If it's None, return empty string
     if output is None:
         return ""
     
-    # Check if it's a dictionary with a 'result' key (from crew_manager.run)
+    # Check if it's a dictionary with a 'result' key (from UnifiedSearchCrew.run)
     if isinstance(output, dict) and 'result' in output:
         # Access the CrewOutput object inside the dict
-        return extract_content_from_crew_output(output['result'])
+        return _extract_content(output['result'])
     
     # If it's already a string, return it directly
     if isinstance(output, str):
@@ -46,6 +66,30 @@ def extract_content_from_crew_output(output):
     # Last resort: convert to string
     return str(output)
 
+def timings_requested(data):
+    """Whether to return the per-stage breakdown: the request's "timings" flag, else SEARCH_RETURN_TIMINGS"""
+    if "timings" in data:
+        return bool(data["timings"])
+    return os.getenv("SEARCH_RETURN_TIMINGS", "0").lower() in ("1", "true", "yes")
+
+# Every request runs in a trace; callers can pass their own ID in X-Trace-Id to join traces up
+@app.before_request
+def start_request_trace():
+    g.trace_token = begin_trace(request.headers.get("X-Trace-Id"))
+
+@app.after_request
+def add_trace_header(response):
+    trace_id = current_trace_id()
+    if trace_id:
+        response.headers["X-Trace-Id"] = trace_id
+    return response
+
+@app.teardown_request
+def end_request_trace(error=None):
+    token = g.pop("trace_token", None)
+    if token is not None:
+        end_trace(token)
+
 @app.route("/", methods=["GET"])
 def index():
     """Render the main page"""
@@ -61,19 +105,23 @@ def api_search():
         return jsonify({"error": "Please provide a search query"})
     
     try:
-        # Process the user input using the unified crew
-        result = crew_manager.run(user_input)
-        
-        # Extract the content and return it directly
-        content = extract_content_from_crew_output(result)
+        with track_stages() as timings, span("request", endpoint="search"):
+            # Process the user input using the unified crew
+            result = get_crew_manager().run(user_input, bypass_cache=bool(data.get("bypass_cache")), multi=data.get("multi"))
+            
+            # Extract the content and return it directly
+            content = extract_content_from_crew_output(result)
         
         # Return the result in a simplified format
-        return jsonify({
+        response = {
             "type": "general",
-            "content": content
-        })
+            "content": content,
+            "cached": result.get("cached", False)
+        }
+        if timings_requested(data):
+            response["timings"] = timings.to_dict()
+        return jsonify(response)
     except Exception as e:
-        print(f"Error in search: {str(e)}")
         return jsonify({"error": f"An error occurred: {str(e)}"})
 
 # Movie-specific endpoint
@@ -87,19 +135,22 @@ def api_movie():
         return jsonify({"error": "Please provide a movie search query"})
     
     try:
-        # Process the movie search
-        result = crew_manager.run_movie_search(user_input)
-        
-        # Extract the content 
-        content = extract_content_from_crew_output(result)
+        with track_stages() as timings, span("request", endpoint="movie"):
+            # Process the movie search
+            result = get_crew_manager().run_movie_search(user_input)
+            
+            # Extract the content 
+            content = extract_content_from_crew_output(result)
         
         # Return the result in a simplified format
-        return jsonify({
+        response = {
             "type": "movie",
             "content": content
-        })
+        }
+        if timings_requested(data):
+            response["timings"] = timings.to_dict()
+        return jsonify(response)
     except Exception as e:
-        print(f"Error in movie search: {str(e)}")
         return jsonify({"error": f"An error occurred: {str(e)}"})
 
 # Music-specific endpoint
@@ -113,19 +164,22 @@ def api_music():
         return jsonify({"error": "Please provide a music search query"})
     
     try:
-        # Process the music search
-        result = crew_manager.run_music_search(user_input)
-        
-        # Extract the content
-        content = extract_content_from_crew_output(result)
+        with track_stages() as timings, span("request", endpoint="music"):
+            # Process the music search
+            result = get_crew_manager().run_music_search(user_input)
+            
+            # Extract the content
+            content = extract_content_from_crew_output(result)
         
         # Return the result in a simplified format
-        return jsonify({
+        response = {
             "type": "music",
             "content": content
-        })
+        }
+        if timings_requested(data):
+            response["timings"] = timings.to_dict()
+        return jsonify(response)
     except Exception as e:
-        print(f"Error in music search: {str(e)}")
         return jsonify({"error": f"An error occurred: {str(e)}"})
 
 # News-specific endpoint
@@ -139,19 +193,22 @@ def api_news():
         return jsonify({"error": "Please provide a news search query"})
     
     try:
-        # Process the news search
-        result = crew_manager.run_news_search(user_input)
-        
-        # Extract the content
-        content = extract_content_from_crew_output(result)
+        with track_stages() as timings, span("request", endpoint="news"):
+            # Process the news search
+            result = get_crew_manager().run_news_search(user_input)
+            
+            # Extract the content
+            content = extract_content_from_crew_output(result)
         
         # Return the result in a simplified format  
-        return jsonify({
+        response = {
             "type": "news",
             "content": content
-        })
+        }
+        if timings_requested(data):
+            response["timings"] = timings.to_dict()
+        return jsonify(response)
     except Exception as e:
-        print(f"Error in news search: {str(e)}")
         return jsonify({"error": f"An error occurred: {str(e)}"})
 
 # General search endpoint
@@ -165,20 +222,119 @@ def api_general():
         return jsonify({"error": "Please provide a search query"})
     
     try:
-        # Process the general search
-        result = crew_manager.run_general_search(user_input)
-        
-        # Extract the content
-        content = extract_content_from_crew_output(result)
+        with track_stages() as timings, span("request", endpoint="general"):
+            # Process the general search
+            result = get_crew_manager().run_general_search(user_input)
+            
+            # Extract the content
+            content = extract_content_from_crew_output(result)
         
         # Return the result in a simplified format
-        return jsonify({
+        response = {
             "type": "general",
             "content": content
-        })
+        }
+        if timings_requested(data):
+            response["timings"] = timings.to_dict()
+        return jsonify(response)
     except Exception as e:
-        print(f"Error in general search: {str(e)}")
         return jsonify({"error": f"An error occurred: {str(e)}"})
 
+# Batch endpoint for backend jobs precomputing many answers
+@app.route("/api/batch", methods=["POST"])
+def api_batch():
+    """Run a list of queries and stream one JSON line per unique query as each completes"""
+    data = request.get_json(silent=True) or {}
+    queries = data.get("queries")
+    
+    if not isinstance(queries, list) or not queries or not all(isinstance(q, str) for q in queries):
+        return jsonify({"error": "Please provide a non-empty list of query strings"}), 400
+    
+    max_queries = int(os.getenv("BATCH_MAX_QUERIES", 1000))
+    if len(queries) > max_queries:
+        return jsonify({"error": f"A batch may contain at most {max_queries} queries"}), 400
+    
+    # Callers may lower the concurrency but not exceed the deployment's limit
+    max_concurrency = int(os.getenv("BATCH_MAX_CONCURRENCY", 8))
+    if isinstance(data.get("max_concurrency"), int):
+        max_concurrency = max(1, min(data["max_concurrency"], max_concurrency))
+    
+    def lines():
+        for item in get_crew_manager().run_batch(queries, max_concurrency=max_concurrency,
+                                           bypass_cache=bool(data.get("bypass_cache"))):
+            result = item["result"]
+            line = {
+                "query": item["query"],
+                "indices": item["indices"],
+                "type": item["type"],
+                "elapsed_ms": item["elapsed_ms"],
+                "trace_id": item["trace_id"]
+            }
+            if "error" in result and "result" not in result:
+                line["error"] = result["error"]
+            else:
+                line["content"] = extract_content_from_crew_output(result)
+                line["cached"] = result.get("cached", False)
+            yield json.dumps(line) + "\n"
+    
+    return Response(stream_with_context(lines()), mimetype="application/x-ndjson")
+
+@app.route("/metrics", methods=["GET"])
+def api_metrics():
+    """Per-stage latency histograms in the Prometheus text format"""
+    return Response(render_metrics(), mimetype="text/plain; version=0.0.4")
+
+@app.route("/api/rate_limits", methods=["GET"])
+def api_rate_limits():
+    """Per-provider token bucket state: queue depth, wait times and timeouts"""
+    return jsonify(get_rate_limiter().stats())
+
+@app.route("/api/llm_backends", methods=["GET"])
+def api_llm_backends():
+    """Per-backend rolling p50/p95 latency, error rate and circuit state, plus each query type's route"""
+    registry = get_llm_registry()
+    return jsonify({
+        "backends": registry.stats(),
+        "routes": {query_type: [backend.name for backend in registry.route(query_type)]
+                   for query_type in ("movie", "music", "news", "general")}
+    })
+
+# Streaming (Server-Sent Events) variants of the search endpoints
+@app.route("/api/<search_type>/stream", methods=["GET", "POST"])
+def api_stream(search_type):
+    """Stream query type, raw tool results, LLM tokens and the final answer as SSE"""
+    data = request.get_json(silent=True) or {}
+    user_input = data.get("user_input") or request.args.get("user_input", "")
+    
+    if search_type == "search":
+        bypass_cache = bool(data.get("bypass_cache"))
+        multi = data.get("multi")
+        search = lambda query: get_crew_manager().run(query, bypass_cache=bypass_cache, multi=multi)
+    elif search_type in ("movie", "music", "news", "general"):
+        search = _typed_stream_search(search_type)
+    else:
+        return jsonify({"error": f"Unknown search type: {search_type}"}), 404
+    
+    if not user_input:
+        return jsonify({"error": "Please provide a search query"})
+    
+    events = stream_search(search, user_input, extract_content_from_crew_output,
+                           "general" if search_type == "search" else search_type)
+    return Response(
+        stream_with_context(events),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+def _typed_stream_search(search_type):
+    """Per-type search that reports its (fixed) query type before running"""
+    run_search = getattr(get_crew_manager(), f"run_{search_type}_search")
+    
+    def search(user_input):
+        emit_event("query_type", {"type": search_type})
+        return run_search(user_input)
+    
+    return search
+
 if __name__ == "__main__":
     app.run(debug=True, use_reloader=False)
\ No newline at end of file
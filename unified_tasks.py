@@ -1,36 +1,15 @@
-from crewai import Task
-
-class UnifiedSearchTasks:
-    """Tasks for different types of searches"""
-    
-    def movie_search_task(self, agent, search_criteria, count):
-        """Task for searching movies using web search"""
-        # Create a human-readable description of the search criteria
-        search_desc = []
-        if 'genre' in search_criteria:
-            search_desc.append(f"genre: {search_criteria['genre']}")
-        if 'actor' in search_criteria:
-            search_desc.append(f"actor: {search_criteria['actor']}")
-        if 'director' in search_criteria:
-            search_desc.append(f"director: {search_criteria['director']}")
-        if 'year' in search_criteria:
-            search_desc.append(f"year: {search_criteria['year']}")
-        if 'min_rating' in search_criteria:
-            search_desc.append(f"minimum rating: {search_criteria['min_rating']}")
-            
-        search_description = ", ".join(search_desc) if search_desc else "popular movies"
-        
-        return Task(
-            description=f'''
+# Task templates. The {placeholders} are filled per request, either directly or by
+# crew.kickoff(inputs=...) on a pre-built crew, so keep other braces out of them.
+MOVIE_SEARCH_DESCRIPTION = '''
             Your task is to retrieve the top {count} movies matching the following criteria:
             {search_description}
-            
+
             Use the web_search tool with these parameters:
             - query: {search_criteria}
             - count: {count}
-            
+
             Format each movie as:
-            
+
             - **Title:** [Movie Title] ([Year])
             - **Rating:** [Rating]/10
             - **Director:** [Director]
@@ -39,37 +18,21 @@ class UnifiedSearchTasks:
             - **Description:** [Description]
             - **Thumbnail:** ![Thumbnail](thumbnail_url)
             - **Link:** [Link](movie_link)
-            
+
             Ensure all fields are properly populated for each movie.
-            ''',
-            expected_output=f"A list of {count} top movies matching {search_description} with complete details in the specified format",
-            agent=agent
-        )
+            '''
+MOVIE_SEARCH_EXPECTED_OUTPUT = "A list of {count} top movies matching {search_description} with complete details in the specified format"
 
-    def music_search_task(self, agent, search_criteria, count):
-        """Task for searching music using web search"""
-        # Create a human-readable description of the search criteria
-        search_desc = []
-        if 'artist' in search_criteria:
-            search_desc.append(f"artist: {search_criteria['artist']}")
-        if 'genre' in search_criteria:
-            search_desc.append(f"genre: {search_criteria['genre']}")
-        if 'term' in search_criteria:
-            search_desc.append(f"term: {search_criteria['term']}")
-            
-        search_description = ", ".join(search_desc) if search_desc else "popular music"
-        
-        return Task(
-            description=f'''
+MUSIC_SEARCH_DESCRIPTION = '''
             Your task is to retrieve the top {count} songs matching the following criteria:
             {search_description}
-            
+
             Use the web_search tool with these parameters:
             - query: {search_criteria}
             - count: {count}
-            
+
             Format each song as:
-            
+
             - **Title:** [Song Title]
             - **Artist:** [Artist Name]
             - **Album:** [Album Name]
@@ -78,59 +41,155 @@ class UnifiedSearchTasks:
             - **Preview:** [Audio Player](preview_url)
             - **Artwork:** ![Album Cover](artwork_url)
             - **Link:** [Listen Link](track_url)
-            
+
             Ensure all fields are properly populated for each song.
-            ''',
-            expected_output=f"A list of {count} songs matching {search_description} with complete details in the specified format",
-            agent=agent
-        )
+            '''
+MUSIC_SEARCH_EXPECTED_OUTPUT = "A list of {count} songs matching {search_description} with complete details in the specified format"
 
-    def news_search_task(self, agent, search_query, count):
-        """Task for searching and summarizing news"""
-        return Task(
-            description=f'''
+NEWS_SEARCH_DESCRIPTION = '''
             Your task is to search for and summarize the latest news about "{search_query}".
-            
+
             Use the fetch_news tool with these parameters:
             - search_query: "{search_query}"
             - count: {count}
-            
+
             For each news article:
             1. Summarize the key points in 2-3 sentences
             2. Format each article as:
-            
+
             ## [Article Title]
             **Source:** [Source Name] | **Date:** [Publication Date]
-            
+
             [Your 2-3 sentence summary]
-            
+
             **Link:** [Read More](article_link)
-            
+
             Ensure all articles are recent and relevant to the search query.
             Provide a brief overall summary of the topic at the beginning.
-            ''',
-            expected_output=f"A summary of {count} recent news articles about '{search_query}' with links to the original sources",
-            agent=agent
-        )
+            '''
+NEWS_SEARCH_EXPECTED_OUTPUT = "A summary of {count} recent news articles about '{search_query}' with links to the original sources"
 
-    def general_search_task(self, agent, query):
-        """Task for general web search queries"""
-        return Task(
-            description=f'''
+GENERAL_SEARCH_DESCRIPTION = '''
             Your task is to perform a web search for "{query}" and provide a comprehensive answer.
-            
+
             Use the web_search tool with these parameters:
             - query: "{query}"
             - count: 10
-            
+
             Based on the search results:
             1. Provide a direct answer to the query (2-3 paragraphs)
             2. Include any factual information from the knowledge graph if available
             3. Cite your sources by including links to relevant websites
             4. Format your response in a clear, readable manner
-            
+
             Ensure your answer is accurate, relevant, and to the point.
-            ''',
-            expected_output=f"A comprehensive answer to the query '{query}' with citations to relevant sources",
+            '''
+GENERAL_SEARCH_EXPECTED_OUTPUT = "A comprehensive answer to the query '{query}' with citations to relevant sources"
+
+
+def movie_search_query(search_criteria):
+    """Web search query for parsed movie criteria (shorter than the criteria dict's repr)"""
+    parts = [str(search_criteria.get('genre', '')), "movies"]
+    if 'actor' in search_criteria:
+        parts.append(f"starring {search_criteria['actor']}")
+    if 'director' in search_criteria:
+        parts.append(f"directed by {search_criteria['director']}")
+    if 'year' in search_criteria:
+        parts.append(str(search_criteria['year']))
+    if 'min_rating' in search_criteria:
+        parts.append(f"rated {search_criteria['min_rating']}+")
+    return " ".join(part for part in parts if part)
+
+
+def music_search_query(search_criteria):
+    """Web search query for parsed music criteria"""
+    parts = [str(search_criteria[key]) for key in ('artist', 'genre', 'term') if search_criteria.get(key)]
+    return " ".join(parts + ["songs"])
+
+
+class UnifiedSearchTasks:
+    """Tasks for different types of searches"""
+
+    def _build_task(self, agent, description, expected_output, inputs):
+        """Create a task, filling the template when inputs are given and leaving the placeholders otherwise"""
+        if inputs is not None:
+            description = description.format(**inputs)
+            expected_output = expected_output.format(**inputs)
+        # crewai is imported on first use, so importing this module stays cheap
+        from crewai import Task
+
+        return Task(
+            description=description,
+            expected_output=expected_output,
             agent=agent
         )
+
+    def movie_search_inputs(self, search_criteria, count):
+        """Template inputs for the movie search task"""
+        # Create a human-readable description of the search criteria
+        search_desc = []
+        if 'genre' in search_criteria:
+            search_desc.append(f"genre: {search_criteria['genre']}")
+        if 'actor' in search_criteria:
+            search_desc.append(f"actor: {search_criteria['actor']}")
+        if 'director' in search_criteria:
+            search_desc.append(f"director: {search_criteria['director']}")
+        if 'year' in search_criteria:
+            search_desc.append(f"year: {search_criteria['year']}")
+        if 'min_rating' in search_criteria:
+            search_desc.append(f"minimum rating: {search_criteria['min_rating']}")
+
+        search_description = ", ".join(search_desc) if search_desc else "popular movies"
+
+        return {
+            "search_description": search_description,
+            "search_criteria": movie_search_query(search_criteria),
+            "count": count
+        }
+
+    def movie_search_task(self, agent, search_criteria=None, count=None):
+        """Task for searching movies using web search"""
+        inputs = self.movie_search_inputs(search_criteria, count) if search_criteria is not None else None
+        return self._build_task(agent, MOVIE_SEARCH_DESCRIPTION, MOVIE_SEARCH_EXPECTED_OUTPUT, inputs)
+
+    def music_search_inputs(self, search_criteria, count):
+        """Template inputs for the music search task"""
+        # Create a human-readable description of the search criteria
+        search_desc = []
+        if 'artist' in search_criteria:
+            search_desc.append(f"artist: {search_criteria['artist']}")
+        if 'genre' in search_criteria:
+            search_desc.append(f"genre: {search_criteria['genre']}")
+        if 'term' in search_criteria:
+            search_desc.append(f"term: {search_criteria['term']}")
+
+        search_description = ", ".join(search_desc) if search_desc else "popular music"
+
+        return {
+            "search_description": search_description,
+            "search_criteria": music_search_query(search_criteria),
+            "count": count
+        }
+
+    def music_search_task(self, agent, search_criteria=None, count=None):
+        """Task for searching music using web search"""
+        inputs = self.music_search_inputs(search_criteria, count) if search_criteria is not None else None
+        return self._build_task(agent, MUSIC_SEARCH_DESCRIPTION, MUSIC_SEARCH_EXPECTED_OUTPUT, inputs)
+
+    def news_search_inputs(self, search_query, count):
+        """Template inputs for the news search task"""
+        return {"search_query": search_query, "count": count}
+
+    def news_search_task(self, agent, search_query=None, count=None):
+        """Task for searching and summarizing news"""
+        inputs = self.news_search_inputs(search_query, count) if search_query is not None else None
+        return self._build_task(agent, NEWS_SEARCH_DESCRIPTION, NEWS_SEARCH_EXPECTED_OUTPUT, inputs)
+
+    def general_search_inputs(self, query):
+        """Template inputs for the general search task"""
+        return {"query": query}
+
+    def general_search_task(self, agent, query=None):
+        """Task for general web search queries"""
+        inputs = self.general_search_inputs(query) if query is not None else None
+        return self._build_task(agent, GENERAL_SEARCH_DESCRIPTION, GENERAL_SEARCH_EXPECTED_OUTPUT, inputs)